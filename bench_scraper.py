@@ -0,0 +1,410 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+from fixture_server import start_fixture_server
+from read_file3 import TCASScraper
+
+# origin จริงที่ corpus ใช้ใน URL แบบเต็ม (sitemap) fixture server แทนด้วย origin ของตัวเอง
+CORPUS_ORIGIN = 'https://course.mytcas.com'
+
+# ฟิลด์ที่ใช้วัดความถูกต้องของการดึงข้อมูล
+ACCURACY_FIELDS = ['มหาวิทยาลัย', 'หลักสูตร', 'ค่าเทอม']
+
+UNIVERSITIES = [
+    'มหาวิทยาลัยเกษตรศาสตร์', 'มหาวิทยาลัยขอนแก่น', 'มหาวิทยาลัยเชียงใหม่',
+    'มหาวิทยาลัยสงขลานครินทร์', 'มหาวิทยาลัยมหิดล', 'มหาวิทยาลัยธรรมศาสตร์'
+]
+PROGRAM_NAMES = [
+    'วิศวกรรมศาสตรบัณฑิต สาขาวิชาวิศวกรรมคอมพิวเตอร์',
+    'วิศวกรรมศาสตรบัณฑิต สาขาวิชาวิศวกรรมปัญญาประดิษฐ์',
+    'Bachelor of Engineering Program in Computer Engineering (International Program)',
+    'วิศวกรรมศาสตรบัณฑิต สาขาวิชาวิศวกรรมคอมพิวเตอร์และการสื่อสาร'
+]
+# หลักสูตรที่ไม่เกี่ยวข้อง (อยู่ในหน้าผลค้นหาแต่ไม่ควรถูกเก็บ)
+DECOY_NAMES = ['บริหารธุรกิจบัณฑิต สาขาวิชาการตลาด', 'ศิลปศาสตรบัณฑิต สาขาวิชาภาษาอังกฤษ']
+
+PROGRAM_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{name} | mytcas</title></head>
+<body>
+<header><span class="h-brand"><img src="/logo.png" alt="{university}"></span></header>
+<main>
+<h1>{name}</h1>
+<dl><dt>ค่าใช้จ่าย</dt><dd>{tuition}</dd></dl>
+</main>
+</body></html>
+"""
+
+# บางมหาวิทยาลัยส่งหน้าเป็น XHTML ที่มี <?xml encoding?> นำหน้า (ทุก XHTML_EVERY หน้า)
+XHTML_PROLOG = '<?xml version="1.0" encoding="utf-8"?>\n'
+XHTML_EVERY = 7
+
+# หน้าที่เนื้อหาถูกสร้างด้วย JavaScript (ต้อง render ด้วย browser)
+RENDERED_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>mytcas</title></head>
+<body>
+<div id="app"></div>
+<script>document.getElementById('app').innerHTML = {markup};</script>
+</body></html>
+"""
+
+SITEMAP_INDEX = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<sitemap><loc>{origin}/sitemaps/programs.xml</loc></sitemap>
+</sitemapindex>
+"""
+
+SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{urls}
+</urlset>
+"""
+
+# หน้ารายการของมหาวิทยาลัย: ลิงก์ตรง และรหัสโปรแกรมใน JSON ที่หน้าเว็บใช้ render รายการ
+LISTING_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title} | mytcas</title></head>
+<body>
+<h1>{title}</h1>
+<ul>
+{links}
+</ul>
+<script type="application/json">{data}</script>
+</body></html>
+"""
+
+SEARCH_HOME = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>mytcas</title></head>
+<body>
+<form action="/search" method="get"><input type="search" name="q" placeholder="ค้นหา"></form>
+</body></html>
+"""
+
+
+def generate_corpus(root, programs=200, rendered_ratio=0.1, seed=0):
+    """สร้างเว็บจำลองของ mytcas พร้อม expected.json (ผลที่ถูกต้องของแต่ละหน้าโปรแกรม)
+
+    หลักสูตรเป้าหมายถูกแบ่งเป็นสามส่วนสำหรับโหมด listing: อยู่ใน sitemap, เป็นลิงก์ในหน้ารายการ
+    ของมหาวิทยาลัย และเป็นรหัสใน JSON ของหน้ารายการ (หลักสูตรหลอกอยู่ในหน้าผลค้นหาเท่านั้น)
+    """
+    rng = random.Random(seed)
+    for folder in ('programs', 'sitemaps', 'universities'):
+        os.makedirs(os.path.join(root, folder), exist_ok=True)
+
+    expected = {}
+    links = []
+    sitemap_urls = []
+    listings = {university: ([], []) for university in UNIVERSITIES}  # มหาวิทยาลัย -> (ลิงก์, รหัสใน JSON)
+    for i in range(programs + len(DECOY_NAMES)):
+        program_id = f"{10000000000000 + i * 7919:014d}A"
+        path = f"/programs/{program_id}"
+        university = UNIVERSITIES[i % len(UNIVERSITIES)]
+        if i < programs:
+            name = PROGRAM_NAMES[i % len(PROGRAM_NAMES)]
+        else:
+            name = DECOY_NAMES[i - programs]
+
+        if rng.random() < 0.5:
+            tuition = f"ภาคการศึกษาละ {rng.randrange(15, 90) * 1000:,} บาท"
+        else:
+            tuition = f"ตลอดหลักสูตร {rng.randrange(120, 800) * 1000:,} บาท"
+
+        page = PROGRAM_PAGE.format(name=name, university=university, tuition=tuition)
+        if rng.random() < rendered_ratio:
+            body = page.split('<body>')[1].split('</body>')[0]
+            page = RENDERED_PAGE.format(markup=json.dumps(body, ensure_ascii=False))
+        elif i % XHTML_EVERY == XHTML_EVERY - 1:
+            page = XHTML_PROLOG + page
+
+        with open(os.path.join(root, 'programs', program_id + '.html'), 'w', encoding='utf-8') as f:
+            f.write(page)
+
+        links.append(f'<a href="{path}">{name} - {university}</a>')
+        if i < programs:
+            expected[path] = {'มหาวิทยาลัย': university, 'หลักสูตร': name, 'ค่าเทอม': tuition}
+            if i % 3 == 0:
+                sitemap_urls.append(f"<url><loc>{CORPUS_ORIGIN}{path}</loc></url>")
+            elif i % 3 == 1:
+                listings[university][0].append(f'<li><a href="{path}">{name}</a></li>')
+            else:
+                listings[university][1].append({'id': program_id, 'name': name})
+
+    # ลิงก์ที่ไม่เกี่ยวข้อง เช่น เมนูและหน้าข่าว
+    links += ['<a href="/about">เกี่ยวกับเรา</a>', '<a href="/news/1">ข่าวรับสมัคร TCAS</a>']
+    rng.shuffle(links)
+
+    with open(os.path.join(root, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(SEARCH_HOME)
+    with open(os.path.join(root, 'search.html'), 'w', encoding='utf-8') as f:
+        f.write(SEARCH_HOME.replace('</body>', '<ul>\n' + '\n'.join(f'<li>{link}</li>' for link in links) + '\n</ul>\n</body>'))
+    with open(os.path.join(root, 'sitemap.xml'), 'w', encoding='utf-8') as f:
+        f.write(SITEMAP_INDEX.format(origin=CORPUS_ORIGIN))
+    with open(os.path.join(root, 'sitemaps', 'programs.xml'), 'w', encoding='utf-8') as f:
+        f.write(SITEMAP.format(urls='\n'.join(sitemap_urls)))
+
+    index_links = []
+    for number, (university, (program_links, program_ids)) in enumerate(listings.items(), start=1):
+        index_links.append(f'<li><a href="/universities/{number:03d}">{university}</a></li>')
+        with open(os.path.join(root, 'universities', f'{number:03d}.html'), 'w', encoding='utf-8') as f:
+            f.write(LISTING_PAGE.format(title=university, links='\n'.join(program_links),
+                                        data=json.dumps({'programs': program_ids}, ensure_ascii=False)))
+    with open(os.path.join(root, 'universities', 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(LISTING_PAGE.format(title='มหาวิทยาลัย', links='\n'.join(index_links), data='{}'))
+
+    with open(os.path.join(root, 'expected.json'), 'w', encoding='utf-8') as f:
+        json.dump(expected, f, ensure_ascii=False, indent=2)
+
+    print(f"🧱 สร้าง corpus {len(expected)} หลักสูตร (+ {len(DECOY_NAMES)} หลักสูตรหลอก) ที่ {root}")
+    return expected
+
+
+def score_records(records, expected):
+    """เทียบผลที่ดึงได้กับ expected.json (จับคู่ด้วย path ของ URL)"""
+    found = {urlparse(record['URL']).path: record for record in records}
+    matched = [path for path in expected if path in found]
+    correct_fields = sum(
+        found[path].get(field) == expected[path][field]
+        for path in matched
+        for field in ACCURACY_FIELDS
+    )
+    return {
+        'expected': len(expected),
+        'extracted': len(records),
+        'recall': len(matched) / len(expected) if expected else 0,
+        'precision': len(matched) / len(found) if found else 0,
+        'field_accuracy': correct_fields / (len(expected) * len(ACCURACY_FIELDS)) if expected else 0,
+        'missing': sorted(set(expected) - set(found))[:10],
+        'unexpected': sorted(set(found) - set(expected))[:10]
+    }
+
+
+def git_commit():
+    """commit ปัจจุบันของ repo (ต่อท้าย -dirty ถ้ามีไฟล์ที่ยังไม่ commit)"""
+    try:
+        root = os.path.dirname(os.path.abspath(__file__))
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def peak_rss_mb(who):
+    """RSS สูงสุด (MB) ของ process นี้หรือ child process ที่จบแล้ว"""
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux รายงานเป็น KB, macOS เป็น byte
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+async def run_once(args, base_url, expected):
+    """รันการ crawl หนึ่งรอบกับ fixture server แล้วคืนผลวัด"""
+    scraper = TCASScraper(
+        concurrency=args.concurrency,
+        cache_dir=None,  # ไม่ใช้ cache เพื่อให้ทุกรอบโหลดจาก server จริง
+        render_profile=args.render_profile,
+        extractor=args.extractor,
+        parse_workers=args.parse_workers,
+        verbose=False,
+        rate_limit=args.rate_limit
+    )
+    scraper.base_url = base_url + '/'
+
+    cpu_start = os.times()
+    wall_start = time.perf_counter()
+    try:
+        if args.stage == 'search':
+            await scraper.search_via_website()
+        elif args.stage == 'listing':
+            await scraper.crawl_listings([base_url + '/universities'], base_url + '/programs/{id}')
+        elif args.stage == 'probe':
+            # รหัสจริงทุกตัว (A) และรหัสที่ไม่มีหน้า (B) จำนวนเท่ากัน
+            ids = sorted(path.rsplit('/', 1)[-1][:-1] for path in expected)
+            await scraper.probe_programs(base_url + '/programs/{id}{suffix}', {'id': ids, 'suffix': ['A', 'B']})
+        else:
+            links = [base_url + path for path in sorted(expected)]
+            await scraper.extract_comprehensive_data(links)
+        wall = time.perf_counter() - wall_start
+    finally:
+        # ปิด browser และ parse pool ก่อนวัด CPU เพื่อให้นับเวลาของ child process ด้วย
+        await scraper.close_browser()
+    cpu_end = os.times()
+
+    metrics = scraper.metrics.summary()
+    pages = sum(metrics['outcomes'].values())
+    cpu_self = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+    cpu_children = (cpu_end.children_user - cpu_start.children_user) + \
+        (cpu_end.children_system - cpu_start.children_system)
+
+    return {
+        'wall_seconds': wall,
+        'pages': pages,
+        'pages_per_sec': pages / wall if wall else 0,
+        'cpu_seconds': cpu_self,
+        'cpu_children_seconds': cpu_children,
+        'outcomes': metrics['outcomes'],
+        'p95_total': metrics['stages']['total']['p95'] if pages else 0,
+        'accuracy': score_records(scraper.programs_data, expected)
+    }
+
+
+def summarize(runs):
+    """รวมผลหลายรอบ: ใช้ค่ามัธยฐานของเวลาและ throughput"""
+    result = dict(runs[-1])
+    for key in ['wall_seconds', 'pages_per_sec', 'cpu_seconds', 'cpu_children_seconds', 'p95_total']:
+        result[key] = statistics.median(run[key] for run in runs)
+    result['runs'] = len(runs)
+    return result
+
+
+def previous_result(path, config):
+    """ผล benchmark ล่าสุดในไฟล์ที่ใช้ config เดียวกัน (ไว้เทียบกับ commit ก่อน)"""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('config') == config:
+                previous = entry
+    return previous
+
+
+def print_result(entry, previous=None):
+    """แสดงผล benchmark (และส่วนต่างจากผลก่อนหน้าถ้ามี)"""
+    result = entry['result']
+    accuracy = result['accuracy']
+
+    def delta(key, better_higher=True):
+        if not previous:
+            return ''
+        old = previous['result'][key]
+        if not old:
+            return ''
+        change = (result[key] - old) / old * 100
+        worse = change < 0 if better_higher else change > 0
+        return f"  ({change:+.1f}% เทียบ {previous['commit']}{' ⚠️' if worse and abs(change) > 10 else ''})"
+
+    print(f"\n🏁 ผล benchmark ({entry['commit']}, {result['runs']} รอบ):")
+    print("=" * 50)
+    print(f"📄 หน้าที่ประมวลผล: {result['pages']} ใน {result['wall_seconds']:.2f} วินาที")
+    print(f"⚡ ความเร็ว: {result['pages_per_sec']:.2f} หน้า/วินาที{delta('pages_per_sec')}")
+    print(f"🧮 CPU: {result['cpu_seconds']:.2f} วินาที (child process {result['cpu_children_seconds']:.2f}){delta('cpu_seconds', False)}")
+    print(f"💾 RSS สูงสุด: {result['peak_rss_mb']:.1f} MB (child process {result['peak_rss_children_mb']:.1f} MB){delta('peak_rss_mb', False)}")
+    print(f"⏱️ p95 ต่อ URL: {result['p95_total']:.3f} วินาที")
+    print("📋 ผลลัพธ์: " + ", ".join(f"{outcome} {count}" for outcome, count in sorted(result['outcomes'].items())))
+    print(f"🎯 recall {accuracy['recall'] * 100:.1f}%, precision {accuracy['precision'] * 100:.1f}%, "
+          f"ฟิลด์ถูกต้อง {accuracy['field_accuracy'] * 100:.1f}%")
+    if accuracy['missing']:
+        print(f"   ❓ ไม่พบ (ตัวอย่าง): {', '.join(accuracy['missing'])}")
+    if entry['server_failures']:
+        print(f"💥 server ตอบ 503 ไป {entry['server_failures']} ครั้ง")
+
+
+def main(args):
+    if args.generate or not os.path.exists(os.path.join(args.corpus, 'expected.json')):
+        generate_corpus(args.corpus, args.programs, args.rendered_ratio, args.seed)
+    with open(os.path.join(args.corpus, 'expected.json'), encoding='utf-8') as f:
+        expected = json.load(f)
+
+    server, base_url = start_fixture_server(
+        args.corpus, rewrite=args.rewrite + [CORPUS_ORIGIN], latency=args.latency,
+        jitter=args.jitter, fail_rate=args.fail_rate, seed=args.seed
+    )
+    print(f"🧪 fixture server: {base_url} (หน่วง {args.latency}s ±{args.jitter}s, error {args.fail_rate * 100:.0f}%)")
+
+    try:
+        runs = []
+        for run in range(args.repeat):
+            print(f"\n🔁 รอบที่ {run + 1}/{args.repeat} ({args.stage})")
+            runs.append(asyncio.run(run_once(args, base_url, expected)))
+    finally:
+        server.shutdown()
+
+    result = summarize(runs)
+    result['peak_rss_mb'] = peak_rss_mb(resource.RUSAGE_SELF)
+    result['peak_rss_children_mb'] = peak_rss_mb(resource.RUSAGE_CHILDREN)
+
+    # config ที่มีผลต่อตัวเลข ใช้จับคู่ผลของ commit ต่าง ๆ
+    config = {
+        'stage': args.stage,
+        'corpus': os.path.basename(os.path.abspath(args.corpus)),
+        'expected': len(expected),
+        'concurrency': args.concurrency,
+        'render_profile': args.render_profile,
+        'extractor': args.extractor,
+        'parse_workers': args.parse_workers,
+        'rate_limit': args.rate_limit,
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'fail_rate': args.fail_rate,
+        'seed': args.seed
+    }
+    entry = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'config': config,
+        'server_failures': server.failures,
+        'result': result
+    }
+
+    previous = previous_result(args.output, config) if args.output else None
+    print_result(entry, previous)
+
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        print(f"📝 บันทึกผลลง {args.output}")
+
+    recall = result['accuracy']['recall']
+    if recall < args.min_recall:
+        raise SystemExit(f"❌ recall {recall * 100:.1f}% ต่ำกว่า --min-recall {args.min_recall * 100:.1f}%")
+
+
+def parse_args(argv=None):
+    """อ่านตัวเลือกจาก command line"""
+    parser = argparse.ArgumentParser(description="วัดความเร็วและความถูกต้องของ TCASScraper กับเว็บจำลอง (offline)")
+    parser.add_argument('--corpus', default='bench_corpus',
+                        help='โฟลเดอร์หน้าเว็บจำลอง (ต้องมี expected.json, ถ้าไม่มีจะสร้างให้)')
+    parser.add_argument('--generate', action='store_true', help='สร้าง corpus ใหม่ทับของเดิม')
+    parser.add_argument('--programs', type=int, default=200, help='จำนวนหลักสูตรใน corpus ที่สร้าง')
+    parser.add_argument('--rendered-ratio', type=float, default=0.1,
+                        help='สัดส่วนหน้าที่ต้อง render ด้วย JavaScript')
+    parser.add_argument('--rewrite', action='append', default=[],
+                        help='origin จริงใน corpus ที่บันทึกไว้ เช่น https://course.mytcas.com')
+    parser.add_argument('--stage', choices=['search', 'extract', 'listing', 'probe'], default='search',
+                        help='search = ค้นหาผ่านหน้าเว็บแล้วดึงข้อมูล, extract = ดึงข้อมูลจากรายการ URL ใน expected.json, '
+                             'listing = --discovery listing จาก sitemap/หน้ารายการ, probe = --discovery probe จากรหัสโปรแกรม')
+    parser.add_argument('--latency', type=float, default=0.0, help='หน่วงทุก response (วินาที)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='หน่วงเพิ่มแบบสุ่มสูงสุด (วินาที)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='สัดส่วน request ที่ตอบ 503 (0-1)')
+    parser.add_argument('--seed', type=int, default=0, help='seed ของ corpus และการสุ่ม error')
+    parser.add_argument('--repeat', type=int, default=1, help='จำนวนรอบ (รายงานค่ามัธยฐาน)')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--render-profile', choices=['lean', 'full'], default='lean')
+    parser.add_argument('--extractor', choices=['lxml', 'bs4'], default='lxml')
+    parser.add_argument('--parse-workers', type=int, default=None)
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='request ต่อวินาทีต่อ host ของ scraper (0 = ไม่จำกัด วัดความเร็วสูงสุด)')
+    parser.add_argument('--output', default='bench_results.jsonl',
+                        help='ไฟล์ JSON lines ที่เก็บผลทุกครั้ง (ใช้เทียบข้าม commit)')
+    parser.add_argument('--min-recall', type=float, default=0.0,
+                        help='จบด้วย exit code 1 ถ้า recall ต่ำกว่านี้ (0-1) ใช้เป็นการตรวจ เช่น 1.0')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
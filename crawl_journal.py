@@ -0,0 +1,78 @@
+import json
+import os
+
+
+class CrawlJournal:
+    """journal แบบ append-only (JSON lines) สำหรับบันทึกความคืบหน้าการ crawl
+
+    แต่ละบรรทัดเป็น event หนึ่งรายการ:
+        {"event": "search", "term": ..., "links": [...]}  ค้นหาคำนี้เสร็จแล้ว
+        {"event": "done", "url": ..., "record": {...} | null}  ดึงข้อมูลลิงก์นี้เสร็จแล้ว
+                                                                (null = หน้าไม่มีอยู่/ไม่ใช่หน้าโปรแกรม)
+    """
+
+    def __init__(self, path='tcas_crawl_journal.jsonl', resume=False):
+        self.path = path
+        self.searches = {}   # term -> links ที่ค้นหาเจอ
+        self.completed = {}  # url -> record (None = ไม่พบข้อมูล)
+
+        if resume and os.path.exists(path):
+            self.load()
+            self.truncate_partial()
+            mode = 'a'
+        else:
+            mode = 'w'
+
+        self.file = open(path, mode, encoding='utf-8')
+
+    def load(self):
+        """อ่าน journal เดิมกลับมา (ข้ามบรรทัดสุดท้ายที่เขียนไม่ครบ)"""
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                if event.get('event') == 'search':
+                    self.searches[event['term']] = event['links']
+                elif event.get('event') == 'done':
+                    self.completed[event['url']] = event.get('record')
+
+        print(f"📒 โหลด journal: ค้นหาแล้ว {len(self.searches)} คำ, "
+              f"ดึงข้อมูลแล้ว {len(self.completed)} ลิงก์")
+
+    def truncate_partial(self):
+        """ตัดบรรทัดสุดท้ายที่เขียนไม่ครบ (process หยุดระหว่างเขียน) ออก ไม่ให้ event ถัดไปต่อท้ายบรรทัดนั้น"""
+        with open(self.path, 'rb+') as f:
+            end = position = f.seek(0, os.SEEK_END)
+            while position > 0:
+                step = min(4096, position)
+                f.seek(position - step)
+                newline = f.read(step).rfind(b'\n')
+                if newline != -1:
+                    position += newline + 1 - step
+                    break
+                position -= step
+            if position != end:
+                f.truncate(position)
+
+    def write(self, event):
+        """เขียน event ต่อท้ายไฟล์แล้ว flush ลงดิสก์ทันที"""
+        self.file.write(json.dumps(event, ensure_ascii=False) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def log_search(self, term, links):
+        """บันทึกว่าค้นหาคำนี้เสร็จแล้ว พร้อมลิงก์ที่พบ"""
+        self.searches[term] = links
+        self.write({'event': 'search', 'term': term, 'links': links})
+
+    def log_done(self, url, record):
+        """บันทึกว่าดึงข้อมูลลิงก์นี้เสร็จแล้ว"""
+        self.completed[url] = record
+        self.write({'event': 'done', 'url': url, 'record': record})
+
+    def close(self):
+        """ปิดไฟล์ journal"""
+        self.file.close()
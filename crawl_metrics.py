@@ -0,0 +1,115 @@
+import json
+import time
+from contextlib import contextmanager
+
+# ขั้นตอนของแต่ละ URL ตามลำดับที่เกิดขึ้น
+#   fetch: โหลด HTML แบบ static, parse: แยกข้อมูล, fallback: เวลารวมของการ render ด้วย browser
+#   navigate: page.goto, wait: รอ element ที่ต้องใช้ (ค่าใช้จ่าย/โลโก้), content: page.content()
+STAGES = ['fetch', 'parse', 'fallback', 'navigate', 'wait', 'content']
+
+
+def percentile(sorted_values, p):
+    """percentile แบบ nearest-rank จาก list ที่เรียงแล้ว"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class UrlSpan:
+    """เวลาของแต่ละขั้นตอนสำหรับ URL เดียว"""
+
+    def __init__(self, url):
+        self.url = url
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.outcome = None
+        self.error = None  # เหตุผลที่ล้มเหลวล่าสุด (ถ้ามี)
+        self.attempts = 1  # จำนวนครั้งที่ลองดึง (FetchPolicy)
+
+    @contextmanager
+    def stage(self, name):
+        """จับเวลาขั้นตอนหนึ่ง (เรียกซ้ำได้ เวลาจะบวกสะสม)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'outcome': self.outcome,
+            'attempts': self.attempts,
+            'total': round(time.perf_counter() - self.started, 4),
+            'stages': {name: round(seconds, 4) for name, seconds in self.stages.items()}
+        }
+
+
+class CrawlMetrics:
+    """เก็บ span ของทุก URL เขียนเป็น JSON lines และสรุป p50/p95/p99 ต่อขั้นตอน"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8') if path else None
+        self.timings = {}   # stage -> [seconds]
+        self.totals = []
+        self.outcomes = {}
+
+    def start(self, url):
+        """เริ่ม span ของ URL"""
+        return UrlSpan(url)
+
+    def finish(self, span, outcome):
+        """จบ span พร้อมผลลัพธ์ (เช่น ok_static, ok_render, no_data, error:Timeout)"""
+        span.outcome = outcome
+        record = span.to_dict()
+
+        for name, seconds in span.stages.items():
+            self.timings.setdefault(name, []).append(seconds)
+        self.totals.append(record['total'])
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+        if self.file:
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.file.flush()
+
+    def summary(self):
+        """สรุปเวลาต่อขั้นตอน (วินาที)"""
+        result = {}
+        stages = [name for name in STAGES if name in self.timings]
+        stages += sorted(name for name in self.timings if name not in STAGES)
+        for name, values in [(name, self.timings[name]) for name in stages] + [('total', self.totals)]:
+            values = sorted(values)
+            result[name] = {
+                'count': len(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99)
+            }
+        return {'stages': result, 'outcomes': dict(self.outcomes)}
+
+    def print_summary(self):
+        """แสดงตารางสรุปเวลาและผลลัพธ์ของทุก URL"""
+        if not self.totals:
+            return
+
+        summary = self.summary()
+        print(f"\n⏱️ สรุปเวลาต่อขั้นตอน ({len(self.totals)} URL, วินาที):")
+        print("=" * 50)
+        print(f"{'stage':<10}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}")
+        for name, stats in summary['stages'].items():
+            print(f"{name:<10}{stats['count']:>6}{stats['p50']:>9.3f}{stats['p95']:>9.3f}{stats['p99']:>9.3f}")
+
+        print("📋 ผลลัพธ์: " + ", ".join(f"{outcome} {count}" for outcome, count in sorted(summary['outcomes'].items())))
+
+        if self.file:
+            self.file.write(json.dumps({'summary': summary}, ensure_ascii=False) + '\n')
+            self.file.flush()
+            print(f"📝 บันทึก metrics ลง {self.path}")
+
+    def close(self):
+        """ปิดไฟล์ metrics"""
+        if self.file:
+            self.file.close()
+            self.file = None
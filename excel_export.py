@@ -0,0 +1,67 @@
+import numbers
+
+import pandas as pd
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+SHEET_NAME = 'ข้อมูลหลักสูตร'
+
+# (คอลัมน์, ความกว้าง) ของ Excel จาก scraper และของ tcas_data.xlsx ที่ dashboard3.load_data อ่าน
+RECORD_LAYOUT = [('มหาวิทยาลัย', 40), ('หลักสูตร', 60), ('ค่าเทอม', 20), ('URL', 60)]
+DASHBOARD_LAYOUT = [('มหาวิทยาลัย', 40), ('หลักสูตร', 60), ('ค่าเทอม/เทอม', 14),
+                    ('ค่าเทอมจากเว็บ', 16), ('รูปแบบการชำระ', 16), ('URL', 60)]
+
+# ข้อจำกัดของ Excel: hyperlink ได้ไม่เกิน 65,530 ต่อ sheet และ URL ยาวไม่เกิน 2,079 ตัวอักษร
+MAX_HYPERLINKS = 65530
+MAX_URL_LENGTH = 2079
+
+
+def sort_rows(rows, key_columns):
+    """เรียงแถว (tuple) ตามคอลัมน์ที่กำหนด โดยเรียง index แทนการสร้าง DataFrame ค่าว่างอยู่ท้ายสุด"""
+    keys = [tuple((row[column] is None, str(row[column] or '')) for column in key_columns) for row in rows]
+    return [rows[index] for index in sorted(range(len(rows)), key=keys.__getitem__)]
+
+
+def write_rows(path, rows, layout, url_column='URL'):
+    """เขียน sheet ข้อมูลหลักสูตรแบบ streaming (xlsxwriter constant_memory)
+
+    แถวถูกเขียนลงไฟล์ชั่วคราวทีละแถวตามลำดับ จึงใช้หน่วยความจำคงที่ไม่ว่าจะกี่แถว
+    ความกว้างคอลัมน์ตั้งไว้ก่อนเขียนแถวแรก และ URL เขียนเป็น hyperlink ในรอบเดียวกัน
+    คืนจำนวนแถวที่เขียน
+    """
+    if not XLSXWRITER_AVAILABLE:
+        raise ImportError("ต้องติดตั้ง xlsxwriter เพื่อบันทึก Excel แบบ streaming (pip install xlsxwriter)")
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'strings_to_urls': False})
+    worksheet = workbook.add_worksheet(SHEET_NAME)
+    header = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+    link = workbook.get_default_url_format()
+
+    url_index = [column for column, _ in layout].index(url_column) if url_column else None
+    for index, (column, width) in enumerate(layout):
+        worksheet.set_column(index, index, width)
+        worksheet.write_string(0, index, column, header)
+
+    links = 0
+    count = 0
+    for count, row in enumerate(rows, start=1):
+        for index, value in enumerate(row):
+            if pd.isna(value):
+                continue
+            if index == url_index and str(value).startswith('http') and len(value) <= MAX_URL_LENGTH \
+                    and links < MAX_HYPERLINKS:
+                worksheet.write_url(count, index, value, link, string=value)
+                links += 1
+            elif isinstance(value, numbers.Real) and not isinstance(value, bool):
+                worksheet.write_number(count, index, value)
+            else:
+                worksheet.write_string(count, index, str(value))
+
+    workbook.close()
+    if links == MAX_HYPERLINKS:
+        print(f"⚠️ Excel รองรับ hyperlink ได้ {MAX_HYPERLINKS} ลิงก์ต่อ sheet ที่เหลือบันทึกเป็นข้อความ")
+    return count
@@ -0,0 +1,193 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlparse
+
+# สาเหตุที่ลองใหม่แล้วอาจสำเร็จ (ปัญหาชั่วคราวของเครือข่ายหรือ server)
+RETRYABLE_ERRORS = {'timeout', 'connect', 'http_429', 'render_error'}
+
+# สาเหตุที่แน่นอนว่าลิงก์นี้ไม่มีข้อมูล (หน้าไม่มีอยู่หรือไม่ใช่หน้าโปรแกรม) ดึงซ้ำก็ได้ผลเดิม
+DEFINITIVE_ERRORS = {'http_404', 'http_410', 'parse_miss'}
+
+
+def is_retryable(error):
+    """ลองใหม่ได้หรือไม่: timeout, เชื่อมต่อไม่ได้, 429, 5xx และ browser error ทั่วไป"""
+    if not error:
+        return False
+    if error.startswith('http_5'):
+        return True
+    return error.split(':')[0] in RETRYABLE_ERRORS
+
+
+def is_final(outcome):
+    """ผลนี้บันทึกเป็นผลสุดท้ายได้หรือไม่ (journal, SeenSet, recrawl): สำเร็จ หรือหน้าไม่มีอยู่จริง
+
+    ผลอื่น เช่น circuit_open, deadline, timeout, 5xx เป็นปัญหาชั่วคราว ต้องดึงใหม่ในรอบถัดไป
+    """
+    return bool(outcome) and (outcome.startswith('ok_') or outcome in DEFINITIVE_ERRORS)
+
+
+def counts_against_host(error):
+    """ความล้มเหลวที่แปลว่า host มีปัญหา (404 หรือแยกข้อมูลไม่ได้ไม่นับ)"""
+    return is_retryable(error) and not error.startswith('render_error')
+
+
+class CircuitBreaker:
+    """หยุดส่ง request ไปที่ host ที่ล้มเหลวติดกัน threshold ครั้ง เป็นเวลา cooldown วินาที
+
+    หลังครบ cooldown ปล่อยให้ลองทีละ request (half-open) ถ้ายังล้มเหลวจะเปิดวงจรทันที ถ้าสำเร็จจะกลับเป็นปกติ
+    """
+
+    def __init__(self, threshold=5, cooldown=60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = {}    # host -> จำนวนครั้งที่ล้มเหลวติดกัน
+        self.open_until = {}  # host -> เวลาที่เลิกบล็อก
+        self.probing = set()  # host ที่กำลังลอง request แรกหลัง cooldown
+        self.reopened = {}    # host -> จำนวนครั้งที่ลองหลัง cooldown แล้วยังล้มเหลว
+        self.trips = 0
+
+    def allow(self, host):
+        return time.monotonic() >= self.open_until.get(host, 0.0) and host not in self.probing
+
+    async def wait(self, host, limit):
+        """รอจนส่ง request ไปที่ host ได้ คืน True ถ้า request นี้เป็นตัวแรกหลัง cooldown (half-open),
+        False ถ้าวงจรปิดอยู่แล้ว หรือ None ถ้ารอเกิน limit วินาที
+
+        รอเฉพาะวงจรที่เพิ่งเปิดครั้งแรก host ที่ลองหลัง cooldown แล้วยังล้มเหลวถือว่าล่ม ไม่รอต่อ
+        """
+        give_up = time.monotonic() + limit
+        while not self.allow(host):
+            if self.reopened.get(host) or time.monotonic() >= give_up:
+                return None
+            # ระหว่างที่ request แรกหลัง cooldown ยังไม่รู้ผล ตรวจใหม่ทุก 50 ms
+            wake = max(self.open_until.get(host, 0.0), time.monotonic() + 0.05)
+            await asyncio.sleep(min(wake, give_up) - time.monotonic())
+        if host in self.open_until:
+            self.probing.add(host)
+            return True
+        return False
+
+    def release(self, host):
+        """request แรกหลัง cooldown จบโดยไม่รู้ผล (เช่นถูกยกเลิกหรือ render_error) ให้ request อื่นลองแทน"""
+        self.probing.discard(host)
+
+    def success(self, host):
+        self.failures.pop(host, None)
+        self.open_until.pop(host, None)
+        self.probing.discard(host)
+        self.reopened.pop(host, None)
+
+    def failure(self, host):
+        """บันทึกความล้มเหลว คืน True ถ้าวงจรของ host นี้เปิด (หยุดส่ง request)"""
+        if host in self.probing:
+            self.probing.discard(host)
+            self.reopened[host] = self.reopened.get(host, 0) + 1
+        self.failures[host] = self.failures.get(host, 0) + 1
+        if self.threshold and self.failures[host] >= self.threshold:
+            if time.monotonic() >= self.open_until.get(host, 0.0):
+                self.trips += 1
+            self.open_until[host] = time.monotonic() + self.cooldown
+            return True
+        return False
+
+
+class FetchPolicy:
+    """กติกาการดึงแต่ละ URL: เวลารวมไม่เกิน deadline วินาที, ลองใหม่ด้วย exponential backoff แบบสุ่ม
+    เฉพาะ error ที่ลองใหม่ได้ และรอให้วงจรของ host ที่เปิดอยู่ครบ cooldown ก่อนส่ง request
+    (เวลาที่รอไม่นับรวมใน deadline) ถ้ารอไม่ได้จะคืน circuit_open ซึ่งเป็นผลชั่วคราว ไม่ใช่ผลสุดท้าย
+
+    attempt คือ coroutine function ที่คืน (ผลลัพธ์, ป้ายผล) ผลลัพธ์ None = ล้มเหลว ป้ายผลเป็นสาเหตุ
+    """
+
+    def __init__(self, deadline=45.0, retries=2, base_delay=0.5, max_delay=8.0,
+                 breaker_threshold=5, breaker_cooldown=60.0, seed=None):
+        self.deadline = deadline
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self.random = random.Random(seed)
+        self.stats = {'retries': 0, 'deadline': 0, 'circuit_open': 0, 'circuit_wait': 0}
+
+    def backoff(self, attempt):
+        """เวลารอก่อนลองครั้งถัดไป (full jitter: สุ่ม 0 ถึงเพดานที่โตแบบ exponential)"""
+        return self.random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def run(self, url, attempt):
+        """เรียก attempt ตามกติกา คืน (ผลลัพธ์, ป้ายผล, จำนวนครั้งที่ลอง)"""
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline if self.deadline else None
+        label = None
+        probe = False
+
+        try:
+            for tries in range(1, self.retries + 2):
+                if not self.breaker.allow(host):
+                    self.stats['circuit_wait'] += 1
+                waited = loop.time()
+                # รอได้นานกว่า cooldown เล็กน้อย เผื่อเวลาของ request แรกหลัง cooldown
+                probe = await self.breaker.wait(host, self.breaker.cooldown * 2)
+                if probe is None:
+                    self.stats['circuit_open'] += 1
+                    return None, 'circuit_open', tries - 1
+                if deadline:
+                    deadline += loop.time() - waited
+
+                remaining = deadline - loop.time() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    self.stats['deadline'] += 1
+                    return None, 'deadline', tries - 1
+                try:
+                    result, label = await asyncio.wait_for(attempt(), remaining)
+                except asyncio.TimeoutError:
+                    # host ที่ช้าจนหมดเวลาก็นับเป็นความล้มเหลวของ host
+                    self.breaker.failure(host)
+                    self.stats['deadline'] += 1
+                    return None, 'deadline', tries
+
+                if result is not None:
+                    self.breaker.success(host)
+                    return result, label, tries
+                if not is_retryable(label):
+                    if not counts_against_host(label):
+                        self.breaker.success(host)
+                    return None, label, tries
+
+                opened = counts_against_host(label) and self.breaker.failure(host)
+                if probe:
+                    # ผลของ request แรกหลัง cooldown ไม่ได้บอกสถานะ host (เช่น render_error) ให้ request อื่นลองต่อ
+                    self.breaker.release(host)
+                    probe = False
+                if tries > self.retries:
+                    break
+                if opened:
+                    # วงจรเพิ่งเปิด รอบถัดไปจะรอ cooldown แทน backoff
+                    continue
+
+                delay = self.backoff(tries - 1)
+                if deadline and loop.time() + delay >= deadline:
+                    self.stats['deadline'] += 1
+                    return None, label, tries
+                self.stats['retries'] += 1
+                await asyncio.sleep(delay)
+
+            return None, label, tries
+        finally:
+            if probe:
+                self.breaker.release(host)
+
+    def print_stats(self):
+        """แสดงสถิติการลองใหม่และวงจรที่เปิด"""
+        stats = self.stats
+        if not any(stats.values()) and not self.breaker.trips:
+            return
+        print(f"\n🛡️ สถิติการลองใหม่ (deadline {self.deadline:g} วินาที/URL, ลองใหม่สูงสุด {self.retries} ครั้ง):")
+        print("=" * 50)
+        print(f"🔁 ลองใหม่: {stats['retries']} ครั้ง | ⌛ หมดเวลา: {stats['deadline']} URL")
+        print(f"🔌 วงจรเปิด: {self.breaker.trips} ครั้ง (รอ cooldown {stats['circuit_wait']} ครั้ง, "
+              f"ข้าม {stats['circuit_open']} URL ไว้ดึงรอบหน้า)")
+        for host, until in self.breaker.open_until.items():
+            if until > time.monotonic():
+                print(f"   - {host}: ยังบล็อกอีก {until - time.monotonic():.0f} วินาที")
@@ -0,0 +1,119 @@
+import argparse
+import mimetypes
+import os
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, unquote
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """ส่งไฟล์หน้าเว็บที่บันทึกไว้ตาม path ของ URL
+
+    /programs/123 -> <root>/programs/123 หรือ 123.html / 123.json / 123.xml
+    /universities/ -> <root>/universities/index.html
+    query string ไม่มีผลกับการหาไฟล์ (/search?q=... -> <root>/search.html)
+    """
+
+    def resolve(self, path):
+        """หาไฟล์ใน corpus ที่ตรงกับ path"""
+        root = self.server.root
+        relative = unquote(urlsplit(path).path).lstrip('/')
+        base = os.path.normpath(os.path.join(root, relative))
+        if not base.startswith(os.path.normpath(root)):
+            return None
+
+        candidates = [base, base + '.html', base + '.json', base + '.xml', os.path.join(base, 'index.html')]
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def send_fixture(self, with_body):
+        server = self.server
+        
+        # จำลองเครือข่ายช้า และ server ที่ตอบ error เป็นบางครั้ง
+        if server.latency:
+            time.sleep(server.latency + server.random.uniform(0, server.jitter))
+        if server.fail_rate and server.random.random() < server.fail_rate:
+            server.failures += 1
+            self.send_error(503)
+            return
+        
+        file_path = self.resolve(self.path)
+        if file_path is None:
+            self.send_error(404)
+            return
+
+        with open(file_path, 'rb') as f:
+            body = f.read()
+
+        # เปลี่ยน origin จริงในไฟล์ให้ชี้มาที่ server นี้
+        origin = f"http://{self.headers.get('Host', '127.0.0.1')}".encode()
+        for real_origin in self.server.rewrite:
+            body = body.replace(real_origin.encode(), origin)
+
+        content_type = mimetypes.guess_type(file_path)[0] or 'text/html'
+        if content_type.startswith('text/') or content_type.endswith(('json', 'xml')):
+            content_type += '; charset=utf-8'
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self.send_fixture(with_body=True)
+
+    def do_HEAD(self):
+        self.send_fixture(with_body=False)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_fixture_server(root, port=0, rewrite=(), verbose=False,
+                         latency=0.0, jitter=0.0, fail_rate=0.0, seed=0):
+    """เปิด fixture server ใน thread แยก คืน (server, base_url)
+
+    latency/jitter: หน่วงทุก response (วินาที), fail_rate: สัดส่วน request ที่ตอบ 503
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+    server.daemon_threads = True
+    server.root = os.path.abspath(root)
+    server.rewrite = list(rewrite)
+    server.verbose = verbose
+    server.latency = latency
+    server.jitter = jitter
+    server.fail_rate = fail_rate
+    server.random = random.Random(seed)
+    server.failures = 0
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="เปิด server จำลองจากหน้าเว็บที่บันทึกไว้ (ทดสอบแบบ offline)")
+    parser.add_argument('root', help='โฟลเดอร์ corpus ของหน้าเว็บ')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--rewrite', action='append', default=[],
+                        help='origin จริงที่ให้แทนด้วย server นี้ เช่น https://course.mytcas.com')
+    parser.add_argument('--latency', type=float, default=0.0, help='หน่วงทุก response (วินาที)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='หน่วงเพิ่มแบบสุ่มสูงสุด (วินาที)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='สัดส่วน request ที่ตอบ 503 (0-1)')
+    args = parser.parse_args()
+
+    server, base_url = start_fixture_server(args.root, args.port, args.rewrite, verbose=True,
+                                            latency=args.latency, jitter=args.jitter,
+                                            fail_rate=args.fail_rate)
+    print(f"🧪 fixture server: {base_url} (กด Ctrl+C เพื่อหยุด)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
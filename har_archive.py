@@ -0,0 +1,109 @@
+import base64
+import glob
+import json
+import os
+from datetime import datetime, timezone
+
+from url_dedupe import canonicalize_url
+
+# HAR 1.2 (รูปแบบเดียวกับที่ Playwright บันทึกด้วย record_har_path และอ่านด้วย route_from_har)
+HAR_VERSION = '1.2'
+
+
+def har_files(directory):
+    """ไฟล์ HAR ทั้งหมดในโฟลเดอร์ เรียงตามชื่อ"""
+    return sorted(glob.glob(os.path.join(directory, '*.har')))
+
+
+def decode_content(content):
+    """body ของ response จาก HAR เป็น bytes (text ธรรมดาหรือ base64)"""
+    text = content.get('text') or ''
+    if content.get('encoding') == 'base64':
+        return base64.b64decode(text)
+    return text.encode('utf-8')
+
+
+class HarRecorder:
+    """บันทึก response ของ HTTP client (fetch_static) เป็นไฟล์ HAR
+
+    ส่วนของ browser Playwright บันทึกเองผ่าน record_har_path ของแต่ละ context
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.entries = []
+
+    def add(self, url, status, headers, body, elapsed=0.0):
+        """เก็บ request GET หนึ่งรายการพร้อม response (body เป็น bytes)"""
+        try:
+            content = {'size': len(body), 'mimeType': headers.get('content-type', ''), 'text': body.decode('utf-8')}
+        except UnicodeDecodeError:
+            content = {'size': len(body), 'mimeType': headers.get('content-type', ''),
+                       'text': base64.b64encode(body).decode('ascii'), 'encoding': 'base64'}
+
+        self.entries.append({
+            'startedDateTime': datetime.now(timezone.utc).isoformat(),
+            'time': elapsed * 1000,
+            'request': {
+                'method': 'GET', 'url': url, 'httpVersion': 'HTTP/1.1',
+                'headers': [], 'queryString': [], 'cookies': [], 'headersSize': -1, 'bodySize': 0
+            },
+            'response': {
+                'status': status, 'statusText': '', 'httpVersion': 'HTTP/1.1',
+                'headers': [{'name': name, 'value': value} for name, value in headers.items()],
+                'cookies': [], 'content': content, 'redirectURL': '', 'headersSize': -1, 'bodySize': len(body)
+            },
+            'cache': {},
+            'timings': {'send': 0, 'wait': elapsed * 1000, 'receive': 0}
+        })
+
+    def close(self):
+        """เขียนไฟล์ HAR (ครั้งเดียวตอนจบ)"""
+        if self.entries is None:
+            return
+        har = {'log': {'version': HAR_VERSION, 'creator': {'name': 'read_file3', 'version': '1'}, 'entries': self.entries}}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(har, f, ensure_ascii=False)
+        print(f"📼 บันทึก HAR {len(self.entries)} response ลง {self.path}")
+        self.entries = None
+
+
+class HarReplay:
+    """อ่าน response จากไฟล์ HAR ทุกไฟล์ในโฟลเดอร์ ใช้ตอบ fetch_static แทนการต่อ network
+
+    URL ที่ซ้ำกันใช้ response ล่าสุด (ยกเว้นมี 200 อยู่แล้ว)
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.paths = har_files(directory)
+        if not self.paths:
+            raise FileNotFoundError(f"ไม่พบไฟล์ .har ใน {directory}")
+
+        self.responses = {}  # canonical url -> (status, body)
+        for path in self.paths:
+            with open(path, encoding='utf-8') as f:
+                entries = json.load(f)['log']['entries']
+            for entry in entries:
+                if entry['request']['method'] != 'GET':
+                    continue
+                key = canonicalize_url(entry['request']['url'])
+                status = entry['response']['status']
+                if key in self.responses and self.responses[key][0] == 200 and status != 200:
+                    continue
+                self.responses[key] = (status, decode_content(entry['response'].get('content', {})))
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def lookup(self, url):
+        """(status, body) ของ URL จาก HAR หรือ None ถ้าไม่ได้บันทึกไว้"""
+        response = self.responses.get(canonicalize_url(url))
+        self.stats['hits' if response else 'misses'] += 1
+        return response
+
+    def print_stats(self):
+        print(f"\n📼 เล่นซ้ำจาก HAR ({len(self.paths)} ไฟล์, {len(self.responses)} URL):")
+        print("=" * 50)
+        print(f"✅ พบใน HAR: {self.stats['hits']} | ❌ ไม่พบ: {self.stats['misses']}")
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from urllib.parse import urlparse
+
+
+def parse_retry_after(value):
+    """อ่านค่า Retry-After แบบวินาที (ไม่รองรับรูปแบบวันที่ คืน None)"""
+    if value and value.strip().isdigit():
+        return float(value.strip())
+    return None
+
+
+class HostBucket:
+    """token bucket ของ host เดียว พร้อมอัตราที่ปรับตามการตอบของ server"""
+
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.failures = 0  # จำนวนครั้งที่ล้มเหลวติดกัน (429/5xx/เชื่อมต่อไม่ได้)
+        self.lock = asyncio.Lock()
+
+    def refill(self, now):
+        """เติม token ตามเวลาที่ผ่านไป"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class HostThrottle:
+    """จำกัดจำนวน request ต่อวินาทีแยกตาม host และชะลอเองเมื่อ server ตอบ 429/5xx
+
+    เมื่อล้มเหลว: ลดอัตราลงครึ่งหนึ่งและหยุดส่ง request ไปที่ host นั้นชั่วคราว
+    (exponential backoff หรือตาม Retry-After) เมื่อสำเร็จ: ค่อย ๆ เพิ่มอัตรากลับ
+    rate <= 0 หมายถึงไม่จำกัด
+    """
+
+    def __init__(self, rate=2.0, burst=4, min_rate=0.2, base_backoff=1.0, max_backoff=60.0):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min_rate
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.buckets = {}
+        self.stats = {'requests': 0, 'waits': 0, 'wait_time': 0.0, 'backoffs': 0}
+
+    def bucket(self, url):
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = HostBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    async def acquire(self, url):
+        """รอจนกว่าจะส่ง request ไปที่ host ของ URL ได้"""
+        self.stats['requests'] += 1
+        if self.rate <= 0:
+            return
+
+        bucket = self.bucket(url)
+        # lock ทำให้ request ที่รอ host เดียวกันได้คิวตามลำดับที่มาถึง
+        async with bucket.lock:
+            while True:
+                now = time.monotonic()
+                bucket.refill(now)
+                wait = bucket.blocked_until - now
+                if wait <= 0:
+                    if bucket.tokens >= 1:
+                        bucket.tokens -= 1
+                        return
+                    wait = (1 - bucket.tokens) / bucket.rate
+
+                self.stats['waits'] += 1
+                self.stats['wait_time'] += wait
+                await asyncio.sleep(wait)
+
+    def record(self, url, status_code, retry_after=None):
+        """บันทึกผลของ request (status_code None = เชื่อมต่อไม่ได้) เพื่อปรับอัตรา"""
+        if self.rate <= 0:
+            return
+
+        bucket = self.bucket(url)
+        if status_code is None or status_code == 429 or status_code >= 500:
+            bucket.failures += 1
+            bucket.rate = max(self.min_rate, bucket.rate / 2)
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (bucket.failures - 1))
+            retry_after = parse_retry_after(retry_after)
+            if retry_after is not None:
+                backoff = min(self.max_backoff, max(backoff, retry_after))
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + backoff)
+            bucket.tokens = 0
+            self.stats['backoffs'] += 1
+        else:
+            bucket.failures = 0
+            # เพิ่มอัตรากลับทีละ 10% ของอัตราตั้งต้น
+            bucket.rate = min(bucket.base_rate, bucket.rate + bucket.base_rate * 0.1)
+
+    def print_stats(self):
+        """แสดงสถิติการชะลอ request"""
+        if not self.stats['requests'] or self.rate <= 0:
+            return
+
+        print(f"\n🚦 สถิติการจำกัดความเร็ว ({self.rate:g} request/วินาที ต่อ host):")
+        print("=" * 50)
+        print(f"📨 request: {self.stats['requests']}")
+        print(f"⏳ รอ token: {self.stats['waits']} ครั้ง ({self.stats['wait_time']:.1f} วินาที)")
+        print(f"🐢 backoff (429/5xx): {self.stats['backoffs']} ครั้ง")
+        for host, bucket in sorted(self.buckets.items()):
+            print(f"   - {host}: อัตราปัจจุบัน {bucket.rate:.2f} request/วินาที")
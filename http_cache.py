@@ -0,0 +1,155 @@
+import os
+import re
+import sqlite3
+import time
+
+from url_dedupe import canonicalize_url
+
+
+def cache_key(url):
+    """สร้าง key ของ cache จาก URL (URL ที่ชี้หน้าเดียวกันใช้ key เดียวกัน)"""
+    return canonicalize_url(url)
+
+
+def parse_max_age(cache_control):
+    """อ่านค่า max-age จาก header Cache-Control (วินาที)"""
+    if not cache_control or 'no-cache' in cache_control or 'no-store' in cache_control:
+        return 0
+    match = re.search(r'max-age=(\d+)', cache_control)
+    return int(match.group(1)) if match else 0
+
+
+class HTTPCache:
+    """cache ของ response บนดิสก์ (SQLite) พร้อม ETag/Last-Modified"""
+
+    def __init__(self, cache_dir='.tcas_cache', max_bytes=200 * 1024 * 1024):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'http_cache.sqlite3')
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                max_age INTEGER,
+                body BLOB,
+                size INTEGER,
+                stored_at REAL,
+                accessed_at REAL
+            )
+        ''')
+        self.db.commit()
+
+        self.stats = {
+            'hits': 0,           # ใช้ของใน cache ได้เลยโดยไม่ต้องส่ง request
+            'revalidations': 0,  # server ตอบ 304 แล้วใช้ body เดิม
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'bytes_saved': 0
+        }
+
+    def lookup(self, url):
+        """คืนข้อมูลใน cache ของ URL หรือ None"""
+        row = self.db.execute(
+            'SELECT etag, last_modified, max_age, body, size, stored_at FROM responses WHERE key = ?',
+            (cache_key(url),)
+        ).fetchone()
+        if not row:
+            return None
+
+        etag, last_modified, max_age, body, size, stored_at = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'max_age': max_age,
+            'body': body,
+            'size': size,
+            'stored_at': stored_at
+        }
+
+    def is_fresh(self, entry):
+        """ตรวจว่ายังอยู่ในช่วง max-age หรือไม่"""
+        return entry['max_age'] > 0 and time.time() - entry['stored_at'] < entry['max_age']
+
+    def conditional_headers(self, entry):
+        """สร้าง header สำหรับ conditional request"""
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record_hit(self, url, entry):
+        """นับ hit และอัปเดตเวลาใช้งานล่าสุด"""
+        self.stats['hits'] += 1
+        self.stats['bytes_saved'] += entry['size']
+        self.touch(url)
+
+    def record_revalidation(self, url, entry, headers):
+        """server ตอบ 304: ใช้ body เดิมและต่ออายุ validators"""
+        self.stats['revalidations'] += 1
+        self.stats['bytes_saved'] += entry['size']
+        now = time.time()
+        self.db.execute(
+            'UPDATE responses SET etag = ?, last_modified = ?, max_age = ?, stored_at = ?, accessed_at = ? WHERE key = ?',
+            (headers.get('etag') or entry['etag'],
+             headers.get('last-modified') or entry['last_modified'],
+             parse_max_age(headers.get('cache-control')) or entry['max_age'],
+             now, now, cache_key(url))
+        )
+        self.db.commit()
+
+    def store(self, url, headers, body):
+        """เก็บ response ที่มี validators หรือ max-age ลง cache"""
+        self.stats['misses'] += 1
+        etag = headers.get('etag')
+        last_modified = headers.get('last-modified')
+        max_age = parse_max_age(headers.get('cache-control'))
+        if not (etag or last_modified or max_age):
+            return
+
+        now = time.time()
+        self.db.execute(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (cache_key(url), etag, last_modified, max_age, body, len(body), now, now)
+        )
+        self.db.commit()
+        self.stats['stores'] += 1
+        self.evict()
+
+    def touch(self, url):
+        """อัปเดตเวลาใช้งานล่าสุด (ใช้เลือกตัวที่จะลบก่อน)"""
+        self.db.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), cache_key(url)))
+        self.db.commit()
+
+    def evict(self):
+        """ลบรายการที่ใช้งานน้อยที่สุดจนขนาดรวมไม่เกิน max_bytes"""
+        total = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self.db.execute('SELECT key, size FROM responses ORDER BY accessed_at ASC').fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+            self.stats['evictions'] += 1
+        self.db.commit()
+
+    def close(self):
+        """ปิดฐานข้อมูล cache"""
+        self.db.close()
+
+    def print_stats(self):
+        """แสดงสถิติการใช้ cache"""
+        print(f"\n🗄️ สถิติ HTTP cache:")
+        print("=" * 50)
+        print(f"✅ hit (ไม่ต้องโหลดใหม่): {self.stats['hits']}")
+        print(f"🔄 revalidate (304): {self.stats['revalidations']}")
+        print(f"⬇️ โหลดใหม่: {self.stats['misses']} (เก็บลง cache {self.stats['stores']})")
+        print(f"🧹 ลบออกจาก cache: {self.stats['evictions']}")
+        print(f"💾 ประหยัดการโหลด: {self.stats['bytes_saved'] / 1024:.1f} KB")
@@ -0,0 +1,85 @@
+import re
+import unicodedata
+
+
+def fold_text(text):
+    """ทำข้อความให้อยู่รูปเดียวกันก่อนเทียบ (NFKC + casefold)
+
+    NFKC ทำให้สระอำที่พิมพ์ต่างกัน (ำ กับ ํา) เป็นรูปเดียวกัน
+    ส่วน casefold ใช้แทน lower() สำหรับภาษาอังกฤษ (ภาษาไทยไม่มีตัวพิมพ์ใหญ่/เล็ก)
+    """
+    return unicodedata.normalize('NFKC', text).casefold()
+
+
+def trie_pattern(words):
+    """สร้าง regex จาก trie ของคำ เช่น ['คอม', 'คอมพิวเตอร์'] -> 'คอม(?:พิวเตอร์)?'
+
+    คำที่ขึ้นต้นเหมือนกันใช้ branch ร่วมกัน regex จึงเลือกทางตามตัวอักษร
+    แทนการลองทีละคำ และตัวเลือกแบบ greedy ทำให้ได้คำที่ยาวที่สุดก่อน
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """ตัวจับคำสำคัญหลายคำในการสแกนข้อความรอบเดียว
+
+    รวมทุกคำเป็น regex เดียวแบบ trie ที่ compile ครั้งเดียว
+    เพิ่มคำสำคัญได้มากโดยไม่ต้องวนลูปทีละคำทุกครั้งที่ตรวจข้อความ
+    """
+
+    def __init__(self, keywords):
+        # คำที่ fold แล้ว -> คำต้นฉบับ
+        self.keywords = {}
+        for keyword in keywords:
+            folded = fold_text(keyword)
+            if folded:
+                self.keywords.setdefault(folded, keyword)
+
+        if self.keywords:
+            alternation = trie_pattern(self.keywords)
+        else:
+            alternation = '(?!)'  # ไม่มีคำสำคัญ = ไม่ตรงอะไรเลย
+
+        self.pattern = re.compile(alternation)
+        # lookahead ทำให้หาคำที่ซ้อนกันได้ครบทุกตำแหน่ง
+        self.overlap_pattern = re.compile(f'(?=({alternation}))')
+
+        # คำที่ยาวที่สุดที่ตรง ณ ตำแหน่งหนึ่ง -> คำสำคัญทุกคำที่อยู่ในคำนั้น (คำนวณเมื่อเจอครั้งแรก)
+        self.contained = {}
+
+    def search(self, text):
+        """มีคำสำคัญอย่างน้อยหนึ่งคำหรือไม่"""
+        if not text:
+            return False
+        return self.pattern.search(fold_text(text)) is not None
+
+    def matches(self, text):
+        """คืนชุดคำสำคัญ (ต้นฉบับ) ทั้งหมดที่พบในข้อความ"""
+        if not text:
+            return set()
+
+        found = set()
+        for match in self.overlap_pattern.finditer(fold_text(text)):
+            longest = match.group(1)
+            if longest not in found:
+                if longest not in self.contained:
+                    self.contained[longest] = [kw for kw in self.keywords if kw in longest]
+                found.update(self.contained[longest])
+        return {self.keywords[kw] for kw in found}
@@ -0,0 +1,207 @@
+import asyncio
+import gzip
+import json
+import re
+from urllib.parse import urljoin, urlparse, urldefrag
+
+from lxml import etree, html
+
+from url_dedupe import canonicalize_url
+
+# รูปแบบ URL ของหน้าโปรแกรม เช่น https://course.mytcas.com/programs/10280104300501A
+PROGRAM_URL_PATTERN = r'/programs/[0-9A-Za-z]+/?$'
+
+# รูปแบบ URL ของหน้ารายการ (มหาวิทยาลัย / คณะ / สาขา) ที่ต้องเดินต่อ
+LISTING_URL_PATTERN = r'/(universities|faculties|fields|programs)/?([0-9A-Za-z]+/?)?$'
+
+# รหัสโปรแกรมของ mytcas ที่พบใน JSON ของหน้าเว็บ เช่น 10280104300501A
+PROGRAM_ID_PATTERN = r'^\d{14}[A-Z]$'
+
+DEFAULT_LISTING_SEEDS = ['https://course.mytcas.com/universities']
+DEFAULT_PROGRAM_URL_TEMPLATE = 'https://course.mytcas.com/programs/{id}'
+
+
+class ListingDiscovery:
+    """สร้างรายการ URL หน้าโปรแกรมจาก sitemap, หน้ารายการ และ JSON ของเว็บ
+
+    ไม่ต้องพิมพ์คำค้นในช่องค้นหา จึงได้หน้าโปรแกรมทั้งหมดแม้ชื่อไม่มีคำสำคัญ
+    fetch คือ coroutine ที่รับ URL แล้วคืน (status_code, content)
+    """
+
+    def __init__(self, fetch, seeds=None, program_pattern=PROGRAM_URL_PATTERN,
+                 listing_pattern=LISTING_URL_PATTERN, program_id_pattern=PROGRAM_ID_PATTERN,
+                 program_url_template=DEFAULT_PROGRAM_URL_TEMPLATE, max_pages=5000, concurrency=8):
+        self.fetch = fetch
+        self.seeds = list(seeds or DEFAULT_LISTING_SEEDS)
+        self.program_re = re.compile(program_pattern)
+        self.listing_re = re.compile(listing_pattern)
+        self.program_id_re = re.compile(program_id_pattern)
+        self.program_url_template = program_url_template
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+
+        # เดินเฉพาะ host ของ seed เท่านั้น
+        self.allowed_hosts = {urlparse(seed).netloc for seed in self.seeds}
+
+        self.visited = set()
+        self.programs = set()
+        self.stats = {'pages': 0, 'sitemaps': 0, 'json': 0, 'errors': 0}
+
+    async def discover(self, on_found=None):
+        """สร้าง frontier ของหน้าโปรแกรมทั้งหมด คืน list ของ URL (เรียงแล้ว)
+
+        on_found(urls) ถูกเรียกทุกครั้งที่เจอหน้าโปรแกรมใหม่ เพื่อส่งเข้าคิวดึงข้อมูลได้ทันที
+        """
+        self.on_found = on_found
+
+        # sitemap ของแต่ละ host ก่อน (ถ้ามี ได้ทั้งเว็บในไม่กี่ request)
+        roots = sorted({f"{parsed.scheme}://{parsed.netloc}" for parsed in map(urlparse, self.seeds)})
+        queue = asyncio.Queue()
+        for root in roots:
+            queue.put_nowait(root + '/robots.txt')
+            queue.put_nowait(root + '/sitemap.xml')
+        for seed in self.seeds:
+            queue.put_nowait(seed)
+
+        workers = [asyncio.create_task(self.worker(queue)) for _ in range(self.concurrency)]
+        await queue.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        print(f"🗺️ ค้นพบหน้าโปรแกรม {len(self.programs)} หน้า "
+              f"(หน้ารายการ {self.stats['pages']}, sitemap {self.stats['sitemaps']}, "
+              f"JSON {self.stats['json']}, ผิดพลาด {self.stats['errors']})")
+        return sorted(self.programs)
+
+    async def worker(self, queue):
+        """ดึง URL จากคิวแล้วแยกลิงก์ต่อ"""
+        while True:
+            url = await queue.get()
+            try:
+                for next_url in await self.visit(url):
+                    queue.put_nowait(next_url)
+            except Exception:
+                self.stats['errors'] += 1
+            finally:
+                queue.task_done()
+
+    async def visit(self, url):
+        """โหลดหนึ่ง URL แล้วคืนรายการ URL ที่ต้องเดินต่อ"""
+        url = canonicalize_url(url)
+        if url in self.visited or len(self.visited) >= self.max_pages:
+            return []
+        self.visited.add(url)
+
+        status_code, content = await self.fetch(url)
+        if status_code != 200 or not content:
+            return []
+
+        if isinstance(content, bytes) and content[:2] == b'\x1f\x8b':
+            content = gzip.decompress(content)
+        text = content.decode('utf-8', errors='replace') if isinstance(content, bytes) else content
+        head = text.lstrip()[:200]
+
+        if url.endswith('robots.txt'):
+            return re.findall(r'(?im)^\s*sitemap:\s*(\S+)', text)
+
+        if head.startswith('<?xml') or '<urlset' in head or '<sitemapindex' in head:
+            self.stats['sitemaps'] += 1
+            return self.parse_sitemap(content)
+
+        if head.startswith('{') or head.startswith('['):
+            self.stats['json'] += 1
+            return self.parse_json(url, text)
+
+        self.stats['pages'] += 1
+        return self.parse_listing(url, text)
+
+    def parse_sitemap(self, content):
+        """อ่าน <loc> จาก sitemap (รองรับ sitemap index)"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        root = etree.fromstring(content, parser=etree.XMLParser(recover=True))
+        if root is None:
+            return []
+
+        next_urls = []
+        found = []
+        is_index = etree.QName(root).localname == 'sitemapindex'
+        for loc in root.iter('{*}loc'):
+            url = (loc.text or '').strip()
+            if not url:
+                continue
+            if is_index:
+                next_urls.append(url)
+            elif self.program_re.search(urlparse(url).path):
+                found.append(url)
+            elif self.is_listing(url):
+                next_urls.append(url)
+
+        self.add_programs(found)
+        return next_urls
+
+    def parse_json(self, url, text):
+        """หา URL หรือรหัสโปรแกรมใน JSON ที่หน้าเว็บโหลดมาแสดงรายการ"""
+        found = []
+        next_urls = []
+
+        def walk(value):
+            if isinstance(value, dict):
+                for item in value.values():
+                    walk(item)
+            elif isinstance(value, list):
+                for item in value:
+                    walk(item)
+            elif isinstance(value, str):
+                if self.program_id_re.match(value):
+                    found.append(self.program_url_template.format(id=value))
+                elif '/' in value:
+                    full_url = urljoin(url, value)
+                    if self.program_re.search(urlparse(full_url).path):
+                        found.append(full_url)
+                    elif self.is_listing(full_url):
+                        next_urls.append(full_url)
+
+        walk(json.loads(text))
+        self.add_programs(found)
+        return next_urls
+
+    def parse_listing(self, url, text):
+        """แยกลิงก์หน้าโปรแกรมและหน้ารายการถัดไปจาก HTML"""
+        root = html.document_fromstring(text)
+        found = []
+        next_urls = []
+
+        for element in root.iter('a', 'link'):
+            href = element.get('href')
+            if not href:
+                continue
+            full_url = urldefrag(urljoin(url, href.strip()))[0]
+            if self.program_re.search(urlparse(full_url).path):
+                found.append(full_url)
+            elif self.is_listing(full_url):
+                next_urls.append(full_url)
+
+        # หน้ารายการที่ render ด้วย JavaScript มักฝัง JSON ไว้ใน <script>
+        for script in root.iter('script'):
+            if script.get('type') in ('application/json', 'application/ld+json') and script.text:
+                try:
+                    next_urls.extend(self.parse_json(url, script.text))
+                except ValueError:
+                    pass
+
+        self.add_programs(found)
+        return next_urls
+
+    def is_listing(self, url):
+        """เป็นหน้ารายการใน host ที่อนุญาตหรือไม่"""
+        parsed = urlparse(url)
+        return parsed.netloc in self.allowed_hosts and bool(self.listing_re.search(parsed.path))
+
+    def add_programs(self, urls):
+        """เก็บหน้าโปรแกรมใหม่และแจ้ง on_found"""
+        new_urls = [url for url in dict.fromkeys(map(canonicalize_url, urls)) if url not in self.programs]
+        self.programs.update(new_urls)
+        if new_urls and self.on_found:
+            self.on_found(new_urls)
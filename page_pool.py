@@ -0,0 +1,186 @@
+import asyncio
+import os
+import time
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# ข้อความ error ของ Playwright ที่แปลว่าหน้านั้นใช้ต่อไม่ได้แล้ว
+BROKEN_PAGE_ERRORS = ('Target crashed', 'Target closed', 'has been closed', 'Page crashed', 'TargetClosedError')
+
+# ชื่อ process ของ Chromium (ใช้รวม RSS ของ browser)
+BROWSER_PROCESS_NAMES = ('chrome', 'chromium', 'headless_shell')
+
+
+def browser_rss_mb():
+    """RSS รวม (MB) ของ process Chromium ที่เป็นลูกหลานของ process นี้ (None ถ้าไม่มี psutil)"""
+    if not PSUTIL_AVAILABLE:
+        return None
+    total = 0
+    for child in psutil.Process(os.getpid()).children(recursive=True):
+        try:
+            if any(name in child.name().lower() for name in BROWSER_PROCESS_NAMES):
+                total += child.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / (1024 * 1024)
+
+
+class PagePool:
+    """ชุดหน้า browser ที่ยืมไปใช้ทีละงาน และเปลี่ยนใหม่เมื่อใช้นานหรือเสีย
+
+    - หน้าที่เปิดครบ max_navigations ครั้งจะถูกปิดแล้วเปิดใหม่
+    - context จะถูกเปลี่ยนใหม่เมื่อเปิดหน้าครบ context_navigations ครั้ง
+      หรือ RSS ของ Chromium เกิน max_rss_mb (context เดิมปิดเมื่อคืนหน้าครบ)
+    - หน้าที่ crash/ถูกปิด จะไม่ถูกนำกลับมาใช้
+    new_context คือ coroutine ที่สร้าง BrowserContext ใหม่ที่ตั้งค่าแล้ว
+    """
+
+    def __init__(self, new_context, max_navigations=50, context_navigations=500, max_rss_mb=1500,
+                 rss_check_interval=5.0):
+        self.new_context = new_context
+        self.max_navigations = max_navigations
+        self.context_navigations = context_navigations
+        self.max_rss_mb = max_rss_mb if PSUTIL_AVAILABLE else None
+        self.rss_check_interval = rss_check_interval
+
+        self.context = None
+        self.context_uses = 0
+        self.leases = {}      # context -> จำนวนหน้าที่ยืมอยู่
+        self.retired = []     # context เก่าที่รอคืนหน้าครบก่อนปิด
+        self.idle = []
+        self.uses = {}        # page -> จำนวนครั้งที่เปิด URL
+        self.crashed = set()
+        self.lock = asyncio.Lock()
+        self.last_rss_check = 0.0
+        self.peak_rss_mb = 0.0
+        self.stats = {
+            'pages_opened': 0, 'pages_recycled': 0, 'contexts_opened': 0,
+            'contexts_recycled': 0, 'crashes': 0, 'rss_recycles': 0
+        }
+
+    async def acquire(self):
+        """ยืมหน้าที่พร้อมใช้ (เปิดใหม่ถ้าไม่มีหน้าว่าง)"""
+        async with self.lock:
+            if self.context is None or self.context_uses >= self.context_navigations:
+                await self.rotate_context()
+
+            while self.idle:
+                page = self.idle.pop()
+                if page.context is self.context and not page.is_closed():
+                    self.leases[self.context] += 1
+                    return page
+                await self.close_page(page)
+
+            page = await self.context.new_page()
+            page.set_default_timeout(30000)
+            page.on('crash', lambda crashed_page: self.crashed.add(crashed_page))
+            self.uses[page] = 0
+            self.leases[self.context] += 1
+            self.stats['pages_opened'] += 1
+            return page
+
+    async def release(self, page, navigations=1, broken=False):
+        """คืนหน้าหลังใช้งาน (broken=True = หน้าเสีย ต้องปิดทิ้ง)"""
+        async with self.lock:
+            context = page.context
+            self.leases[context] = self.leases.get(context, 1) - 1
+            self.uses[page] = self.uses.get(page, 0) + navigations
+            if context is self.context:
+                self.context_uses += navigations
+
+            if broken or page in self.crashed or page.is_closed():
+                self.stats['crashes'] += 1
+                await self.close_page(page)
+            elif self.uses[page] >= self.max_navigations or context is not self.context:
+                self.stats['pages_recycled'] += 1
+                await self.close_page(page)
+            else:
+                self.idle.append(page)
+
+            if self.rss_exceeded():
+                self.stats['rss_recycles'] += 1
+                await self.rotate_context()
+            await self.close_retired()
+
+    def is_broken(self, page, error=None):
+        """หน้านี้ crash หรือถูกปิดไปแล้วหรือไม่ (ดูจาก event และข้อความ error)"""
+        if page in self.crashed or page.is_closed():
+            return True
+        return bool(error) and any(marker in error for marker in BROKEN_PAGE_ERRORS)
+
+    def rss_exceeded(self):
+        """ตรวจ RSS ของ Chromium เป็นระยะ คืน True ถ้าเกินเพดาน"""
+        if not self.max_rss_mb or self.context is None:
+            return False
+        now = time.monotonic()
+        if now - self.last_rss_check < self.rss_check_interval:
+            return False
+        self.last_rss_check = now
+        rss = browser_rss_mb() or 0
+        self.peak_rss_mb = max(self.peak_rss_mb, rss)
+        return rss > self.max_rss_mb
+
+    async def rotate_context(self):
+        """เปิด context ใหม่ ส่วน context เดิมจะปิดเมื่อไม่มีหน้าที่ยืมอยู่"""
+        if self.context is not None:
+            self.retired.append(self.context)
+            self.stats['contexts_recycled'] += 1
+        self.context = await self.new_context()
+        self.context_uses = 0
+        self.leases[self.context] = 0
+        self.stats['contexts_opened'] += 1
+
+        # หน้าว่างของ context เดิมปิดได้เลย
+        for page in [page for page in self.idle if page.context is not self.context]:
+            self.idle.remove(page)
+            await self.close_page(page)
+
+    async def close_retired(self):
+        """ปิด context เก่าที่คืนหน้าครบแล้ว"""
+        for context in list(self.retired):
+            if self.leases.get(context, 0) <= 0:
+                self.retired.remove(context)
+                self.leases.pop(context, None)
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+
+    async def close_page(self, page):
+        self.uses.pop(page, None)
+        self.crashed.discard(page)
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception:
+            pass
+
+    async def close(self):
+        """ปิดทุกหน้าและทุก context"""
+        for page in list(self.idle):
+            await self.close_page(page)
+        self.idle = []
+        for context in self.retired + ([self.context] if self.context else []):
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self.retired = []
+        self.context = None
+
+    def print_stats(self):
+        """แสดงสถิติการเปลี่ยนหน้า/context ของ browser"""
+        stats = self.stats
+        if not stats['pages_opened']:
+            return
+        print(f"\n♻️ สถิติหน้า browser:")
+        print("=" * 50)
+        print(f"📑 เปิดหน้า: {stats['pages_opened']} (เปลี่ยนใหม่ตามรอบ {stats['pages_recycled']}, เสีย {stats['crashes']})")
+        print(f"🧳 context: เปิด {stats['contexts_opened']}, เปลี่ยนใหม่ {stats['contexts_recycled']} "
+              f"(เพราะ RSS เกิน {stats['rss_recycles']})")
+        if self.peak_rss_mb:
+            print(f"💾 RSS ของ Chromium สูงสุดที่วัดได้: {self.peak_rss_mb:.0f} MB")
@@ -0,0 +1,231 @@
+import argparse
+import re
+import time
+import unicodedata
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from record_sink import read_records, open_sink
+from tuition_normalizer import THAI_DIGITS
+
+# คำนำหน้าชื่อหลักสูตรที่ทุกหลักสูตรมีเหมือนกัน (ข้อความเป็นตัวพิมพ์เล็กแล้ว)
+# คำที่แยกหลักสูตรออกจากกัน เช่น นานาชาติ / ภาคพิเศษ / international ต้องไม่อยู่ในรายการนี้
+NAME_NOISE = [
+    r'วิศวกรรมศาสตรบัณฑิต', r'วศ\.\s*บ\.', r'หลักสูตร', r'สาขาวิชา', r'สาขา',
+    r'bachelor of engineering', r'b\.\s*eng\.?', r'program(?:me)? in', r'\bin\b'
+]
+NAME_NOISE_RE = re.compile('|'.join(NAME_NOISE))
+UNKNOWN = {'', 'ไม่ระบุ', 'ไม่พบข้อมูล'}
+
+# MinHash ใช้ hash 31 บิต คูณกับค่าสุ่ม 31 บิตแล้วไม่ล้น int64
+PRIME = (1 << 31) - 1
+
+
+def normalize_text(text):
+    """ตัวพิมพ์เล็ก, เลขไทย -> เลขอารบิก, ตัดคำนำหน้าที่ซ้ำกันทุกหลักสูตร, เหลือแค่ตัวอักษรไทย/อังกฤษ/ตัวเลข"""
+    text = unicodedata.normalize('NFKC', str(text or '')).lower().translate(THAI_DIGITS)
+    text = NAME_NOISE_RE.sub(' ', text)
+    text = re.sub(r'[^0-9a-z฀-๿]+', ' ', text)
+    return ' '.join(text.split())
+
+
+def shingles(text, k=3):
+    """ชุด n-gram ของตัวอักษร (ภาษาไทยไม่เว้นวรรคระหว่างคำ จึงใช้ตัวอักษรแทนคำ)"""
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class MinHasher:
+    """ลายเซ็น MinHash ขนาด num_perm ของชุด shingle (hash (a*x + b) mod p ทีละชุดด้วย numpy)"""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, PRIME, size=num_perm).astype(np.int64)
+        self.b = rng.randint(0, PRIME, size=num_perm).astype(np.int64)
+
+    def signature(self, items):
+        values = np.fromiter((zlib.crc32(item.encode('utf-8')) & PRIME for item in items), dtype=np.int64)
+        return ((np.outer(values, self.a) + self.b) % PRIME).min(axis=0)
+
+
+def lsh_candidates(signatures, groups, bands=16):
+    """คู่ index ที่มีลายเซ็นตรงกันอย่างน้อยหนึ่ง band และอยู่กลุ่มเดียวกัน (เช่นมหาวิทยาลัยเดียวกัน)
+
+    เทียบเฉพาะรายการที่ตกถังเดียวกัน จึงไม่ต้องเทียบทุกคู่ (sub-quadratic)
+    """
+    rows = signatures.shape[1] // bands
+    # ย่อแต่ละ band เหลือเลขเดียว (ถ้าชนกันโดยบังเอิญก็แค่ได้คู่เกิน ซึ่งจะถูกตรวจด้วย Jaccard อีกชั้น)
+    weights = np.random.RandomState(bands).randint(1, PRIME, size=rows).astype(np.int64)
+    band_keys = (signatures.reshape(len(signatures), bands, rows) * weights).sum(axis=2).tolist()
+
+    buckets = {}
+    for index, (keys, group) in enumerate(zip(band_keys, groups)):
+        for band, key in enumerate(keys):
+            buckets.setdefault((group, band, key), []).append(index)
+
+    pairs = set()
+    for members in buckets.values():
+        for position, first in enumerate(members):
+            for second in members[position + 1:]:
+                pairs.add((first, second))
+    return pairs
+
+
+class UnionFind:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, first, second):
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            # ราก = index ที่น้อยกว่า (record ที่มาก่อน)
+            self.parent[max(first, second)] = min(first, second)
+
+
+def completeness(record):
+    """จำนวนฟิลด์ที่มีข้อมูลจริง ใช้เลือก record ที่เก็บไว้"""
+    return sum(str(record.get(field) or '').strip() not in UNKNOWN for field in ('มหาวิทยาลัย', 'หลักสูตร', 'ค่าเทอม'))
+
+
+def dedupe_records(records, threshold=0.8, num_perm=64, bands=16):
+    """รวม record ที่เป็นหลักสูตรเดียวกัน (ชื่อหลักสูตรคล้ายกันใน มหาวิทยาลัยเดียวกัน และค่าเทอมตรงกัน)
+
+    คืน (record ที่เหลือตามลำดับเดิม, รายงานการรวม) รายงานมีทั้งคู่ที่รวมแล้ว (merged)
+    และคู่ที่ชื่อคล้ายแต่ค่าเทอมต่างกันจึงไม่รวม (kept)
+    """
+    records = list(records)
+    names = [normalize_text(record.get('หลักสูตร')) for record in records]
+    universities = [normalize_text(record.get('มหาวิทยาลัย')) for record in records]
+    tuitions = [re.sub(r'\s+', '', str(record.get('ค่าเทอม') or '')).translate(THAI_DIGITS) for record in records]
+
+    # ชื่อ + มหาวิทยาลัยที่ซ้ำกันทุกตัวอักษร คำนวณ MinHash ครั้งเดียว
+    # record ที่ไม่รู้ชื่อหลักสูตรหรือมหาวิทยาลัยไม่ถูกรวม (ชื่อเดียวกันคนละมหาวิทยาลัยอาจเป็นคนละหลักสูตร)
+    keys = {}
+    for index, (name, university) in enumerate(zip(names, universities)):
+        if name and university and all(str(records[index].get(field) or '').strip() not in UNKNOWN
+                                       for field in ('หลักสูตร', 'มหาวิทยาลัย')):
+            keys.setdefault((university, name), []).append(index)
+    key_list = list(keys)
+
+    hasher = MinHasher(num_perm)
+    key_shingles = [shingles(name) for _, name in key_list]
+    signatures = np.array([hasher.signature(items) for items in key_shingles]).reshape(len(key_list), num_perm)
+
+    # คู่ของชื่อที่ LSH เสนอ ตรวจซ้ำด้วย Jaccard จริงของ shingle
+    similar = [(1.0, key_index, key_index) for key_index in range(len(key_list))]
+    for first, second in lsh_candidates(signatures, [university for university, _ in key_list], bands):
+        similarity = jaccard(key_shingles[first], key_shingles[second])
+        if similarity >= threshold:
+            similar.append((similarity, first, second))
+
+    # รวมเฉพาะ record ที่ค่าเทอมตรงกัน ชื่อคล้ายแต่ค่าเทอมต่างอาจเป็นหลักสูตรปกติ/นานาชาติ จึงแค่รายงาน
+    # record ที่ไม่มีค่าเทอม รวมเข้ากับกลุ่มได้ถ้ากลุ่มนั้นมีค่าเทอมแบบเดียว
+    union = UnionFind(len(records))
+    kept_pairs = []
+    for similarity, first, second in similar:
+        by_tuition = {}
+        for index in keys[key_list[first]] + keys[key_list[second]]:
+            if tuitions[index] not in UNKNOWN:
+                by_tuition.setdefault(tuitions[index], index)
+        if len(by_tuition) == 1:
+            by_tuition.update({tuition: next(iter(by_tuition.values())) for tuition in UNKNOWN})
+        elif not by_tuition and first == second:
+            # ชื่อเดียวกันทุกตัวอักษรและไม่มีค่าเทอมเลย ถือเป็น record ซ้ำกัน
+            by_tuition = {tuition: keys[key_list[first]][0] for tuition in UNKNOWN}
+
+        for index in keys[key_list[first]] + keys[key_list[second]]:
+            if tuitions[index] in by_tuition:
+                union.union(by_tuition[tuitions[index]], index)
+        if first != second:
+            for index in keys[key_list[second]]:
+                if tuitions[index] not in by_tuition or union.find(index) != union.find(keys[key_list[first]][0]):
+                    kept_pairs.append((keys[key_list[first]][0], index, similarity))
+
+    clusters = {}
+    for index in range(len(records)):
+        clusters.setdefault(union.find(index), []).append(index)
+
+    result = []
+    report = []
+    for root in sorted(clusters):
+        members = clusters[root]
+        best = max(members, key=lambda index: (completeness(records[index]), -index))
+        result.append(records[best])
+        for index in members:
+            if index != best:
+                report.append(report_row('merged', records[best], records[index],
+                                         jaccard(shingles(names[best]), shingles(names[index]))))
+    for first, second, similarity in kept_pairs:
+        report.append(report_row('kept', records[first], records[second], similarity))
+    return result, report
+
+
+def report_row(action, kept, other, similarity):
+    return {
+        'action': action,
+        'similarity': round(similarity, 3),
+        'มหาวิทยาลัย': kept.get('มหาวิทยาลัย'),
+        'หลักสูตร (เก็บไว้)': kept.get('หลักสูตร'),
+        'หลักสูตร (ซ้ำ)': other.get('หลักสูตร'),
+        'ค่าเทอม (เก็บไว้)': kept.get('ค่าเทอม'),
+        'ค่าเทอม (ซ้ำ)': other.get('ค่าเทอม'),
+        'URL (เก็บไว้)': kept.get('URL'),
+        'URL (ซ้ำ)': other.get('URL')
+    }
+
+
+def print_dedupe_report(before, after, report):
+    """แสดงผลการรวม record ซ้ำ"""
+    merged = [row for row in report if row['action'] == 'merged']
+    kept = [row for row in report if row['action'] == 'kept']
+    print(f"\n🧬 รวมหลักสูตรซ้ำ: {before} -> {after} รายการ (รวม {len(merged)}, ชื่อคล้ายแต่ค่าเทอมต่าง {len(kept)})")
+    for row in merged[:5]:
+        print(f"   🔗 {str(row['หลักสูตร (ซ้ำ)'])[:50]} -> {str(row['หลักสูตร (เก็บไว้)'])[:50]} ({row['similarity']:.2f})")
+
+
+def write_report(report, path):
+    """บันทึกรายงานการรวมเป็น CSV (utf-8-sig เพื่อให้ Excel อ่านภาษาไทยได้)"""
+    pd.DataFrame(report, columns=list(report_row('', {}, {}, 0))).to_csv(path, index=False, encoding='utf-8-sig')
+    print(f"📝 บันทึกรายงานการรวมลง {path}")
+
+
+def main(args):
+    records = list(read_records(args.input))
+    start = time.perf_counter()
+    result, report = dedupe_records(records, args.threshold)
+    elapsed = time.perf_counter() - start
+
+    print_dedupe_report(len(records), len(result), report)
+    print(f"⚡ ใช้เวลา {elapsed * 1000:.0f} ms ({len(records)} รายการ)")
+
+    if args.report:
+        write_report(report, args.report)
+    if args.output:
+        sink = open_sink(args.output)
+        for record in result:
+            sink.write(record)
+        sink.close()
+        print(f"✅ บันทึก {len(result)} รายการลง {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="รวม record ของหลักสูตรเดียวกันที่ได้จากหลาย URL (MinHash/LSH)")
+    parser.add_argument('input', help='ไฟล์ record จาก scraper (.jsonl หรือ .parquet)')
+    parser.add_argument('-o', '--output', default=None, help='ไฟล์ record หลังรวม (.jsonl หรือ .parquet)')
+    parser.add_argument('--report', default='tcas_dedupe_report.csv', help='ไฟล์ CSV รายงานการรวม ("" = ไม่บันทึก)')
+    parser.add_argument('--threshold', type=float, default=0.8, help='ความคล้ายของชื่อหลักสูตร (Jaccard) ที่ถือว่าซ้ำ')
+    main(parser.parse_args())
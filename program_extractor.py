@@ -0,0 +1,242 @@
+import asyncio
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lxml import etree, html
+
+from keyword_matcher import KeywordMatcher
+
+# ข้อความที่ใช้หาชื่อหลักสูตรจากตาราง (เรียงตามลำดับความสำคัญ)
+PROGRAM_PATTERNS = [re.compile(p, re.IGNORECASE) for p in ['ชื่อหลักสูตร', 'หลักสูตร', 'program', 'course']]
+
+# แท็กที่ไม่นับเป็นข้อความของหน้า (เหมือน get_text ของ BeautifulSoup)
+SKIP_TAGS = {'script', 'style', 'template'}
+
+# <?xml ... encoding=...?> ต้นหน้า XHTML (lxml ไม่รับใน str)
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+def element_text(element):
+    """ข้อความใน element แบบเดียวกับ get_text(strip=True)"""
+    parts = []
+
+    def walk(node):
+        if not isinstance(node.tag, str) or node.tag in SKIP_TAGS:
+            return
+        if node.text:
+            parts.append(node.text.strip())
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail.strip())
+
+    walk(element)
+    return ''.join(parts)
+
+
+def next_element_sibling(element, tag=None):
+    """หา element ถัดไปในระดับเดียวกัน (ข้าม comment)"""
+    for sibling in element.itersiblings():
+        if isinstance(sibling.tag, str) and (tag is None or sibling.tag == tag):
+            return sibling
+    return None
+
+
+def parse_html(content):
+    """parse HTML ด้วย lxml (รับได้ทั้ง str และ bytes)"""
+    if not content or not content.strip():
+        # เอกสารว่าง (lxml จะ error) ให้เป็นหน้าเปล่าแทน
+        content = '<html></html>'
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8')
+        except UnicodeDecodeError:
+            # ให้ lxml เดา encoding จาก <meta charset> หรือ <?xml encoding?> เอง
+            return html.document_fromstring(content)
+    # ถอดรหัสแล้ว encoding ใน <?xml?> ไม่มีความหมาย และ lxml ไม่รับ str ที่มี declaration
+    return html.document_fromstring(XML_DECLARATION.sub('', content, count=1))
+
+
+def scan_program_page(content, matcher):
+    """อ่านหน้าโปรแกรมรอบเดียวแล้วดึงมหาวิทยาลัย ชื่อหลักสูตร และค่าใช้จ่าย
+
+    ให้ผลเหมือน extract_university / extract_program_name / extract_tuition_info
+    ของ TCASScraper แต่เดิน DOM เพียงครั้งเดียว พร้อมบอกว่าหน้ามีโลโก้
+    span.h-brand และบล็อก dt/dd ค่าใช้จ่ายหรือไม่ (matcher คือ KeywordMatcher)
+    """
+    root = parse_html(content)
+
+    university = None
+    has_brand = False
+    tuition = None
+    heading = None
+    title = None
+    # ชื่อหลักสูตรที่พบจากแต่ละ pattern (pattern แรกสุดที่พบชนะ)
+    table_names = [None] * len(PROGRAM_PATTERNS)
+    skip_depth = 0
+
+    def check_text(text, parent):
+        """ข้อความตรง pattern ไหน ให้ลองเอาข้อความของ element ถัดไปเป็นชื่อหลักสูตร"""
+        if not text or parent is None:
+            return
+        for index, pattern in enumerate(PROGRAM_PATTERNS):
+            if any(table_names[:index + 1]):
+                break
+            if pattern.search(text):
+                next_cell = next_element_sibling(parent)
+                if next_cell is not None:
+                    candidate = element_text(next_cell)
+                    if len(candidate) > 10 and matcher.search(candidate):
+                        table_names[index] = candidate
+
+    for event, node in etree.iterwalk(root, events=('start', 'end')):
+        tag = node.tag if isinstance(node.tag, str) else None
+
+        if event == 'end':
+            if tag in SKIP_TAGS:
+                skip_depth -= 1
+            # tail ของ node อยู่หลัง node ในเอกสาร และมี parent เป็น element ที่ครอบอยู่
+            if not skip_depth:
+                check_text(node.tail, node.getparent())
+            continue
+
+        if tag is None:
+            continue
+        if tag in SKIP_TAGS:
+            skip_depth += 1
+            continue
+        if skip_depth:
+            continue
+
+        if tag == 'span' and not has_brand and 'h-brand' in node.get('class', '').split():
+            for img in node.iter('img'):
+                if img.get('alt') is not None:
+                    has_brand = True
+                    alt_text = img.get('alt', '').strip()
+                    if alt_text.startswith('มหาวิทยาลัย') and len(alt_text) < 100:
+                        university = alt_text
+                    break
+
+        elif tag == 'dt' and tuition is None and 'ค่าใช้จ่าย' in element_text(node):
+            dd = next_element_sibling(node, 'dd')
+            if dd is not None:
+                tuition = element_text(dd)
+
+        elif tag in ('h1', 'h2', 'h3') and heading is None:
+            text = element_text(node)
+            if len(text) > 10 and matcher.search(text) and 'TCAS' not in text:
+                heading = text
+
+        elif tag == 'title' and title is None:
+            title = element_text(node)
+
+        check_text(node.text, node)
+
+    program_name = next((name for name in table_names if name), None) or heading
+    if not program_name and title and matcher.search(title):
+        program_name = title
+
+    return {
+        'มหาวิทยาลัย': university or 'ไม่ระบุ',
+        'หลักสูตร': program_name or 'ไม่ระบุ',
+        'ค่าเทอม': tuition if tuition is not None else 'ไม่พบข้อมูล',
+        'has_brand': has_brand,
+        'has_tuition': tuition is not None
+    }
+
+
+def program_record(fields, url):
+    """แปลงผลจาก scan_program_page เป็น record ของ programs_data (None ถ้าข้อมูลไม่พอ)"""
+    if fields['หลักสูตร'] == 'ไม่ระบุ' or len(fields['หลักสูตร']) <= 10:
+        return None
+
+    return {
+        'มหาวิทยาลัย': fields['มหาวิทยาลัย'],
+        'หลักสูตร': fields['หลักสูตร'],
+        'ค่าเทอม': fields['ค่าเทอม'],
+        'URL': url
+    }
+
+
+# KeywordMatcher ของแต่ละ worker process (สร้างครั้งเดียวตอนเริ่ม process)
+worker_matcher = None
+
+
+def init_parse_worker(keywords):
+    """ตัวเริ่มต้นของ worker process: compile คำสำคัญเก็บไว้ใช้ทุกงาน"""
+    global worker_matcher
+    worker_matcher = KeywordMatcher(keywords)
+
+
+def parse_program_html(content, url, require_static):
+    """งานที่รันใน worker process: HTML -> (record, มีข้อมูลครบแบบ static, เวลาที่ใช้)"""
+    start = time.perf_counter()
+    fields = scan_program_page(content, worker_matcher)
+    is_static = fields['has_brand'] and fields['has_tuition']
+    record = None if require_static and not is_static else program_record(fields, url)
+    return record, is_static, time.perf_counter() - start
+
+
+class ParsePool:
+    """process pool สำหรับ parse HTML เพื่อไม่ให้ event loop ของการ crawl หยุดรอ"""
+
+    def __init__(self, workers, keywords):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_parse_worker,
+            initargs=(list(keywords),)
+        )
+        self.submitted = 0
+        self.completed = 0
+        self.max_depth = 0
+        self.depth_total = 0
+        self.busy_time = 0.0
+        self.started_at = None
+
+    async def parse(self, content, url, require_static=False):
+        """ส่ง HTML ไป parse ใน worker แล้วรอผล (คืน record หรือ None)"""
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+
+        # ความลึกของคิว = งานที่ส่งแล้วแต่ยังไม่เสร็จ (รวมงานนี้)
+        self.submitted += 1
+        depth = self.submitted - self.completed
+        self.max_depth = max(self.max_depth, depth)
+        self.depth_total += depth
+
+        loop = asyncio.get_running_loop()
+        try:
+            record, is_static, elapsed = await loop.run_in_executor(
+                self.executor, parse_program_html, content, url, require_static
+            )
+        finally:
+            self.completed += 1
+
+        self.busy_time += elapsed
+        return record
+
+    def stats(self):
+        """สถิติของ pool: ความลึกคิวและสัดส่วนเวลาที่ worker ทำงานจริง"""
+        wall = time.perf_counter() - self.started_at if self.started_at else 0
+        return {
+            'workers': self.workers,
+            'parsed': self.completed,
+            'max_queue_depth': self.max_depth,
+            'avg_queue_depth': self.depth_total / self.submitted if self.submitted else 0,
+            'utilization': self.busy_time / (self.workers * wall) if wall else 0
+        }
+
+    def print_stats(self):
+        """แสดงสถิติของ parse pool"""
+        stats = self.stats()
+        print(f"\n⚙️ สถิติ parse pool ({stats['workers']} process):")
+        print("=" * 50)
+        print(f"📄 parse แล้ว: {stats['parsed']} หน้า")
+        print(f"📥 ความลึกคิว: สูงสุด {stats['max_queue_depth']}, เฉลี่ย {stats['avg_queue_depth']:.1f}")
+        print(f"🔥 การใช้งาน worker: {stats['utilization'] * 100:.1f}%")
+
+    def close(self):
+        """ปิด worker process ทั้งหมด"""
+        self.executor.shutdown(cancel_futures=True)
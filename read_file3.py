@@ -1,5 +1,7 @@
 import asyncio
-from playwright.async_api import async_playwright
+import os
+from collections import Counter, deque
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
 import pandas as pd
 import re
@@ -7,20 +9,267 @@ from urllib.parse import urljoin, urlparse
 import time
 import json
 from datetime import datetime
-import requests
+import httpx
+from http_cache import HTTPCache
+from crawl_journal import CrawlJournal
+from program_extractor import scan_program_page, program_record, ParsePool
+from keyword_matcher import KeywordMatcher
+from crawl_metrics import CrawlMetrics
+from listing_discovery import ListingDiscovery, DEFAULT_PROGRAM_URL_TEMPLATE
+from host_throttle import HostThrottle
+from record_sink import open_sink, read_records
+from url_dedupe import canonicalize_url, SeenSet
+from page_pool import PagePool
+from url_frontier import Frontier, default_owner
+from har_archive import HarRecorder, HarReplay
+from fetch_policy import FetchPolicy, is_retryable, is_final
+from url_prober import UrlProber, expand_pattern, parse_range, DEFAULT_PROBE_PATTERN, DEFAULT_PROBE_RANGES
+from program_dedupe import dedupe_records, print_dedupe_report, write_report
+from excel_export import write_rows, sort_rows, RECORD_LAYOUT, DASHBOARD_LAYOUT, SHEET_NAME, XLSXWRITER_AVAILABLE
+from tuition_normalizer import normalize_tuition, DASHBOARD_COLUMNS
+
+try:
+    import h2  # noqa: F401  ใช้ HTTP/2 เมื่อมีแพ็กเกจ h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# คำที่บอกว่าลิงก์ไม่เกี่ยวกับหลักสูตร
+EXCLUDED_LINK_WORDS = ['login', 'register', 'contact', 'about', 'news', 'facebook', 'twitter']
+
+# element ที่ต้องมีก่อนเริ่มทำงานกับหน้า (แทนการรอเวลาตายตัว)
+SEARCH_INPUT_SELECTOR = '#search, input[type="search"], input[name="q"], input[placeholder*="ค้นหา"], .search-box input'
+SEARCH_RESULT_SELECTOR = 'a[href*="/programs/"]'
+PROGRAM_READY_SELECTORS = ['dt:has-text("ค่าใช้จ่าย")', 'span.h-brand img[alt]']
+READY_TIMEOUT = 10000  # มิลลิวินาที
+# หลังหน้า render แล้ว (element แรกปรากฏ) รอ element ที่เหลือเพิ่มไม่เกินนี้ หน้าที่ไม่มีค่าใช้จ่ายจริงจะได้ไม่ต้องรอจนครบ READY_TIMEOUT
+READY_GRACE = 2000  # มิลลิวินาที
+
+# จำนวนครั้งที่ส่งลิงก์กลับเข้าคิวเมื่อหน้า browser crash ระหว่างดึงข้อมูล
+MAX_PAGE_RETRIES = 2
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# โปรไฟล์การ render หน้าเว็บ
+#   block_resource_types: ชนิด resource ที่ไม่ต้องโหลด (ตัวดึงข้อมูลอ่านแค่ DOM)
+#   allow_hosts: host ที่อนุญาตให้โหลด resource (None = ทุก host, host ของ base_url อนุญาตเสมอ)
+#   deny_hosts: host ที่บล็อกเสมอ (analytics/โฆษณา)
+RENDER_PROFILES = {
+    'full': {
+        'viewport': {'width': 1920, 'height': 1080},
+        'args': ['--start-maximized'],
+        'wait_until': 'networkidle',
+        'block_resource_types': [],
+        'allow_hosts': None,
+        'deny_hosts': []
+    },
+    'lean': {
+        'viewport': {'width': 1280, 'height': 800},
+        'args': [],
+        'wait_until': 'domcontentloaded',
+        'block_resource_types': ['image', 'media', 'font', 'stylesheet', 'texttrack', 'eventsource', 'websocket', 'manifest'],
+        'allow_hosts': ['mytcas.com'],
+        'deny_hosts': [
+            'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+            'facebook.net', 'facebook.com', 'hotjar.com', 'clarity.ms'
+        ]
+    }
+}
+
+class ExtractionPool:
+    """คิวกลางของลิงก์ที่ต้องดึงข้อมูล พร้อม worker ที่ดึงข้อมูลพร้อมกัน
+
+    ส่งลิงก์เข้าได้เรื่อย ๆ ระหว่างที่ worker ทำงานอยู่ (pipeline กับการค้นหา)
+    ลิงก์ซ้ำ (เทียบหลัง canonicalize_url) จะถูกตัดทิ้ง และผลลัพธ์เรียงตาม key ที่เล็กที่สุดของแต่ละลิงก์
+    จึงได้ลำดับเดิมทุกครั้งไม่ว่าการค้นหาหรือการดึงข้อมูลจะเสร็จก่อนหลังอย่างไร
+    ถ้า scraper มี sink จะเขียน record ลง sink ทันทีที่ได้แทนการเก็บไว้ในหน่วยความจำ
+    check_seen=False: ไม่ข้ามลิงก์ที่อยู่ใน SeenSet (ลิงก์จาก frontier ถูกกรองตอนเพิ่มแล้ว)
+    """
+
+    def __init__(self, scraper, check_seen=True):
+        self.scraper = scraper
+        self.check_seen = check_seen
+        self.queue = asyncio.Queue()
+        self.keys = {}       # url -> key สำหรับเรียงลำดับ
+        self.results = {}    # url -> record (เฉพาะเมื่อไม่มี sink)
+        self.errors = {}     # url -> สาเหตุที่ไม่ได้ข้อมูล
+        self.succeeded = 0
+        self.total = 0
+        self.started = 0
+        self.resumed = 0
+        self.duplicates = 0  # ลิงก์ที่ไม่ต้องดึงเพราะซ้ำกับที่อยู่ในคิวแล้ว
+        self.skipped_seen = 0  # ลิงก์ที่ดึงไปแล้วในรอบก่อน (SeenSet)
+        self.retry = deque()  # ลิงก์ที่ต้องดึงใหม่เพราะหน้า crash (worker หยิบก่อนคิวหลัก)
+        self.retries = {}     # url -> จำนวนครั้งที่ดึงใหม่
+        self.spans = {}       # url -> span ของลิงก์ที่รอดึงใหม่ (นับเป็น URL เดียวใน metrics)
+        self.workers = [
+            asyncio.create_task(scraper.extraction_worker(worker_id, self))
+            for worker_id in range(scraper.concurrency)
+        ]
+
+    def submit(self, key, link):
+        """ส่งลิงก์เข้าคิว คืน True ถ้าเป็นลิงก์ใหม่"""
+        link = canonicalize_url(link)
+        if link in self.keys:
+            self.keys[link] = min(self.keys[link], key)
+            self.duplicates += 1
+            return False
+        
+        self.keys[link] = key
+        
+        seen = self.scraper.seen
+        journal = self.scraper.journal
+        if seen and self.check_seen and not (journal and link in journal.completed) and seen.is_recent(link):
+            self.skipped_seen += 1
+            self.scraper.seen_skipped.append(link)
+            return False
+        
+        self.total += 1
+        if journal and link in journal.completed:
+            # ดึงข้อมูลเสร็จแล้วในรอบก่อน ใช้ผลจาก journal
+            self.resumed += 1
+            if journal.completed[link]:
+                self.add_result(link, journal.completed[link])
+        else:
+            self.queue.put_nowait(link)
+        return True
+
+    def add_result(self, link, record):
+        """เก็บ record ที่ได้ (เขียนลง sink ทันทีถ้ามี)"""
+        self.succeeded += 1
+        if self.scraper.sink:
+            self.scraper.sink.write(record)
+        else:
+            self.results[link] = record
+
+    def submit_all(self, group, links):
+        """ส่งลิงก์ทั้งชุด (key = (group, ลำดับในชุด)) คืนจำนวนลิงก์ใหม่"""
+        return sum(self.submit((group, position), link) for position, link in enumerate(links))
+
+    async def close(self):
+        """รอให้ worker ทำคิวจนหมด แล้วคืน record เรียงตาม key (list ว่างถ้าเขียนลง sink)"""
+        for _ in self.workers:
+            self.queue.put_nowait(None)
+        await asyncio.gather(*self.workers)
+        
+        if self.resumed:
+            print(f"   ⏭️ ใช้ผลจาก journal {self.resumed} ลิงก์ (ไม่ต้องดึงใหม่)")
+        if self.duplicates:
+            print(f"   🔁 ตัดลิงก์ซ้ำ {self.duplicates} ลิงก์ (รวม URL ที่เขียนต่างกันแต่เป็นหน้าเดียวกัน)")
+        if self.skipped_seen:
+            print(f"   🕘 ข้าม {self.skipped_seen} ลิงก์ที่ดึงไปแล้วในรอบก่อน")
+        if self.errors:
+            reasons = Counter(self.errors.values()).most_common()
+            print(f"   ❌ ไม่ได้ข้อมูล {len(self.errors)} ลิงก์: " + ", ".join(f"{reason} {count}" for reason, count in reasons))
+        return [self.results[link] for link in sorted(self.results, key=self.keys.get)]
+
+
+class FrontierFeeder:
+    """ใช้แทน ExtractionPool เมื่อ scraper มี frontier: ส่งลิงก์ที่ค้นพบเข้า frontier
+
+    ตอนปิดจะช่วยดึงข้อมูลจาก frontier จนหมด (รอ worker process อื่นด้วย)
+    """
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+        self.total = 0
+        self.succeeded = 0
+
+    def submit(self, key, link):
+        """เพิ่มลิงก์เข้า frontier คืน True ถ้าเป็นลิงก์ใหม่"""
+        link = canonicalize_url(link)
+        seen = self.scraper.seen
+        if seen and seen.is_recent(link):
+            self.scraper.seen_skipped.append(link)
+            return False
+        added = self.scraper.frontier.add([link])
+        self.total += added
+        return bool(added)
+
+    def submit_all(self, group, links):
+        return sum(self.submit((group, position), link) for position, link in enumerate(links))
+
+    async def close(self):
+        """บอก worker ว่าเพิ่มลิงก์ครบแล้ว แล้วดึงข้อมูลจาก frontier จนหมด (record อยู่ใน frontier)"""
+        frontier = self.scraper.frontier
+        frontier.mark_seeded()
+        await self.scraper.crawl_frontier()
+        
+        counts = frontier.counts()
+        self.total = sum(counts.values())
+        self.succeeded = counts['done']
+        return []
+
 
 class TCASScraper:
-    def __init__(self):
+    def __init__(self, concurrency=4, cache_dir='.tcas_cache', journal=None, render_profile='lean',
+                 extractor='lxml', parse_workers=None, metrics_path=None, verbose=True,
+                 rate_limit=2.0, burst=4, sink=None, seen=None, page_max_navigations=50,
+                 browser_max_rss_mb=1500, frontier=None, har_record=None, har_replay=None,
+                 deadline=45.0, retries=2, breaker_threshold=5, breaker_cooldown=60.0):
         self.base_url = "https://www.mytcas.com"
         self.programs_data = []
+        
+        # ที่เขียน record ทันทีที่ได้ (JsonlSink/ParquetSink, None = เก็บใน programs_data)
+        self.sink = sink
         self.browser = None
-        self.page = None
-        self.session = requests.Session()
+        self.browser_lock = asyncio.Lock()
+        
+        # หน้า browser ที่ยืมใช้ร่วมกัน เปลี่ยนใหม่ทุก page_max_navigations ครั้ง
+        # หรือเมื่อ RSS ของ Chromium เกิน browser_max_rss_mb (0 = ไม่จำกัด)
+        self.page_pool = None
+        self.page_max_navigations = page_max_navigations
+        self.browser_max_rss_mb = browser_max_rss_mb
+        
+        # จำนวนหน้าที่ดึงข้อมูลพร้อมกัน
+        self.concurrency = max(1, int(concurrency))
+        
+        # HTTP client แบบ async (สร้างเมื่อใช้งานครั้งแรก)
+        self.http = None
         
-        # User agent
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        # จำกัด request ต่อวินาทีแยกตาม host และชะลอเองเมื่อเจอ 429/5xx
+        self.throttle = HostThrottle(rate_limit, burst)
+        
+        # เวลารวมต่อ URL, การลองใหม่ และ circuit breaker ต่อ host
+        self.policy = FetchPolicy(deadline, retries, breaker_threshold=breaker_threshold,
+                                  breaker_cooldown=breaker_cooldown)
+        
+        # cache ของหน้า HTML บนดิสก์ (None = ไม่ใช้ cache)
+        self.cache = HTTPCache(cache_dir) if cache_dir else None
+        
+        # journal สำหรับ resume เมื่อการ crawl หยุดกลางทาง (CrawlJournal หรือ None)
+        self.journal = journal
+        
+        # URL ที่เคยดึงแล้วข้ามรอบการ crawl (SeenSet หรือ None) และลิงก์ที่ข้ามไปในรอบนี้
+        self.seen = seen
+        self.seen_skipped = []
+        
+        # คิว URL ที่ใช้ร่วมกับ process อื่น (Frontier หรือ None = ดึงข้อมูลใน process นี้เท่านั้น)
+        self.frontier = frontier
+        
+        # HAR: บันทึก network ทั้งหมดลงโฟลเดอร์ har_record หรือเล่นซ้ำจาก har_replay โดยไม่ต่อ network
+        self.har_record = har_record
+        self.har_recorder = HarRecorder(os.path.join(har_record, 'static.har')) if har_record else None
+        self.har_replay = HarReplay(har_replay) if har_replay else None
+        self.har_contexts = 0
+        
+        # เวลาต่อขั้นตอนของทุก URL (เขียน JSON lines ถ้ากำหนด metrics_path)
+        self.metrics = CrawlMetrics(metrics_path)
+        
+        # False = ไม่แสดงข้อความรายลิงก์/รายฟิลด์ (quiet mode)
+        self.verbose = verbose
+        
+        # โปรไฟล์การ render และตัวนับ request ที่ถูกบล็อก
+        self.render_profile = RENDER_PROFILES[render_profile]
+        self.render_stats = {
+            'requests': 0,
+            'blocked': 0,
+            'blocked_by': {},
+            'bytes_loaded': 0
+        }
+        
+        # ตัวแยกข้อมูล: 'lxml' = อ่าน DOM รอบเดียว, 'bs4' = ตัวเดิม (ไว้เทียบผล)
+        self.extractor = extractor
         
         # คำสำคัญสำหรับโปรแกรม
         self.target_keywords = [
@@ -28,31 +277,138 @@ class TCASScraper:
             'ปัญญาประดิษฐ์', 'artificial intelligence', 'ai',
             'วิศวกรรม', 'engineering'
         ]
+        
+        # compile คำสำคัญครั้งเดียว ใช้ซ้ำทุกลิงก์และทุกหน้า
+        self.keyword_matcher = KeywordMatcher(self.target_keywords)
+        self.excluded_matcher = KeywordMatcher(EXCLUDED_LINK_WORDS)
+        
+        # process pool สำหรับ parse HTML (None = ใช้ทุก core, 0 = parse ใน event loop)
+        if parse_workers is None:
+            parse_workers = os.cpu_count() or 1
+        self.parse_workers = parse_workers
+        self.parse_pool = None
+        
+        # เวลาที่ใช้เก็บลิงก์จากหน้าผลค้นหา แยกตามคำค้น (วินาที)
+        self.harvest_times = {}
 
-    async def init_browser(self, headless=False, slow_mo=500):
+    async def init_browser(self, headless=False, slow_mo=0):
         """เริ่มต้น browser"""
         print("🚀 เริ่มต้น browser...")
         
+        profile = self.render_profile
+        
         self.playwright = await async_playwright().start()
         self.browser = await self.playwright.chromium.launch(
             headless=headless,
             slow_mo=slow_mo,
-            args=['--start-maximized', '--no-sandbox', '--disable-blink-features=AutomationControlled']
+            args=profile['args'] + ['--no-sandbox', '--disable-blink-features=AutomationControlled']
         )
         
-        self.context = await self.browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080}
+        self.page_pool = PagePool(
+            self.new_context,
+            max_navigations=self.page_max_navigations,
+            context_navigations=self.page_max_navigations * self.concurrency * 4,
+            max_rss_mb=self.browser_max_rss_mb
         )
         
-        self.page = await self.context.new_page()
-        self.page.set_default_timeout(30000)
-        
         print("✅ Browser พร้อมใช้งาน")
 
+    async def new_context(self):
+        """สร้าง browser context ใหม่ตามโปรไฟล์การ render (PagePool เรียกเมื่อเปลี่ยน context)"""
+        profile = self.render_profile
+        options = {}
+        if self.har_record:
+            # Playwright เขียนไฟล์ HAR ของ context ตอนปิด context (แต่ละ context ได้ไฟล์ของตัวเอง)
+            self.har_contexts += 1
+            options['record_har_path'] = os.path.join(self.har_record, f'browser-{self.har_contexts}.har')
+            options['record_har_content'] = 'embed'
+        
+        context = await self.browser.new_context(
+            user_agent=USER_AGENT,
+            viewport=profile['viewport'],
+            **options
+        )
+        
+        if self.har_replay:
+            # route ที่ลงทะเบียนทีหลังถูกเรียกก่อน: ลองทุกไฟล์ HAR แล้วยกเลิก request ที่ไม่มีในไฟล์ใดเลย
+            await context.route('**/*', lambda route: route.abort())
+            for path in self.har_replay.paths:
+                await context.route_from_har(path, not_found='fallback')
+        elif profile['block_resource_types'] or profile['allow_hosts'] or profile['deny_hosts']:
+            # ดัก request เฉพาะเมื่อโปรไฟล์มีกฎการบล็อก
+            await context.route('**/*', self.route_request)
+        context.on('response', self.count_response_bytes)
+        return context
+
+    def block_reason(self, resource_type, url):
+        """คืนเหตุผลที่ต้องบล็อก request ตามโปรไฟล์ หรือ None ถ้าให้โหลดได้"""
+        profile = self.render_profile
+        
+        # ตัวเอกสารหลักต้องโหลดเสมอ
+        if resource_type == 'document':
+            return None
+        
+        if resource_type in profile['block_resource_types']:
+            return f"type:{resource_type}"
+        
+        host = (urlparse(url).hostname or '').lower()
+        if any(host == h or host.endswith('.' + h) for h in profile['deny_hosts']):
+            return 'host:deny'
+        
+        if profile['allow_hosts'] is not None:
+            allowed = profile['allow_hosts'] + [urlparse(self.base_url).hostname]
+            if not any(host == h or host.endswith('.' + h) for h in allowed):
+                return 'host:third-party'
+        
+        return None
+
+    async def route_request(self, route):
+        """ตัวดัก request ของ browser: บล็อก resource ที่ตัวดึงข้อมูลไม่ได้ใช้"""
+        request = route.request
+        self.render_stats['requests'] += 1
+        
+        reason = self.block_reason(request.resource_type, request.url)
+        if reason:
+            self.render_stats['blocked'] += 1
+            self.render_stats['blocked_by'][reason] = self.render_stats['blocked_by'].get(reason, 0) + 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def count_response_bytes(self, response):
+        """นับจำนวน byte ที่ browser โหลดจริง (จาก Content-Length)"""
+        try:
+            self.render_stats['bytes_loaded'] += int(response.headers.get('content-length', 0))
+        except ValueError:
+            pass
+
+    def init_http(self):
+        """เริ่มต้น HTTP client แบบ async (keep-alive + HTTP/2 ถ้าทำได้)"""
+        self.http = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            headers={'User-Agent': USER_AGENT},
+            timeout=10,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.concurrency * 2,
+                max_keepalive_connections=self.concurrency * 2
+            )
+        )
+
     async def close_browser(self):
         """ปิด browser"""
         try:
+            if self.http:
+                await self.http.aclose()
+            if self.cache:
+                self.cache.close()
+            if self.parse_pool:
+                self.parse_pool.close()
+            self.metrics.close()
+            if self.page_pool:
+                await self.page_pool.close()
+            if self.har_recorder:
+                self.har_recorder.close()
             if self.browser:
                 await self.browser.close()
             if hasattr(self, 'playwright'):
@@ -61,43 +417,160 @@ class TCASScraper:
             print(f"⚠️ Warning: {e}")
 
     async def search_via_website(self):
-        """ค้นหาผ่านเว็บไซต์"""
+        """ค้นหาผ่านเว็บไซต์ (ทุกคำค้นพร้อมกัน) แล้วส่งลิงก์ให้ worker ดึงข้อมูลทันทีที่พบ"""
         print("🎯 เริ่มการรวบรวมข้อมูลผ่านเว็บไซต์...")
-        links = []
         
+        search_terms = [
+            'วิศวกรรมคอมพิวเตอร์',
+            'computer engineering', 
+            'วิศวกรรมปัญญาประดิษฐ์',
+            'artificial intelligence engineering',
+            'ai engineering',
+            'com engineering'
+        ]
+        
+        # worker ดึงข้อมูลเริ่มรอคิวตั้งแต่ตอนนี้ ไม่ต้องรอให้ค้นหาครบทุกคำ
+        pool = self.new_pool()
+        
+        # คำที่ค้นหาเสร็จแล้วใน journal ใช้ลิงก์เดิมได้เลย
+        pending = []
+        for term_index, term in enumerate(search_terms):
+            if self.journal and term in self.journal.searches:
+                print(f"   ⏭️ ข้าม (ค้นหาแล้ว): {term}")
+                pool.submit_all(term_index, self.journal.searches[term])
+            else:
+                pending.append((term_index, term))
+        
+        if pending:
+            await self.ensure_browser()
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(
+            self.search_term_task(term_index, term, pool, semaphore)
+            for term_index, term in pending
+        ))
+        
+        print(f"📊 รวมทั้งหมด: {pool.total} ลิงก์ (ไม่ซ้ำ)")
+        if not pool.total:
+            print("❌ ไม่พบลิงก์")
+        
+        success = await pool.close()
+        self.programs_data.extend(success)
+        
+        print(f"\n🎯 สรุป: ดึงข้อมูลสำเร็จ {pool.succeeded}/{pool.total} ลิงก์")
+
+    async def crawl_listings(self, seeds=None, program_url_template=DEFAULT_PROGRAM_URL_TEMPLATE):
+        """หาหน้าโปรแกรมจากหน้ารายการ/sitemap/JSON (ไม่ใช้ช่องค้นหา) แล้วดึงข้อมูลแบบ pipeline"""
+        print("🗺️ เริ่มไล่หน้าโปรแกรมจากหน้ารายการและ sitemap...")
+        
+        pool = self.new_pool()
+        discovery = ListingDiscovery(self.fetch_static, seeds=seeds, concurrency=self.concurrency * 2,
+                                     program_url_template=program_url_template)
+        
+        # ส่งหน้าโปรแกรมเข้าคิวทันทีที่พบ (เรียงผลตาม URL)
+        await discovery.discover(on_found=lambda urls: [pool.submit(url, url) for url in urls])
+        
+        print(f"📊 รวมทั้งหมด: {pool.total} ลิงก์ (ไม่ซ้ำ)")
+        if not pool.total:
+            print("❌ ไม่พบลิงก์")
+        
+        success = await pool.close()
+        self.programs_data.extend(success)
+        
+        print(f"\n🎯 สรุป: ดึงข้อมูลสำเร็จ {pool.succeeded}/{pool.total} ลิงก์")
+
+    async def probe_programs(self, pattern=DEFAULT_PROBE_PATTERN, ranges=None):
+        """เดา URL หน้าโปรแกรมจากรูปแบบรหัส แล้วส่งหน้าที่มีอยู่จริงเข้าคิวดึงข้อมูลทันทีที่เจอ"""
+        print("🎯 เริ่มทดสอบ URL หน้าโปรแกรมจากรูปแบบรหัส...")
+        
+        pool = self.new_pool()
+        prober = UrlProber(self.probe_request, concurrency=self.concurrency * 8)
+        await prober.probe(expand_pattern(pattern, ranges or DEFAULT_PROBE_RANGES),
+                           on_found=lambda urls: [pool.submit(url, url) for url in urls])
+        
+        print(f"📊 รวมทั้งหมด: {pool.total} ลิงก์ (ไม่ซ้ำ)")
+        if not pool.total:
+            print("❌ ไม่พบลิงก์")
+        
+        success = await pool.close()
+        self.programs_data.extend(success)
+        
+        print(f"\n🎯 สรุป: ดึงข้อมูลสำเร็จ {pool.succeeded}/{pool.total} ลิงก์")
+
+    async def probe_request(self, method, url, headers=None):
+        """request เบา ๆ (HEAD หรือ GET แบบ Range) ผ่าน throttle ของ host คืน (status_code, final_url)"""
+        if self.har_replay:
+            response = self.har_replay.lookup(url)
+            return (response[0] if response else 404), url
+        
+        if self.http is None:
+            self.init_http()
+        
+        await self.throttle.acquire(url)
         try:
-            await self.page.goto(self.base_url, wait_until='networkidle')
-            await self.page.wait_for_timeout(3000)
+            response = await self.http.request(method, url, headers=headers)
+        except httpx.HTTPError:
+            self.throttle.record(url, None)
+            raise
+        self.throttle.record(url, response.status_code, response.headers.get('Retry-After'))
+        return response.status_code, str(response.url)
+
+    def new_pool(self):
+        """คิวดึงข้อมูลของรอบนี้ (ส่งเข้า frontier แทนถ้ามี frontier)"""
+        return FrontierFeeder(self) if self.frontier else ExtractionPool(self)
+
+    async def crawl_frontier(self, poll_interval=2.0):
+        """ยืม URL จาก frontier มาดึงข้อมูลทีละชุดจนกว่า frontier จะหมด
+
+        รันหลาย process (หรือหลายเครื่องที่เห็นไฟล์เดียวกัน) พร้อมกันได้ แต่ละ URL ถูกยืมไปทำทีละ worker
+        """
+        owner = default_owner()
+        batch_size = self.concurrency * 2
+        while True:
+            links = self.frontier.lease(owner, batch_size)
+            if not links:
+                if self.frontier.is_drained():
+                    break
+                # รอ URL ใหม่จากตัวค้นหา หรือ lease ของ worker อื่นที่หมดอายุ
+                await asyncio.sleep(poll_interval)
+                continue
             
-            search_terms = [
-                'วิศวกรรมคอมพิวเตอร์',
-                'computer engineering', 
-                'วิศวกรรมปัญญาประดิษฐ์',
-                'artificial intelligence engineering',
-                'ai engineering',
-                'com engineering'
-            ]
+            pool = ExtractionPool(self, check_seen=False)
+            for position, link in enumerate(links):
+                pool.submit(position, link)
+            await pool.close()
             
-            for term in search_terms:
-                print(f"   🔍 ค้นหา: {term}")
-                term_links = await self.perform_search(term)
-                links.extend(term_links)
-                await self.page.wait_for_timeout(1000)
+            for link in links:
+                if link in pool.results:
+                    self.frontier.complete(link, pool.results[link])
+                else:
+                    # ไม่พบหน้า/ไม่ใช่หน้าโปรแกรม ลองใหม่ก็ได้ผลเดิม คืนเข้าคิวเฉพาะที่ล้มเหลวชั่วคราว
+                    error = pool.errors.get(link, 'no_data')
+                    self.frontier.fail(link, error, final=is_final(error))
+
+    async def search_term_task(self, term_index, term, pool, semaphore):
+        """ค้นหาหนึ่งคำบนหน้าของตัวเอง แล้วส่งลิงก์ใหม่เข้าคิวดึงข้อมูล"""
+        async with semaphore:
+            page = await self.page_pool.acquire()
+            try:
+                await self.goto(page, self.base_url)
+                await page.wait_for_selector(SEARCH_INPUT_SELECTOR, state='visible', timeout=READY_TIMEOUT)
                 
-        except Exception as e:
-            print(f"   ❌ ไม่สามารถค้นหาผ่านเว็บไซต์: {e}")
+                print(f"   🔍 ค้นหา: {term}")
+                term_links = await self.perform_search(term, page)
+            except Exception as e:
+                print(f"   ❌ ไม่สามารถค้นหา '{term}': {e}")
+                return
+            finally:
+                await self.page_pool.release(page, broken=self.page_pool.is_broken(page))
         
-        # รวมและลบซ้ำ
-        unique_links = list(set(links))
-        print(f"📊 รวมทั้งหมด: {len(unique_links)} ลิงก์ (ไม่ซ้ำ)")
+        if self.journal:
+            self.journal.log_search(term, term_links)
         
-        # ดึงข้อมูลจากทุกลิงก์
-        if unique_links:
-            await self.extract_comprehensive_data(unique_links)
-        else:
-            print("❌ ไม่พบลิงก์")
+        added = pool.submit_all(term_index, term_links)
+        print(f"   📥 '{term}': พบ {len(term_links)} ลิงก์ (ใหม่ {added})")
 
-    async def perform_search(self, search_term):
+    async def perform_search(self, search_term, page):
         """ดำเนินการค้นหา"""
         found_links = []
         
@@ -110,7 +583,7 @@ class TCASScraper:
             
             search_input = None
             for selector in search_selectors:
-                search_input = await self.page.query_selector(selector)
+                search_input = await page.query_selector(selector)
                 if search_input:
                     break
             
@@ -118,106 +591,333 @@ class TCASScraper:
                 await search_input.fill('')
                 await search_input.fill(search_term)
                 await search_input.press('Enter')
-                await self.page.wait_for_timeout(3000)
+                try:
+                    await page.wait_for_selector(SEARCH_RESULT_SELECTOR, timeout=READY_TIMEOUT)
+                except PlaywrightTimeoutError:
+                    # ไม่มีผลลัพธ์ (หรือโหลดช้าเกินไป) ให้เก็บเท่าที่มี
+                    pass
+                
+                # รวบรวมลิงก์ทั้งหน้าใน browser ครั้งเดียว แทนการถามทีละลิงก์
+                harvest_start = time.perf_counter()
+                pairs = await page.eval_on_selector_all(
+                    'a[href]',
+                    'anchors => anchors.map(a => [a.getAttribute("href"), a.innerText])'
+                )
+                found_links, keywords = self.filter_relevant_links(pairs)
+                harvest_time = time.perf_counter() - harvest_start
+                
+                self.harvest_times[search_term] = harvest_time
+                print(f"     ⏱️ เก็บลิงก์ {len(pairs)} รายการ (เกี่ยวข้อง {len(found_links)}) ใน {harvest_time:.2f} วินาที")
+                if keywords:
+                    print("     🔑 คำสำคัญที่ตรง: " + ", ".join(f"{keyword} {count}" for keyword, count in keywords.most_common(5)))
                 
-                # รวบรวมลิงก์
-                links = await self.page.query_selector_all('a[href]')
-                for link in links:
-                    try:
-                        href = await link.get_attribute('href')
-                        text = await link.inner_text()
-                        
-                        if href and self.is_relevant_link(text, href):
-                            full_url = urljoin(self.base_url, href)
-                            found_links.append(full_url)
-                    except:
-                        continue
-                        
         except Exception as e:
             print(f"     ❌ เกิดข้อผิดพลาด: {e}")
         
         return found_links
 
+    def filter_relevant_links(self, pairs):
+        """กรองคู่ (href, text) ทั้งชุด คืน (URL เต็มของลิงก์ที่เกี่ยวข้อง, Counter ของคำสำคัญที่ทำให้ลิงก์เหล่านั้นผ่าน)"""
+        links = []
+        keywords = Counter()
+        for href, text in pairs:
+            if href and self.is_relevant_link(text, href):
+                links.append(urljoin(self.base_url, href))
+                # หาคำที่ตรงทั้งหมดเฉพาะลิงก์ที่ผ่านแล้ว (ลิงก์ส่วนใหญ่ตัดทิ้งด้วย search ที่เร็วกว่า)
+                keywords.update(self.keyword_matcher.matches(f"{text} {href}"))
+        return links, keywords
+
     def is_relevant_link(self, text, href):
         """ตรวจสอบว่าลิงก์เกี่ยวข้องหรือไม่"""
         if not text or not href:
             return False
         
-        text_lower = text.lower()
-        href_lower = href.lower()
-        combined = f"{text_lower} {href_lower}"
+        combined = f"{text} {href}"
         
-        # ต้องมีคำสำคัญ
-        has_keyword = any(keyword.lower() in combined for keyword in self.target_keywords)
-        
-        # ไม่ควรเป็นลิงก์ไม่เกี่ยวข้อง
-        excluded = ['login', 'register', 'contact', 'about', 'news', 'facebook', 'twitter']
-        has_excluded = any(ex in combined for ex in excluded)
-        
-        return has_keyword and not has_excluded
+        # ต้องมีคำสำคัญ และไม่ควรเป็นลิงก์ไม่เกี่ยวข้อง
+        return self.keyword_matcher.search(combined) and not self.excluded_matcher.search(combined)
 
     async def extract_comprehensive_data(self, links):
-        """ดึงข้อมูลแบบครอบคลุม"""
-        print(f"\n📊 เริ่มดึงข้อมูลจาก {len(links)} ลิงก์...")
+        """ดึงข้อมูลแบบครอบคลุม (หลายหน้าพร้อมกันจากคิวเดียว)"""
+        print(f"\n📊 เริ่มดึงข้อมูลจาก {len(links)} ลิงก์ (พร้อมกัน {self.concurrency} หน้า)...")
+        
+        pool = ExtractionPool(self)
+        for i, link in enumerate(links):
+            pool.submit(i, link)
         
-        success_count = 0
+        success = await pool.close()
+        self.programs_data.extend(success)
         
-        for i, link in enumerate(links, 1):
-            print(f"\n📄 [{i}/{len(links)}] กำลังประมวลผล:")
-            print(f"    🔗 {link}")
+        print(f"\n🎯 สรุป: ดึงข้อมูลสำเร็จ {pool.succeeded}/{pool.total} ลิงก์")
+
+    async def extraction_worker(self, worker_id, pool):
+        """worker หนึ่งตัว: ดึงลิงก์จากคิวกลางแล้วประมวลผล (ยืมหน้า browser เมื่อต้อง render)"""
+        while True:
+            # ลิงก์ที่ต้องดึงใหม่มาก่อน (ไม่ไปต่อท้ายสัญญาณจบใน queue)
+            link = pool.retry.popleft() if pool.retry else await pool.queue.get()
+            if link is None:
+                break
+            
+            if link not in pool.retries:
+                pool.started += 1
+            lines = [f"\n📄 [{pool.started}/{pool.total}] กำลังประมวลผล:", f"    🔗 {link}"]
+            # ดึงใหม่หลังหน้า crash ใช้ span เดิม เวลาและจำนวนครั้งจึงรวมอยู่ในผลสุดท้ายของ URL
+            span = pool.spans.pop(link, None)
+            previous_attempts = span.attempts if span else 0
+            span = span or self.metrics.start(link)
             
             try:
-                # ลองด้วย Playwright ก่อน
-                program_data = await self.extract_with_playwright(link)
+                program_data, outcome, attempts = await self.policy.run(
+                    link, lambda: self.fetch_program(link, span)
+                )
+                span.attempts = previous_attempts + attempts
+                
+                if outcome == 'page_crash' and pool.retries.get(link, 0) < MAX_PAGE_RETRIES:
+                    # หน้า crash ไม่ใช่ความผิดของลิงก์ ส่งกลับไปดึงใหม่ด้วยหน้าใหม่
+                    pool.retries[link] = pool.retries.get(link, 0) + 1
+                    pool.retry.append(link)
+                    pool.spans[link] = span
+                    continue
                 
                 if not program_data:
-                    # ลองด้วย requests + BeautifulSoup
-                    program_data = await self.extract_with_requests(link)
+                    pool.errors[link] = outcome
+                self.metrics.finish(span, outcome)
+                
+                # ล้มเหลวชั่วคราว (circuit_open, deadline, 5xx) ไม่บันทึก เพื่อให้ --resume ดึงใหม่
+                if self.journal and is_final(outcome):
+                    self.journal.log_done(link, program_data)
+                # จำเฉพาะลิงก์ที่ได้ข้อมูล ลิงก์ที่ล้มเหลวต้องดึงใหม่ในรอบถัดไป
+                if self.seen and program_data:
+                    self.seen.mark(link)
                 
                 if program_data:
-                    self.programs_data.append(program_data)
-                    success_count += 1
-                    
-                    print(f"    ✅ สำเร็จ!")
-                    print(f"       🏫 {program_data['มหาวิทยาลัย']}")
-                    print(f"       📚 {program_data['หลักสูตร'][:50]}...")
-                    print(f"       💰 {program_data['ค่าเทอม']}")
+                    pool.add_result(link, program_data)
+                    lines.append(f"    ✅ สำเร็จ!")
+                    lines.append(f"       🏫 {program_data['มหาวิทยาลัย']}")
+                    lines.append(f"       📚 {program_data['หลักสูตร'][:50]}...")
+                    lines.append(f"       💰 {program_data['ค่าเทอม']}")
                 else:
-                    print(f"    ⚠️ ไม่พบข้อมูล")
+                    lines.append(f"    ⚠️ ไม่พบข้อมูล ({outcome}, ลอง {span.attempts} ครั้ง)")
                 
-                await asyncio.sleep(0.5)  # หน่วงเวลา
+                if self.verbose:
+                    print("\n".join(lines))
                 
             except Exception as e:
-                print(f"    ❌ ข้อผิดพลาด: {str(e)[:50]}...")
+                pool.errors[link] = f"error:{type(e).__name__}"
+                self.metrics.finish(span, pool.errors[link])
+                lines.append(f"    ❌ ข้อผิดพลาด: {str(e)[:50]}...")
+                if self.verbose:
+                    print("\n".join(lines))
                 continue
+
+    async def ensure_browser(self):
+        """เริ่ม browser แบบ headless ถ้ายังไม่ได้เริ่ม (เรียกพร้อมกันได้)"""
+        async with self.browser_lock:
+            if self.page_pool is None:
+                await self.init_browser(headless=True)
+
+    async def fetch_program(self, url, span):
+        """ดึงข้อมูลหนึ่งครั้ง คืน (record, ป้ายผล) ป้ายผลเป็น ok_static/ok_render หรือสาเหตุที่ล้มเหลว
+
+        ลอง HTML แบบ static ก่อน render ด้วย browser เฉพาะหน้าที่ HTML ยังไม่ครบ
+        ไม่ render เมื่อ static ล้มเหลวชั่วคราว (ให้ FetchPolicy ลองใหม่) หรือหน้าไม่มีอยู่ (404/410)
+        """
+        span.error = None
+        program_data = await self.extract_with_requests(url, span)
+        if program_data:
+            return program_data, 'ok_static'
+        if span.error in ('http_404', 'http_410') or is_retryable(span.error):
+            return None, span.error
         
-        print(f"\n🎯 สรุป: ดึงข้อมูลสำเร็จ {success_count}/{len(links)} ลิงก์")
+        span.error = None
+        with span.stage('fallback'):
+            program_data = await self.render_program(url, span)
+        if program_data:
+            return program_data, 'ok_render'
+        return None, span.error or 'parse_miss'
+
+    async def render_program(self, url, span):
+        """ยืมหน้าจาก page_pool มา render หน้าโปรแกรม แล้วคืนหน้า (หน้าที่ crash หรือถูกยกเลิกกลางทางจะถูกปิดทิ้ง)"""
+        await self.ensure_browser()
+        page = await self.page_pool.acquire()
+        broken = True
+        try:
+            program_data = await self.extract_with_playwright(url, page, span)
+            broken = span.error == 'page_crash'
+            return program_data
+        finally:
+            await self.page_pool.release(page, broken=broken)
 
-    async def extract_with_playwright(self, url):
+    async def extract_with_playwright(self, url, page, span=None):
         """ดึงข้อมูลด้วย Playwright"""
+        span = span or self.metrics.start(url)
         try:
-            await self.page.goto(url, wait_until='networkidle', timeout=15000)
-            await self.page.wait_for_timeout(2000)
+            with span.stage('navigate'):
+                response = await self.goto(page, url, timeout=15000)
+            if response is not None and response.status >= 400:
+                span.error = f"http_{response.status}"
+                return None
+            with span.stage('wait'):
+                await self.wait_until_ready(page, PROGRAM_READY_SELECTORS)
             
-            content = await self.page.content()
-            soup = BeautifulSoup(content, 'html.parser')
+            with span.stage('content'):
+                content = await page.content()
             
-            return self.extract_program_info(soup, url)
+            with span.stage('parse'):
+                program_data = await self.parse_program(content, url)
+            if not program_data:
+                span.error = 'parse_miss'
+            return program_data
             
-        except:
-            return None
+        except PlaywrightTimeoutError:
+            span.error = 'timeout'
+        except Exception as e:
+            if self.page_pool and self.page_pool.is_broken(page, f"{type(e).__name__}: {e}"):
+                span.error = 'page_crash'
+            else:
+                span.error = f"render_error:{type(e).__name__}"
+        return None
 
-    async def extract_with_requests(self, url):
-        """ดึงข้อมูลด้วย requests"""
+    async def goto(self, page, url, timeout=30000):
+        """เปิด URL ใน browser ผ่าน throttle ของ host แล้วแจ้งผลให้ throttle ปรับอัตรา"""
+        await self.throttle.acquire(url)
         try:
-            response = self.session.get(url, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                return self.extract_program_info(soup, url)
-        except:
-            pass
+            response = await page.goto(url, wait_until=self.render_profile['wait_until'], timeout=timeout)
+        except Exception:
+            self.throttle.record(url, None)
+            raise
+        if response is not None:
+            self.throttle.record(url, response.status, response.headers.get('retry-after'))
+        return response
+
+    async def wait_until_ready(self, page, selectors, timeout=READY_TIMEOUT, grace=READY_GRACE):
+        """รอ selector ทั้งหมดพร้อมกัน คืนรายการ selector ที่ไม่ปรากฏ
+
+        รอ element แรกที่ปรากฏได้ไม่เกิน timeout (หน้ายัง render ไม่เสร็จ) จากนั้นรอตัวที่เหลืออีกไม่เกิน grace
+        หน้าที่ไม่มีบาง element จริง (เช่นไม่มีค่าใช้จ่าย) จึงไม่ต้องรอจนครบ timeout แล้วแยกข้อมูลเท่าที่มี
+        """
+        waits = {
+            asyncio.ensure_future(page.wait_for_selector(selector, state='attached', timeout=timeout)): selector
+            for selector in selectors
+        }
+        pending = set(waits)
+        deadline = None  # เริ่มนับ grace เมื่อ element แรกปรากฏ
+        missing = []
+        try:
+            while pending:
+                remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    error = task.exception()
+                    if isinstance(error, PlaywrightTimeoutError):
+                        missing.append(waits[task])
+                    elif error:
+                        raise error
+                    elif deadline is None:
+                        deadline = time.monotonic() + grace / 1000
+        finally:
+            for task in pending:
+                task.cancel()
+                missing.append(waits[task])
+            await asyncio.gather(*pending, return_exceptions=True)
+        return missing
+
+    async def extract_with_requests(self, url, span=None):
+        """ดึงข้อมูลด้วย HTTP แบบ async (ไม่บล็อก event loop)"""
+        span = span or self.metrics.start(url)
+        try:
+            with span.stage('fetch'):
+                status_code, content = await self.fetch_static(url)
+            if status_code == 200:
+                # ถ้า HTML ยังไม่มีข้อมูลที่ต้องใช้ ให้ไป render ด้วย browser แทน
+                with span.stage('parse'):
+                    return await self.parse_program(content, url, require_static=True)
+            span.error = f"http_{status_code}"
+        except httpx.TimeoutException:
+            span.error = 'timeout'
+        except httpx.HTTPError:
+            span.error = 'connect'
         return None
 
+    async def fetch_static(self, url):
+        """โหลด HTML ผ่าน HTTP client โดยใช้ cache บนดิสก์ (ถ้ามี)"""
+        if self.har_replay:
+            # โหมดเล่นซ้ำ: ตอบจาก HAR เท่านั้น URL ที่ไม่ได้บันทึกไว้ถือว่าไม่พบ
+            return self.har_replay.lookup(url) or (404, b'')
+        
+        if self.http is None:
+            self.init_http()
+        
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry and self.cache.is_fresh(entry):
+            self.cache.record_hit(url, entry)
+            return 200, entry['body']
+        
+        # ส่ง If-None-Match / If-Modified-Since ถ้าเคยเก็บไว้
+        headers = self.cache.conditional_headers(entry) if entry else {}
+        await self.throttle.acquire(url)
+        try:
+            response = await self.http.get(url, headers=headers)
+        except httpx.HTTPError:
+            self.throttle.record(url, None)
+            raise
+        self.throttle.record(url, response.status_code, response.headers.get('Retry-After'))
+        
+        if self.har_recorder:
+            self.har_recorder.add(url, response.status_code, response.headers, response.content,
+                                  response.elapsed.total_seconds())
+        
+        if response.status_code == 304 and entry:
+            self.cache.record_revalidation(url, entry, response.headers)
+            return 200, entry['body']
+        
+        if response.status_code == 200 and self.cache:
+            self.cache.store(url, response.headers, response.content)
+        
+        return response.status_code, response.content
+
+    async def parse_program(self, content, url, require_static=False):
+        """แยกข้อมูลโปรแกรม โดยส่งไป parse ใน process pool ถ้าเปิดใช้"""
+        if self.extractor == 'lxml' and self.parse_workers > 0:
+            if self.parse_pool is None:
+                self.parse_pool = ParsePool(self.parse_workers, self.target_keywords)
+            return await self.parse_pool.parse(content, url, require_static)
+        
+        return self.parse_program_page(content, url, require_static)
+
+    def parse_program_page(self, content, url, require_static=False):
+        """แยกข้อมูลโปรแกรมจาก HTML ด้วยตัวแยกข้อมูลที่เลือกไว้
+
+        require_static=True จะคืน None ถ้าหน้ายังไม่มีโลโก้หรือบล็อกค่าใช้จ่าย
+        """
+        if self.extractor == 'lxml':
+            fields = scan_program_page(content, self.keyword_matcher)
+            if require_static and not (fields['has_brand'] and fields['has_tuition']):
+                return None
+            return program_record(fields, url)
+        
+        soup = BeautifulSoup(content, 'html.parser')
+        if require_static and not self.has_static_content(soup):
+            return None
+        return self.extract_program_info(soup, url)
+
+    def has_static_content(self, soup):
+        """ตรวจว่า HTML มีโลโก้ span.h-brand และบล็อก dt/dd ค่าใช้จ่ายครบหรือไม่"""
+        if not soup.select_one('span.h-brand img[alt]'):
+            return False
+        
+        for dt in soup.find_all('dt'):
+            if 'ค่าใช้จ่าย' in dt.get_text(strip=True) and dt.find_next_sibling('dd'):
+                return True
+        return False
+
+    def log(self, message):
+        """แสดงข้อความรายละเอียด (ปิดได้ด้วย quiet mode)"""
+        if self.verbose:
+            print(message)
+
     def extract_program_info(self, soup, url):
         """แยกข้อมูลโปรแกรม"""
         try:
@@ -239,17 +939,17 @@ class TCASScraper:
 
     def extract_university(self, soup, url):
         """ดึงชื่อมหาวิทยาลัยจาก alt ของโลโก้"""
-        print(f"    🔍 กำลังหาชื่อมหาวิทยาลัย...")
+        self.log(f"    🔍 กำลังหาชื่อมหาวิทยาลัย...")
 
         # หา logo ที่อยู่ใน class h-brand แล้วดึง alt
         img = soup.select_one('span.h-brand img[alt]')
         if img:
             alt_text = img.get('alt', '').strip()
             if alt_text.startswith('มหาวิทยาลัย') and len(alt_text) < 100:
-                print(f"    ✅ พบจาก <img alt>: {alt_text}")
+                self.log(f"    ✅ พบจาก <img alt>: {alt_text}")
                 return alt_text
 
-        print("    ❌ ไม่พบจาก <img alt>")
+        self.log("    ❌ ไม่พบจาก <img alt>")
         return 'ไม่ระบุ'
 
     def extract_program_name(self, soup):
@@ -264,7 +964,7 @@ class TCASScraper:
                     next_cell = parent.find_next_sibling()
                     if next_cell:
                         text = next_cell.get_text(strip=True)
-                        if len(text) > 10 and any(kw.lower() in text.lower() for kw in self.target_keywords):
+                        if len(text) > 10 and self.keyword_matcher.search(text):
                             return text
         
         # หาจาก heading
@@ -272,7 +972,7 @@ class TCASScraper:
         for heading in headings:
             text = heading.get_text(strip=True)
             if (len(text) > 10 and 
-                any(kw.lower() in text.lower() for kw in self.target_keywords) and
+                self.keyword_matcher.search(text) and
                 'TCAS' not in text):
                 return text
         
@@ -280,14 +980,14 @@ class TCASScraper:
         title = soup.find('title')
         if title:
             text = title.get_text(strip=True)
-            if any(kw.lower() in text.lower() for kw in self.target_keywords):
+            if self.keyword_matcher.search(text):
                 return text
         
         return 'ไม่ระบุ'
 
     def extract_tuition_info(self, soup):
         """ดึงข้อมูลค่าเทอมจาก <dt>ค่าใช้จ่าย</dt> แล้วเอา <dd> ถัดไป"""
-        print("    🔍 กำลังดึงข้อมูลค่าใช้จ่าย...")
+        self.log("    🔍 กำลังดึงข้อมูลค่าใช้จ่าย...")
         
         # หา <dt> ที่มีข้อความ "ค่าใช้จ่าย"
         dt_elements = soup.find_all('dt')
@@ -299,97 +999,264 @@ class TCASScraper:
                 dd = dt.find_next_sibling('dd')
                 if dd:
                     tuition_text = dd.get_text(strip=True)
-                    print(f"    ✅ พบข้อมูลค่าใช้จ่าย: {tuition_text}")
+                    self.log(f"    ✅ พบข้อมูลค่าใช้จ่าย: {tuition_text}")
                     return tuition_text
         
-        print("    ❌ ไม่พบข้อมูลค่าใช้จ่าย")
+        self.log("    ❌ ไม่พบข้อมูลค่าใช้จ่าย")
         return "ไม่พบข้อมูล"
 
-    def save_to_excel(self, filename='ข้อมูล_TCAS_วิศวคอม.xlsx'):
-        """บันทึกไฟล์ Excel"""
-        if not self.programs_data:
+    def save_to_excel(self, filename='ข้อมูล_TCAS_วิศวคอม.xlsx', records=None, engine='auto', layout='records'):
+        """บันทึกไฟล์ Excel (records = iterable ของ record เช่นจาก read_records, ค่าเริ่มต้น programs_data)
+        
+        engine: xlsxwriter = เขียนแบบ streaming (ตัวเขียนใช้หน่วยความจำคงที่), openpyxl = แบบเดิม,
+        auto = xlsxwriter ถ้าติดตั้งไว้ | layout: records = 4 คอลัมน์จาก scraper,
+        dashboard = คอลัมน์ของ tcas_data.xlsx ที่ dashboard3 อ่าน (แปลงค่าเทอมด้วย tuition_normalizer)
+        
+        การเรียงต้องเก็บ tuple ของทุกแถวไว้ก่อน (O(n)) แต่ xlsxwriter + records ไม่สร้าง DataFrame
+        DataFrame ทั้งก้อนสร้างเฉพาะ layout dashboard (แปลงค่าเทอม) และ engine openpyxl
+        """
+        if records is None:
+            records = self.programs_data
+        if engine == 'auto':
+            engine = 'xlsxwriter' if XLSXWRITER_AVAILABLE else 'openpyxl'
+        
+        # เตรียมข้อมูล (tuple ตามลำดับคอลัมน์ ไม่สร้าง dict ต่อแถว) ค่าว่าง/None ใช้ค่าแทนเดียวกับฟิลด์ที่ไม่มี
+        rows = [
+            (program.get('มหาวิทยาลัย') or 'ไม่ระบุ', program.get('หลักสูตร') or 'ไม่ระบุ',
+             program.get('ค่าเทอม') or 'ไม่พบข้อมูล', program.get('URL') or '')
+            for program in records
+        ]
+        
+        if not rows:
             print("❌ ไม่มีข้อมูลให้บันทึก")
             return
         
-        print(f"\n💾 บันทึกข้อมูล {len(self.programs_data)} รายการ...")
+        print(f"\n💾 บันทึกข้อมูล {len(rows)} รายการ...")
+        start = time.perf_counter()
         
-        # เตรียมข้อมูล
-        df_data = []
-        for program in self.programs_data:
-            row = {
-                'มหาวิทยาลัย': program.get('มหาวิทยาลัย', 'ไม่ระบุ'),
-                'หลักสูตร': program.get('หลักสูตร', 'ไม่ระบุ'),
-                'ค่าเทอม': program.get('ค่าเทอม', 'ไม่พบข้อมูล'),
-                'URL': program.get('URL', '')
-            }
-            df_data.append(row)
+        # เรียงให้ได้ลำดับเดิมทุกครั้ง (record จาก sink มาตามลำดับที่ดึงเสร็จ) เรียงที่ index ไม่ต้องผ่าน DataFrame
+        rows = sort_rows(rows, [0, 1, 3])
+        output_rows = rows
+        output_layout = DASHBOARD_LAYOUT if layout == 'dashboard' else RECORD_LAYOUT
+        output_columns = [column for column, _ in output_layout]
+        if layout == 'dashboard' or engine != 'xlsxwriter':
+            df = pd.DataFrame(rows, columns=[column for column, _ in RECORD_LAYOUT])
+            if layout == 'dashboard':
+                df = normalize_tuition(df)
+            output_rows = df[output_columns].itertuples(index=False, name=None)
+        
+        if engine == 'xlsxwriter':
+            write_rows(filename, output_rows, output_layout)
+        else:
+            self.write_excel_openpyxl(filename, df[output_columns], output_layout)
         
-        df = pd.DataFrame(df_data)
-        df = df.sort_values(['มหาวิทยาลัย'], na_position='last')
+        print(f"✅ บันทึกข้อมูลลงไฟล์ {filename} ({engine}, {time.perf_counter() - start:.2f} วินาที)")
+        print("🔗 คอลัมน์ 'URL' สามารถคลิกได้เลย!")
         
-        # บันทึก Excel
+        self.print_summary(rows)
+
+    def write_excel_openpyxl(self, filename, df, layout):
+        """บันทึก Excel ผ่าน openpyxl (ใช้เมื่อไม่มี xlsxwriter ทั้ง sheet อยู่ในหน่วยความจำ)"""
         with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='ข้อมูลหลักสูตร', index=False)
+            df.to_excel(writer, sheet_name=SHEET_NAME, index=False)
+            worksheet = writer.sheets[SHEET_NAME]
             
-            # เพิ่ม hyperlink
-            workbook = writer.book
-            worksheet = writer.sheets['ข้อมูลหลักสูตร']
-            
-            # สร้าง hyperlink ใน column D (URL)
+            # สร้าง hyperlink ในคอลัมน์ URL
+            url_column = df.columns.get_loc('URL') + 1
             for row_idx, url in enumerate(df['URL'], start=2):
                 if url and url.startswith('http'):
-                    cell = worksheet.cell(row=row_idx, column=4)  # Column D
+                    cell = worksheet.cell(row=row_idx, column=url_column)
                     cell.hyperlink = url
                     cell.value = url
                     cell.style = "Hyperlink"
             
             # ปรับความกว้างคอลัมน์
-            worksheet.column_dimensions['A'].width = 40  # มหาวิทยาลัย
-            worksheet.column_dimensions['B'].width = 60  # หลักสูตร
-            worksheet.column_dimensions['C'].width = 20  # ค่าเทอม
-            worksheet.column_dimensions['D'].width = 60  # URL
-        
-        print(f"✅ บันทึกข้อมูลลงไฟล์ {filename}")
-        print("🔗 คอลัมน์ 'URL' สามารถคลิกได้เลย!")
-        
-        self.print_summary(df)
+            for index, (_, width) in enumerate(layout):
+                worksheet.column_dimensions[chr(ord('A') + index)].width = width
 
-    def print_summary(self, df):
-        """แสดงสรุปผล"""
+    def print_summary(self, rows):
+        """แสดงสรุปผล (rows = tuple ตาม RECORD_LAYOUT ที่เรียงแล้ว)"""
         print(f"\n📈 สรุปผลการรวบรวมข้อมูล:")
         print("=" * 50)
         
-        total = len(df)
-        universities = df[df['มหาวิทยาลัย'] != 'ไม่ระบุ']['มหาวิทยาลัย'].nunique()
+        total = len(rows)
+        universities = len({row[0] for row in rows if row[0] != 'ไม่ระบุ'})
         
         print(f"📚 จำนวนหลักสูตรทั้งหมด: {total}")
         print(f"🏫 จำนวนมหาวิทยาลัย: {universities}")
         
         print(f"\n📋 ตัวอย่างข้อมูล:")
-        display_df = df[['มหาวิทยาลัย', 'หลักสูตร', 'ค่าเทอม']].head(5)
+        display_df = pd.DataFrame([row[:3] for row in rows[:5]], columns=['มหาวิทยาลัย', 'หลักสูตร', 'ค่าเทอม'])
         print(display_df.to_string(index=False))
 
-async def main():
-    scraper = TCASScraper()
+    def print_crawl_stats(self):
+        """แสดงสถิติของการ crawl (cache, browser, parse pool, throttle, retry/circuit breaker, HAR)
+        
+        เรียกจาก main หลัง crawl เสร็จ แสดงทุกครั้งไม่ว่าจะบันทึก Excel หรือไม่
+        """
+        if self.cache:
+            self.cache.print_stats()
+        
+        if self.render_stats['requests']:
+            self.print_render_stats()
+        
+        if self.parse_pool:
+            self.parse_pool.print_stats()
+        
+        self.throttle.print_stats()
+        self.policy.print_stats()
+        
+        if self.page_pool:
+            self.page_pool.print_stats()
+        
+        if self.har_replay:
+            self.har_replay.print_stats()
+
+    def print_render_stats(self):
+        """แสดงสถิติ request ของ browser ที่ถูกบล็อก"""
+        stats = self.render_stats
+        print(f"\n🧱 สถิติการบล็อก resource ของ browser:")
+        print("=" * 50)
+        print(f"📨 request ทั้งหมด: {stats['requests']}")
+        print(f"🚫 ถูกบล็อก: {stats['blocked']}")
+        for reason, count in sorted(stats['blocked_by'].items(), key=lambda item: -item[1]):
+            print(f"   - {reason}: {count}")
+        print(f"⬇️ โหลดจริง: {stats['bytes_loaded'] / 1024:.1f} KB")
+
+def dedupe_for_excel(records, args):
+    """รวมหลักสูตรเดียวกันที่ได้จากหลาย URL ก่อนสร้าง Excel (ปิดได้ด้วย --no-dedupe)"""
+    if args.no_dedupe:
+        return records
+    records = list(records)
+    kept, report = dedupe_records(records, args.dedupe_threshold)
+    print_dedupe_report(len(records), len(kept), report)
+    if args.dedupe_report and report:
+        write_report(report, args.dedupe_report)
+    return kept
+
+def load_previous_records(path):
+    """record จากไฟล์ output ของรอบก่อน (url -> record) ใช้ยกผลของลิงก์ที่ --seen-ttl ข้ามไปมาใส่ output ใหม่"""
+    if not path or not os.path.exists(path):
+        return {}
+    return {canonicalize_url(record['URL']): record for record in read_records(path) if record.get('URL')}
+
+def carry_forward(scraper, previous, sink):
+    """เขียน record เดิมของลิงก์ที่ข้ามไปเพราะเพิ่งดึงแล้ว ไม่ให้หายจาก output และ Excel ที่เขียนใหม่"""
+    carried = missing = 0
+    for link in scraper.seen_skipped:
+        if link in previous:
+            if sink:
+                sink.write(previous[link])
+            else:
+                scraper.programs_data.append(previous[link])
+            carried += 1
+        else:
+            missing += 1
+    if carried:
+        print(f"   🕘 ยก record เดิมของลิงก์ที่ข้ามไป {carried} รายการ มาจาก output รอบก่อน")
+    if missing:
+        print(f"   ⚠️ ลิงก์ที่ข้ามไป {missing} ลิงก์ไม่มี record เดิมใน output (ใช้ --no-seen เพื่อดึงใหม่)")
+
+async def main(args):
+    if args.excel_from:
+        # สร้าง Excel จากไฟล์ record ที่บันทึกไว้ โดยไม่ต้อง crawl ใหม่
+        records = dedupe_for_excel(read_records(args.excel_from), args)
+        TCASScraper(cache_dir=None, parse_workers=0).save_to_excel(
+            args.excel_file, records=records, engine=args.excel_engine, layout=args.excel_layout)
+        return
+    
+    # frontier ใช้แทน journal (บันทึกความคืบหน้าของทุก process ไว้ที่เดียว)
+    frontier = Frontier(args.frontier, visibility_timeout=args.lease_timeout,
+                        max_attempts=args.max_attempts) if args.frontier else None
+    if frontier and not args.frontier_worker and not args.resume:
+        # ตัวค้นหาลิงก์เริ่มรอบใหม่ทุกครั้ง ไม่ให้สถานะและ record ของรอบก่อนปนมา (--resume = ทำรอบเดิมต่อ)
+        frontier.reset()
+    journal = CrawlJournal(args.journal, resume=args.resume) if args.journal and not frontier else None
+    # โหมดเล่นซ้ำ HAR ไม่ได้ดึงหน้าจริง จึงไม่บันทึกลงชุด URL ที่เคยดึงแล้ว
+    seen = None if args.no_seen or args.frontier_worker or args.har_replay else SeenSet(args.seen_db, ttl_hours=args.seen_ttl)
+    # ลิงก์ที่ข้ามเพราะเพิ่งดึงแล้วต้องใช้ record จาก output เดิม (อ่านก่อนเปิด sink ซึ่งเขียนทับไฟล์)
+    previous = load_previous_records(args.output) if seen and seen.ttl > 0 else {}
+    # worker ของ frontier ไม่เขียนไฟล์ผลเอง process ที่ค้นหาลิงก์จะรวม record ทั้งหมดตอนจบ
+    sink = open_sink(args.output) if args.output and not args.frontier_worker else None
+    # cache บนดิสก์จะทำให้ HAR ขาด response ที่ตอบจาก cache และไม่จำเป็นตอนเล่นซ้ำ
+    use_cache = not (args.no_cache or args.har_record or args.har_replay)
+    scraper = TCASScraper(
+        concurrency=args.concurrency,
+        cache_dir=args.cache_dir if use_cache else None,
+        journal=journal,
+        render_profile=args.render_profile,
+        extractor=args.extractor,
+        parse_workers=args.parse_workers,
+        metrics_path=args.metrics_file,
+        verbose=not args.quiet,
+        rate_limit=0 if args.har_replay else args.rate_limit,
+        burst=args.burst,
+        sink=None if frontier else sink,
+        seen=seen,
+        page_max_navigations=args.page_max_navigations,
+        browser_max_rss_mb=args.browser_max_rss_mb,
+        frontier=frontier,
+        har_record=args.har_record,
+        har_replay=args.har_replay,
+        deadline=args.deadline,
+        retries=args.retries,
+        breaker_threshold=args.breaker_threshold,
+        breaker_cooldown=args.breaker_cooldown
+    )
     
     try:
         print("🚀 ระบบดึงข้อมูล TCAS")
         print("=" * 50)
         print("🎯 เป้าหมาย: หลักสูตรวิศวกรรมคอมพิวเตอร์และ AI")
         
-        # เริ่มต้น browser
-        await scraper.init_browser(headless=False, slow_mo=500)
+        if args.frontier_worker:
+            # ช่วยดึงข้อมูลจาก frontier อย่างเดียว (browser จะเริ่มเองเมื่อต้อง render)
+            await scraper.crawl_frontier()
+            scraper.print_crawl_stats()
+            frontier.print_stats()
+            return
         
         # ค้นหาและรวบรวมข้อมูล
-        await scraper.search_via_website()
+        if args.discovery == 'listing':
+            # ไม่ต้องใช้ช่องค้นหา browser จะเริ่มเองเมื่อมีหน้าที่ต้อง render
+            await scraper.crawl_listings(args.seed, args.program_url_template)
+        elif args.discovery == 'probe':
+            ranges = dict(map(parse_range, args.probe_range)) if args.probe_range else None
+            await scraper.probe_programs(args.probe_pattern, ranges)
+        else:
+            # เริ่มต้น browser
+            await scraper.init_browser(headless=False)
+            await scraper.search_via_website()
+        
+        if frontier:
+            frontier.print_stats()
+            # รวม record ของทุก worker ลงไฟล์เดียว
+            for record in frontier.records():
+                if sink:
+                    sink.write(record)
+                else:
+                    scraper.programs_data.append(record)
         
-        print(f"\n✅ รวบรวมข้อมูลเสร็จ: {len(scraper.programs_data)} รายการ")
+        if scraper.seen_skipped:
+            carry_forward(scraper, previous, sink)
         
-        # บันทึกข้อมูล
-        if scraper.programs_data:
-            scraper.save_to_excel()
-        else:
+        count = sink.count if sink else len(scraper.programs_data)
+        print(f"\n✅ รวบรวมข้อมูลเสร็จ: {count} รายการ")
+        scraper.metrics.print_summary()
+        scraper.print_crawl_stats()
+        if seen:
+            seen.print_stats()
+        
+        if sink:
+            sink.close()
+            print(f"📝 บันทึก record ลง {args.output}")
+        
+        # สร้างไฟล์ Excel จาก record ที่บันทึกไว้ (ขั้นตอนสุดท้าย ปิดได้ด้วย --no-excel)
+        if not count:
             print("❌ ไม่พบข้อมูล")
+        elif not args.no_excel:
+            records = dedupe_for_excel(read_records(args.output) if sink else scraper.programs_data, args)
+            scraper.save_to_excel(args.excel_file, records=records, engine=args.excel_engine, layout=args.excel_layout)
         
         print("\n🎉 เสร็จสมบูรณ์!")
         print("⏳ รอ 10 วินาที...")
@@ -403,6 +1270,108 @@ async def main():
         traceback.print_exc()
     finally:
         await scraper.close_browser()
+        if sink:
+            sink.close()
+        if seen:
+            seen.close()
+        if journal:
+            journal.close()
+        if frontier:
+            frontier.close()
+
+def parse_args(argv=None):
+    """อ่านตัวเลือกจาก command line"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="ระบบดึงข้อมูล TCAS")
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='จำนวนหน้าที่ดึงข้อมูลพร้อมกัน (ค่าเริ่มต้น 4)')
+    parser.add_argument('--cache-dir', default='.tcas_cache',
+                        help='โฟลเดอร์เก็บ HTTP cache (ค่าเริ่มต้น .tcas_cache)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='ไม่ใช้ HTTP cache')
+    parser.add_argument('--journal', default='tcas_crawl_journal.jsonl',
+                        help='ไฟล์ journal สำหรับบันทึกความคืบหน้า')
+    parser.add_argument('--resume', action='store_true',
+                        help='ทำต่อจาก journal เดิม (ข้ามคำค้นและลิงก์ที่ทำเสร็จแล้ว) หรือทำรอบเดิมของ --frontier ต่อ')
+    parser.add_argument('--seen-db', default='.tcas_cache/seen_urls.sqlite3',
+                        help='ไฟล์เก็บ URL ที่เคยดึงแล้ว (ใช้ร่วมกันทุกรอบ)')
+    parser.add_argument('--seen-ttl', type=float, default=0,
+                        help='ข้าม URL ที่ดึงสำเร็จแล้วในรอบก่อนภายในกี่ชั่วโมง โดยใช้ record เดิมจาก --output (0 = ไม่ข้าม)')
+    parser.add_argument('--no-seen', action='store_true',
+                        help='ไม่บันทึกและไม่ใช้ชุด URL ที่เคยดึงแล้ว')
+    parser.add_argument('--frontier', default=None,
+                        help='ไฟล์ SQLite ของคิว URL ที่ใช้ร่วมกันหลาย process (เช่น tcas_frontier.sqlite3) '
+                             'ตัวค้นหาลิงก์ล้างรอบก่อนทุกครั้ง ยกเว้นใช้ --resume')
+    parser.add_argument('--frontier-worker', action='store_true',
+                        help='ไม่ค้นหาลิงก์เอง ช่วยดึงข้อมูลจาก --frontier อย่างเดียว (เริ่มหลังตัวค้นหาลิงก์)')
+    parser.add_argument('--lease-timeout', type=float, default=300,
+                        help='วินาทีก่อน URL ที่ worker ยืมไปจะกลับเข้าคิว (กรณี worker หยุดกลางทาง)')
+    parser.add_argument('--max-attempts', type=int, default=3,
+                        help='จำนวนครั้งสูงสุดที่ลองดึงแต่ละ URL ใน frontier')
+    har = parser.add_mutually_exclusive_group()
+    har.add_argument('--har-record', default=None,
+                     help='บันทึก network ทั้งหมด (HTTP client และ browser) เป็นไฟล์ HAR ในโฟลเดอร์นี้')
+    har.add_argument('--har-replay', default=None,
+                     help='เล่นซ้ำจากไฟล์ HAR ในโฟลเดอร์นี้โดยไม่ต่อ network (ใช้ตรวจตัวแยกข้อมูลซ้ำ)')
+    parser.add_argument('--render-profile', choices=sorted(RENDER_PROFILES), default='lean',
+                        help='lean = บล็อกรูป/ฟอนต์/สคริปต์ภายนอก, full = โหลดทุกอย่าง')
+    parser.add_argument('--page-max-navigations', type=int, default=50,
+                        help='เปิดหน้า browser ใหม่หลังใช้หน้าเดิมครบกี่ URL (ค่าเริ่มต้น 50)')
+    parser.add_argument('--browser-max-rss-mb', type=float, default=1500,
+                        help='เปลี่ยน browser context ใหม่เมื่อ RSS ของ Chromium เกินกี่ MB (0 = ไม่จำกัด, ต้องมี psutil)')
+    parser.add_argument('--extractor', choices=['lxml', 'bs4'], default='lxml',
+                        help='lxml = อ่าน DOM รอบเดียว (เร็ว), bs4 = ตัวแยกข้อมูลเดิม')
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help='จำนวน process สำหรับ parse HTML (ค่าเริ่มต้น = จำนวน core, 0 = ไม่ใช้ process pool)')
+    parser.add_argument('--metrics-file', default='tcas_crawl_metrics.jsonl',
+                        help='ไฟล์ JSON lines ของเวลาต่อขั้นตอนของแต่ละ URL')
+    parser.add_argument('--output', default='tcas_programs.jsonl',
+                        help='ไฟล์ที่เขียน record ทันทีที่ได้ (.jsonl หรือ .parquet, "" = เก็บในหน่วยความจำ)')
+    parser.add_argument('--no-excel', action='store_true',
+                        help='ไม่สร้างไฟล์ Excel ตอนจบ (ใช้ --excel-from ภายหลังได้)')
+    parser.add_argument('--excel-from', default=None,
+                        help='สร้าง Excel จากไฟล์ record ที่บันทึกไว้ แล้วจบโดยไม่ crawl')
+    parser.add_argument('--excel-file', default='ข้อมูล_TCAS_วิศวคอม.xlsx',
+                        help='ชื่อไฟล์ Excel ที่สร้างตอนจบ')
+    parser.add_argument('--excel-engine', choices=['auto', 'xlsxwriter', 'openpyxl'], default='auto',
+                        help='xlsxwriter = เขียนแบบ streaming ใช้หน่วยความจำคงที่ (auto = ใช้ถ้าติดตั้งไว้)')
+    parser.add_argument('--excel-layout', choices=['records', 'dashboard'], default='records',
+                        help='dashboard = คอลัมน์แบบ tcas_data.xlsx ที่ dashboard3.py อ่าน (แปลงค่าเทอมแล้ว)')
+    parser.add_argument('--no-dedupe', action='store_true',
+                        help='ไม่รวมหลักสูตรเดียวกันที่ได้จากหลาย URL ก่อนสร้าง Excel')
+    parser.add_argument('--dedupe-threshold', type=float, default=0.8,
+                        help='ความคล้ายของชื่อหลักสูตร (Jaccard ของ MinHash/LSH) ที่ถือว่าเป็นหลักสูตรเดียวกัน')
+    parser.add_argument('--dedupe-report', default='tcas_dedupe_report.csv',
+                        help='ไฟล์ CSV รายงานการรวมหลักสูตรซ้ำ ("" = ไม่บันทึก)')
+    parser.add_argument('--quiet', action='store_true',
+                        help='ไม่แสดงข้อความรายลิงก์และรายฟิลด์')
+    parser.add_argument('--rate-limit', type=float, default=2.0,
+                        help='จำนวน request ต่อวินาทีต่อ host (ชะลอเองเมื่อเจอ 429/5xx, 0 = ไม่จำกัด)')
+    parser.add_argument('--burst', type=int, default=4,
+                        help='จำนวน request ที่ส่งติดกันได้ก่อนเริ่มจำกัดความเร็ว')
+    parser.add_argument('--deadline', type=float, default=45,
+                        help='เวลารวมสูงสุดต่อ URL รวมการลองใหม่ (วินาที, 0 = ไม่จำกัด)')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='จำนวนครั้งที่ลองใหม่เมื่อ timeout/เชื่อมต่อไม่ได้/429/5xx')
+    parser.add_argument('--breaker-threshold', type=int, default=5,
+                        help='หยุดส่ง request ไปที่ host ที่ล้มเหลวติดกันกี่ครั้ง (0 = ไม่ใช้ circuit breaker)')
+    parser.add_argument('--breaker-cooldown', type=float, default=60,
+                        help='หยุดส่ง request ไปที่ host นั้นนานกี่วินาทีก่อนลองใหม่')
+    parser.add_argument('--discovery', choices=['search', 'listing', 'probe'], default='search',
+                        help='search = ใช้ช่องค้นหาของเว็บ, listing = ไล่จากหน้ารายการ/sitemap, probe = เดา URL จากรูปแบบรหัส')
+    parser.add_argument('--seed', action='append', default=None,
+                        help='หน้าเริ่มต้นของโหมด listing (ใส่ได้หลายครั้ง)')
+    parser.add_argument('--probe-pattern', default=DEFAULT_PROBE_PATTERN,
+                        help='รูปแบบ URL ของโหมด probe เช่น http://127.0.0.1:8800/programs/1{university:03d}01043005{seq:02d}A')
+    parser.add_argument('--probe-range', action='append', default=None,
+                        help='ช่วงค่าของตัวแปรใน --probe-pattern เช่น university=1-99 หรือ slug=cpe,ai (ใส่ได้หลายครั้ง)')
+    parser.add_argument('--program-url-template', default=DEFAULT_PROGRAM_URL_TEMPLATE,
+                        help='URL หน้าโปรแกรมจากรหัสที่พบใน JSON เช่น http://127.0.0.1:8800/programs/{id}')
+    args = parser.parse_args(argv)
+    if args.frontier_worker and not args.frontier:
+        parser.error('--frontier-worker ต้องใช้คู่กับ --frontier')
+    return args
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(parse_args()))
\ No newline at end of file
@@ -0,0 +1,92 @@
+import json
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# คอลัมน์ของ record ที่ได้จากหน้าโปรแกรม (ลำดับเดียวกับไฟล์ Excel)
+RECORD_FIELDS = ['มหาวิทยาลัย', 'หลักสูตร', 'ค่าเทอม', 'URL']
+
+
+class JsonlSink:
+    """เขียน record ทีละบรรทัดทันทีที่ได้ (อ่าน/tail ระหว่าง crawl ได้)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8')
+        self.count = 0
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class ParquetSink:
+    """เขียน record เป็น Parquet ทีละ row group (เก็บในหน่วยความจำไม่เกิน batch_size แถว)
+
+    ไฟล์ Parquet อ่านได้เมื่อปิดแล้วเท่านั้น ถ้าต้อง tail ระหว่าง crawl ให้ใช้ JSONL
+    """
+
+    def __init__(self, path, batch_size=500):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("ต้องติดตั้ง pyarrow เพื่อบันทึกเป็น Parquet (pip install pyarrow)")
+        self.path = path
+        self.batch_size = batch_size
+        self.schema = pa.schema([(field, pa.string()) for field in RECORD_FIELDS])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.batch = []
+        self.count = 0
+
+    def write(self, record):
+        self.batch.append(record)
+        self.count += 1
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """เขียน record ที่รออยู่เป็น row group ใหม่"""
+        if self.batch:
+            columns = {field: [record.get(field) for record in self.batch] for field in RECORD_FIELDS}
+            self.writer.write_table(pa.table(columns, schema=self.schema))
+            self.batch = []
+
+    def close(self):
+        if self.writer:
+            self.flush()
+            self.writer.close()
+            self.writer = None
+
+
+def open_sink(path, batch_size=500):
+    """เลือกชนิด sink จากนามสกุลไฟล์ (.parquet = Parquet, อื่น ๆ = JSONL)"""
+    if os.path.splitext(path)[1].lower() in ('.parquet', '.pq'):
+        return ParquetSink(path, batch_size)
+    return JsonlSink(path)
+
+
+def read_records(path):
+    """อ่าน record กลับจากไฟล์ที่ sink เขียน ทีละรายการ (ไม่โหลดทั้งไฟล์)"""
+    if os.path.splitext(path)[1].lower() in ('.parquet', '.pq'):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("ต้องติดตั้ง pyarrow เพื่ออ่านไฟล์ Parquet (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+        return
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # บรรทัดสุดท้ายที่เขียนไม่ครบ (crawl ถูกหยุดกลางทาง)
+                continue
@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime
+
+from listing_discovery import ListingDiscovery, DEFAULT_LISTING_SEEDS, DEFAULT_PROGRAM_URL_TEMPLATE
+from fetch_policy import DEFINITIVE_ERRORS
+from read_file3 import TCASScraper, ExtractionPool
+from record_sink import read_records
+from url_dedupe import canonicalize_url
+from url_prober import UrlProber, expand_pattern, parse_range, DEFAULT_PROBE_PATTERN, DEFAULT_PROBE_RANGES
+
+HOUR = 3600
+
+
+def record_hash(record):
+    """hash ของฟิลด์ที่ดึงได้ (ลำดับ key ไม่มีผล)"""
+    payload = json.dumps(record, ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class RecrawlState:
+    """สถานะของทุกหน้าโปรแกรม (SQLite): hash ล่าสุด และกำหนดตรวจครั้งถัดไปแยกราย URL
+
+    หน้าที่ไม่เปลี่ยนจะถูกตรวจห่างขึ้นทีละ backoff เท่า (ไม่เกิน max_interval)
+    หน้าที่เปลี่ยนจะถูกตรวจถี่ขึ้นครึ่งหนึ่ง (ไม่ต่ำกว่า min_interval)
+    หน้าที่ไม่พบติดกัน remove_after ครั้ง (404/410/ไม่ใช่หน้าโปรแกรม) ถือว่าถูกลบ
+    ความล้มเหลวชั่วคราว (5xx, timeout, circuit_open) แค่เลื่อนไปตรวจใหม่ ไม่นับเป็นการไม่พบ
+    """
+
+    def __init__(self, path='tcas_recrawl.sqlite3', initial_interval=24 * HOUR, min_interval=6 * HOUR,
+                 max_interval=14 * 24 * HOUR, backoff=1.5, remove_after=2):
+        self.path = path
+        self.initial_interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.remove_after = remove_after
+        self.db = sqlite3.connect(path)
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS programs (
+                url TEXT PRIMARY KEY,
+                hash TEXT,
+                record TEXT,
+                first_seen REAL,
+                last_checked REAL,
+                last_changed REAL,
+                changes INTEGER DEFAULT 0,
+                checks INTEGER DEFAULT 0,
+                misses INTEGER DEFAULT 0,
+                removed INTEGER DEFAULT 0,
+                interval REAL,
+                next_due REAL
+            )
+        ''')
+        self.db.execute('CREATE INDEX IF NOT EXISTS programs_due ON programs (next_due)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value REAL)')
+        self.db.commit()
+
+    def add(self, urls, now=None):
+        """เพิ่ม URL ใหม่ (ตรวจทันที) คืนจำนวน URL ใหม่"""
+        now = now or time.time()
+        before = self.db.total_changes
+        self.db.executemany(
+            'INSERT OR IGNORE INTO programs (url, first_seen, interval, next_due) VALUES (?, ?, ?, ?)',
+            ((canonicalize_url(url), now, self.initial_interval, now) for url in urls)
+        )
+        self.db.commit()
+        return self.db.total_changes - before
+
+    def due(self, now=None, limit=500):
+        """URL ที่ถึงกำหนดตรวจ เรียงจากที่เลยกำหนดนานที่สุด"""
+        now = now or time.time()
+        rows = self.db.execute('SELECT url FROM programs WHERE next_due <= ? ORDER BY next_due LIMIT ?', (now, limit))
+        return [url for (url,) in rows]
+
+    def next_due(self):
+        """เวลาที่มี URL ถึงกำหนดตรวจครั้งถัดไป (None = ยังไม่มี URL)"""
+        return self.db.execute('SELECT MIN(next_due) FROM programs').fetchone()[0]
+
+    def update(self, url, record, now=None):
+        """บันทึกผลการตรวจที่ได้ record คืน (ชนิดการเปลี่ยนแปลง, record เดิม) ชนิดเป็น None ถ้าไม่เปลี่ยน"""
+        now = now or time.time()
+        old_hash, old_record, interval, removed = self.db.execute(
+            'SELECT hash, record, interval, removed FROM programs WHERE url = ?', (url,)
+        ).fetchone()
+        new_hash = record_hash(record)
+
+        if old_hash is None or removed:
+            change = 'added'
+            interval = self.initial_interval
+        elif new_hash != old_hash:
+            change = 'changed'
+            interval = max(self.min_interval, interval / 2)
+        else:
+            change = None
+            interval = min(self.max_interval, interval * self.backoff)
+
+        self.db.execute('''
+            UPDATE programs SET hash = ?, record = ?, last_checked = ?, checks = checks + 1, misses = 0, removed = 0,
+                changes = changes + ?, last_changed = CASE WHEN ? THEN ? ELSE last_changed END,
+                interval = ?, next_due = ?
+            WHERE url = ?
+        ''', (new_hash, json.dumps(record, ensure_ascii=False), now, int(change is not None),
+              change is not None, now, interval, now + interval, url))
+        return change, json.loads(old_record) if old_record and change == 'changed' else None
+
+    def postpone(self, url, now=None):
+        """ตรวจไม่สำเร็จเพราะปัญหาชั่วคราว ลองใหม่หลัง min_interval โดยไม่แตะ misses และ interval"""
+        now = now or time.time()
+        self.db.execute('UPDATE programs SET next_due = ? WHERE url = ?', (now + self.min_interval, url))
+
+    def miss(self, url, now=None):
+        """บันทึกผลการตรวจที่ไม่พบหน้า คืน ('removed', record เดิม) เมื่อถือว่าหน้าถูกลบ"""
+        now = now or time.time()
+        misses, removed, record, interval = self.db.execute(
+            'SELECT misses, removed, record, interval FROM programs WHERE url = ?', (url,)
+        ).fetchone()
+        misses += 1
+        # ยังไม่ถึงเกณฑ์ลบ ตรวจซ้ำเร็ว ๆ เผื่อเป็นปัญหาชั่วคราว
+        retry_in = self.min_interval if misses < self.remove_after else interval
+        self.db.execute(
+            'UPDATE programs SET misses = ?, last_checked = ?, checks = checks + 1, removed = ?, next_due = ? WHERE url = ?',
+            (misses, now, int(removed or (misses >= self.remove_after and record is not None)), now + retry_in, url)
+        )
+        if not removed and record is not None and misses >= self.remove_after:
+            return 'removed', json.loads(record)
+        return None, None
+
+    def get_meta(self, name, default=0.0):
+        row = self.db.execute('SELECT value FROM meta WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, name, value):
+        self.db.execute('INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)', (name, value))
+        self.db.commit()
+
+    def commit(self):
+        self.db.commit()
+
+    def counts(self):
+        """จำนวนหน้าที่ติดตาม / ถูกลบ / ยังไม่เคยได้ข้อมูล"""
+        total, removed, unseen = self.db.execute(
+            'SELECT COUNT(*), SUM(removed), SUM(hash IS NULL) FROM programs'
+        ).fetchone()
+        return {'tracked': total, 'removed': removed or 0, 'unseen': unseen or 0}
+
+    def close(self):
+        if self.db:
+            self.db.commit()
+            self.db.close()
+            self.db = None
+
+
+class DeltaWriter:
+    """เขียนเฉพาะหลักสูตรที่เพิ่ม / เปลี่ยน / ถูกลบ ต่อท้ายไฟล์ JSON lines"""
+
+    def __init__(self, path='tcas_delta.jsonl'):
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+        self.counts = {'added': 0, 'changed': 0, 'removed': 0}
+
+    def write(self, change, url, record=None, previous=None):
+        event = {'change': change, 'url': url, 'at': datetime.now().isoformat(timespec='seconds'), 'record': record}
+        if previous is not None:
+            event['previous'] = previous
+        self.file.write(json.dumps(event, ensure_ascii=False) + '\n')
+        self.file.flush()
+        self.counts[change] += 1
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+async def discover(scraper, args):
+    """หา URL หน้าโปรแกรมทั้งหมด (ไม่ดึงข้อมูล) ตามโหมด --discovery"""
+    if args.discovery == 'listing':
+        discovery = ListingDiscovery(scraper.fetch_static, seeds=args.seed or DEFAULT_LISTING_SEEDS,
+                                     concurrency=scraper.concurrency * 2, program_url_template=args.program_url_template)
+        return await discovery.discover()
+    if args.discovery == 'probe':
+        ranges = dict(map(parse_range, args.probe_range)) if args.probe_range else DEFAULT_PROBE_RANGES
+        prober = UrlProber(scraper.probe_request, concurrency=scraper.concurrency * 8)
+        return await prober.probe(expand_pattern(args.probe_pattern, ranges))
+    return []
+
+
+async def run_cycle(state, delta, args):
+    """หนึ่งรอบ: หา URL ใหม่ (ถ้าถึงเวลา) แล้วตรวจเฉพาะหน้าที่ถึงกำหนด"""
+    scraper = TCASScraper(
+        concurrency=args.concurrency,
+        cache_dir=args.cache_dir or None,
+        verbose=False,
+        rate_limit=args.rate_limit,
+        parse_workers=args.parse_workers
+    )
+    try:
+        now = time.time()
+        if args.discovery != 'none' and now - state.get_meta('last_discovery') >= args.discover_every * HOUR:
+            added = state.add(await discover(scraper, args), now)
+            state.set_meta('last_discovery', now)
+            print(f"🗺️ พบหน้าโปรแกรมใหม่ {added} หน้า")
+
+        due = state.due(now, args.batch)
+        if not due:
+            return 0
+
+        print(f"🔄 ตรวจ {len(due)} หน้าที่ถึงกำหนด...")
+        pool = ExtractionPool(scraper, check_seen=False)
+        for position, url in enumerate(due):
+            pool.submit(position, url)
+        await pool.close()
+
+        before = dict(delta.counts)
+        unchanged = missing = failed = 0
+        for url in due:
+            if url in pool.results:
+                change, previous = state.update(url, pool.results[url])
+                if change:
+                    delta.write(change, url, pool.results[url], previous)
+                else:
+                    unchanged += 1
+            elif pool.errors.get(url) in DEFINITIVE_ERRORS:
+                change, previous = state.miss(url)
+                if change:
+                    delta.write(change, url, previous=previous)
+                else:
+                    missing += 1
+            else:
+                # 5xx, timeout, circuit_open ฯลฯ ไม่ได้บอกว่าหน้าถูกลบ
+                state.postpone(url)
+                failed += 1
+        state.commit()
+
+        changed = {name: delta.counts[name] - before[name] for name in delta.counts}
+        print(f"📝 เพิ่ม {changed['added']} | เปลี่ยน {changed['changed']} | ลบ {changed['removed']} | "
+              f"ไม่เปลี่ยน {unchanged} | ไม่พบ (ยังไม่ลบ) {missing} | ล้มเหลวชั่วคราว {failed} (ลง {delta.path})")
+        if failed:
+            reasons = Counter(pool.errors[url] for url in due if url in pool.errors and url not in pool.results)
+            print("   ⏭️ ตรวจใหม่ภายหลัง: " + ", ".join(f"{reason} {count}" for reason, count in reasons.most_common()
+                                                  if reason not in DEFINITIVE_ERRORS))
+        return len(due)
+    finally:
+        await scraper.close_browser()
+
+
+async def main(args):
+    state = RecrawlState(
+        args.state,
+        initial_interval=args.initial_interval * HOUR,
+        min_interval=args.min_interval * HOUR,
+        max_interval=args.max_interval * HOUR,
+        remove_after=args.remove_after
+    )
+    delta = DeltaWriter(args.delta)
+    if args.from_records:
+        added = state.add(record['URL'] for record in read_records(args.from_records) if record.get('URL'))
+        print(f"📥 เพิ่ม {added} หน้าจาก {args.from_records}")
+
+    try:
+        while True:
+            print(f"\n⏰ {datetime.now().isoformat(timespec='seconds')} เริ่มรอบตรวจ")
+            checked = await run_cycle(state, delta, args)
+            counts = state.counts()
+            print(f"📚 ติดตาม {counts['tracked']} หน้า (ถูกลบ {counts['removed']}, ยังไม่ได้ข้อมูล {counts['unseen']})")
+            if args.once:
+                break
+
+            # ยังมีหน้าที่ถึงกำหนดค้างอยู่ (เกิน --batch) ทำรอบถัดไปเลย
+            wake = state.next_due() or float('inf')
+            if args.discovery != 'none':
+                wake = min(wake, state.get_meta('last_discovery') + args.discover_every * HOUR)
+            sleep = 0 if checked >= args.batch else max(0, min(wake - time.time(), args.max_sleep))
+            print(f"💤 รอบถัดไปในอีก {sleep / 60:.0f} นาที")
+            await asyncio.sleep(sleep)
+    except KeyboardInterrupt:
+        print("\n⏹️ หยุด")
+    finally:
+        delta.close()
+        state.close()
+
+
+def parse_args(argv=None):
+    """อ่านตัวเลือกจาก command line"""
+    parser = argparse.ArgumentParser(description="ตรวจหน้าโปรแกรมซ้ำตามกำหนดของแต่ละหน้า แล้วบันทึกเฉพาะหลักสูตรที่เปลี่ยน")
+    parser.add_argument('--state', default='tcas_recrawl.sqlite3', help='ไฟล์ SQLite เก็บ hash และกำหนดตรวจของแต่ละหน้า')
+    parser.add_argument('--delta', default='tcas_delta.jsonl', help='ไฟล์ JSON lines ของหลักสูตรที่เพิ่ม/เปลี่ยน/ถูกลบ')
+    parser.add_argument('--from-records', default=None,
+                        help='เพิ่ม URL จากไฟล์ record ของ read_file3.py (.jsonl หรือ .parquet)')
+    parser.add_argument('--discovery', choices=['listing', 'probe', 'none'], default='listing',
+                        help='วิธีหาหน้าโปรแกรมใหม่ (none = ตรวจเฉพาะ URL ที่มีอยู่แล้ว)')
+    parser.add_argument('--discover-every', type=float, default=24, help='หาหน้าโปรแกรมใหม่ทุกกี่ชั่วโมง')
+    parser.add_argument('--seed', action='append', default=None, help='หน้าเริ่มต้นของโหมด listing')
+    parser.add_argument('--program-url-template', default=DEFAULT_PROGRAM_URL_TEMPLATE)
+    parser.add_argument('--probe-pattern', default=DEFAULT_PROBE_PATTERN)
+    parser.add_argument('--probe-range', action='append', default=None)
+    parser.add_argument('--initial-interval', type=float, default=24, help='ระยะตรวจของหน้าใหม่ (ชั่วโมง)')
+    parser.add_argument('--min-interval', type=float, default=6, help='ระยะตรวจถี่ที่สุด (ชั่วโมง)')
+    parser.add_argument('--max-interval', type=float, default=14 * 24, help='ระยะตรวจห่างที่สุด (ชั่วโมง)')
+    parser.add_argument('--remove-after', type=int, default=2,
+                        help='ไม่พบหน้า (404/410/ไม่ใช่หน้าโปรแกรม) ติดกันกี่ครั้งจึงถือว่าหน้าถูกลบ')
+    parser.add_argument('--batch', type=int, default=500, help='จำนวนหน้าสูงสุดที่ตรวจต่อรอบ')
+    parser.add_argument('--max-sleep', type=float, default=3600, help='รอระหว่างรอบนานสุดกี่วินาที')
+    parser.add_argument('--once', action='store_true', help='ทำรอบเดียวแล้วจบ (เช่นเรียกจาก cron)')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--rate-limit', type=float, default=2.0)
+    parser.add_argument('--parse-workers', type=int, default=0)
+    parser.add_argument('--cache-dir', default='.tcas_cache', help='HTTP cache (ใช้ ETag/Last-Modified ลดการโหลดซ้ำ, "" = ไม่ใช้)')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
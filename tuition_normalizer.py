@@ -0,0 +1,247 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from record_sink import read_records
+from excel_export import write_rows, DASHBOARD_LAYOUT, XLSXWRITER_AVAILABLE
+
+# คอลัมน์ของ sheet 'ข้อมูลหลักสูตร' ที่ dashboard3.load_data อ่าน
+DASHBOARD_COLUMNS = ['มหาวิทยาลัย', 'หลักสูตร', 'ค่าเทอม/เทอม', 'ค่าเทอมจากเว็บ', 'รูปแบบการชำระ', 'URL']
+PER_SEMESTER = 'ต่อภาคการศึกษา'
+WHOLE_PROGRAM = 'ตลอดหลักสูตร'
+
+# จำนวนภาคการศึกษาของหลักสูตร 4 ปี (dashboard คิดค่าใช้จ่ายรวม = ค่าเทอม/เทอม * 8)
+SEMESTERS = 8
+
+# จำนวนเงินที่น้อยกว่านี้ไม่ใช่ค่าเทอม (เช่นเลขหน้า เลขลำดับ)
+MIN_AMOUNT = 1000
+
+THAI_DIGITS = str.maketrans('๐๑๒๓๔๕๖๗๘๙', '0123456789')
+AMOUNT = r'(\d+(?:\.\d+)?)'
+
+# คำที่บอกช่วงเวลาของจำนวนเงิน (ข้อความถูกแปลงเป็นตัวพิมพ์เล็กก่อน) -> ตัวอักษรแทนคำ
+PERIOD_WORDS = {
+    'S': r'ภาคการศึกษา|ภาคเรียน|เทอม|semester|term',
+    'P': r'ตลอดหลักสูตร|ทั้งหลักสูตร|ตลอดการศึกษา|รวมทั้งหมด|entire program|whole program',
+    'Y': r'ปีการศึกษาละ|ต่อปี|ปีละ|/\s*ปี|per year|a year'
+}
+
+# จำนวนภาคการศึกษา/ปี ('8 ภาคการศึกษา', '4 ปี') เป็นจำนวน ไม่ใช่คำบอกช่วงเวลาของเงิน
+# (ไม่ใช้ lookaround เพื่อให้ pyarrow ทำทั้งคอลัมน์ด้วย RE2 ได้)
+SEMESTER_COUNT = r'(^|[^\d.])(\d{1,2})\s*(?:ภาคการศึกษา|ภาคเรียน|เทอม|semesters|terms)'
+YEAR_COUNT = r'(^|[^\d.])\d{1,2}\s*(?:ปี|years?)'
+
+
+def money(name):
+    """token จำนวนเงินที่ไม่น้อยกว่า MIN_AMOUNT (ไม่ขึ้นต้นด้วย 0 และจำนวนหลักอย่างน้อยเท่า MIN_AMOUNT)"""
+    return rf'(?P<{name}>[1-9]\d{{{len(str(MIN_AMOUNT)) - 1},}}(?:\.\d+)?)\.?'
+
+
+# ตัวเลขเล็กที่อยู่ระหว่างคำกับจำนวนเงิน เช่น 'ภาคเรียนที่ 1 ค่าธรรมเนียม 21000' -> ' S 1 21000 '
+SMALL_NUMBERS = r'(?: \d{1,%d}(?:\.\d+)?\.?| 0\d*(?:\.\d+)?\.?)*' % (len(str(MIN_AMOUNT)) - 1)
+
+# ทางเลือกเรียงตามลำดับการตีความ ทุกทางเลือกเริ่มที่ต้นข้อความ (^) จึงได้ทางเลือกแรกที่ตรงที่ไหนก็ได้ในข้อความ
+# ข้อความที่เตรียมแล้วเป็น token คั่นด้วยช่องว่างเดียว ช่องว่างรอบ token จึงเป็นขอบเขตของตัวเลข
+TUITION_PATTERN = '^(?:' + '|'.join([
+    rf'.*? S{SMALL_NUMBERS} {money("semester")} ', rf'.*? {money("semester_after")} S ',
+    rf'.*? P{SMALL_NUMBERS} {money("program")} ', rf'.*? {money("program_after")} P ',
+    rf'.*? C(?P<count>[1-9]\d?) (?:.*? )?{money("counted")} ',
+    rf'.*? {money("counted_before")} (?:.*? )?C(?P<count_after>[1-9]\d?) ',
+    rf'.*? Y{SMALL_NUMBERS} {money("year")} ', rf'.*? {money("year_after")} Y ',
+    rf'.*? {money("first")} '
+]) + ')'
+
+# ข้อความค่าเทอมที่เจอจริง -> (ค่าเทอม/เทอม, ค่าเทอมจากเว็บ, รูปแบบการชำระ) ที่ต้องได้ ตรวจด้วย --check
+CHECK_CASES = [
+    ('ภาคการศึกษาละ 20,000 บาท', 20000, 20000, PER_SEMESTER),
+    ('20,000 บาท/ภาคการศึกษา', 20000, 20000, PER_SEMESTER),
+    ('ค่าเทอม 35,500 บาท/เทอม', 35500, 35500, PER_SEMESTER),
+    ('ตลอดหลักสูตร 550,000 บาท', 68750, 550000, WHOLE_PROGRAM),
+    ('ค่าใช้จ่ายตลอดหลักสูตร (4 ปี) 160,000 บาท', 20000, 160000, WHOLE_PROGRAM),
+    ('ตลอดหลักสูตร 4 ปี 400,000 บาท', 50000, 400000, WHOLE_PROGRAM),
+    ('ภาคเรียนที่ 1 ค่าธรรมเนียม 21,000 บาท', 21000, 21000, PER_SEMESTER),
+    ('8 ภาคการศึกษา รวม 240,000 บาท', 30000, 240000, WHOLE_PROGRAM),
+    ('240,000 บาท (8 ภาคการศึกษา)', 30000, 240000, WHOLE_PROGRAM),
+    ('ภาคการศึกษาละ 20,000 บาท (8 ภาคการศึกษา รวม 160,000 บาท)', 20000, 20000, PER_SEMESTER),
+    ('ปีละ 80,000 บาท', 40000, 40000, PER_SEMESTER),
+    ('80,000 บาท/ปี', 40000, 40000, PER_SEMESTER),
+    ('ภาคการศึกษาละ 25,000-30,000 บาท', 25000, 25000, PER_SEMESTER),
+    ('ปีการศึกษา 2567 ค่าเทอม 19,000 บาท', 19000, 19000, PER_SEMESTER),
+    ('ภาคการศึกษาละ ๒๒,๕๐๐ บาท', 22500, 22500, PER_SEMESTER),
+    ('ค่าเล่าเรียน 18,500.50 บาท.', 18500, 18500, PER_SEMESTER),
+    ('ไม่พบข้อมูล', None, None, None),
+]
+
+
+def clean_tuition_text(raw):
+    """เตรียมข้อความค่าเทอมทั้งคอลัมน์: เลขไทย -> เลขอารบิก, ตัด comma, ช่วงราคาใช้ค่าต่ำสุด,
+    แทนคำบอกช่วงเวลาด้วยตัวอักษร S/P/Y และจำนวนภาคการศึกษาด้วย C<จำนวน> แล้วเหลือไว้แค่ตัวเลขและตัวอักษรแทนคำ
+    เช่น 'ภาคการศึกษาละ 20,000 บาท' -> ' S 20000 ', '8 ภาคการศึกษา รวม 240,000 บาท' -> ' C8 240000 '
+    """
+    text = raw.fillna('').astype(str).str.lower()
+    has_thai_digits = text.str.contains('[๐-๙]', regex=True)
+    if has_thai_digits.any():
+        text = text.where(~has_thai_digits, text[has_thai_digits].str.translate(THAI_DIGITS))
+
+    text = text.str.replace(',', '', regex=False)
+    # ปีการศึกษา/พ.ศ. ไม่ใช่จำนวนเงิน
+    text = text.str.replace(r'(?:ปีการศึกษา|พ\.ศ\.|ปี)\s*25\d\d', ' ', regex=True)
+    is_range = text.str.contains(r'\d\s*(?:-|–|ถึง)\s*\d', regex=True)
+    text = text.str.replace(rf'{AMOUNT}\s*(?:-|–|ถึง)\s*\d+(?:\.\d+)?', r'\1', regex=True)
+
+    # "ค่าเทอม" เป็นแค่ชื่อรายการ ไม่ได้บอกว่าเป็นราคาต่อภาคการศึกษา
+    text = text.str.replace('ค่าเทอม', 'ค่าเรียน', regex=False)
+    # ข้อความเป็นตัวพิมพ์เล็กแล้ว ตัวพิมพ์ใหญ่จึงใช้เป็นเครื่องหมายได้โดยไม่ชนกับข้อความเดิม
+    # 'ปีละ' ต้องแทนก่อนจำนวนปี และจำนวนภาคการศึกษาต้องแทนก่อน 'ภาคการศึกษา'
+    text = text.str.replace(PERIOD_WORDS['Y'], ' Y ', regex=True)
+    # จำนวนปีไม่ใช้ จำนวนภาคการศึกษาใช้หารยอดรวม
+    text = text.str.replace(YEAR_COUNT, r'\1 ', regex=True)
+    text = text.str.replace(SEMESTER_COUNT, r'\1 C\2 ', regex=True)
+    for marker in ('S', 'P'):
+        text = text.str.replace(PERIOD_WORDS[marker], f' {marker} ', regex=True)
+    # เหลือแค่ token คั่นด้วยช่องว่างเดียว ข้อความสั้นลงมาก regex ขั้นต่อไปจึงเร็วขึ้น
+    text = ' ' + text.str.replace(r'[^0-9.SPYC]+', ' ', regex=True).str.strip() + ' '
+    return text, is_range
+
+
+def parse_tuition(raw, semesters=SEMESTERS):
+    """แปลง Series ของข้อความค่าเทอมเป็น DataFrame ของคอลัมน์ที่ dashboard ใช้ (ทุกขั้นตอนทำทั้งคอลัมน์)
+
+    ลำดับการตีความ: ต่อภาคการศึกษา > ตลอดหลักสูตร > รวม N ภาคการศึกษา (หาร N) > ต่อปี (หาร 2)
+    > จำนวนเงินแรก (ถือว่าต่อภาคการศึกษา) ตัวเลขที่น้อยกว่า MIN_AMOUNT ไม่นับเป็นจำนวนเงิน
+    ทุกแบบอยู่ใน TUITION_PATTERN จึงผ่านข้อความแค่รอบเดียว แถวที่อ่านไม่ได้จะมีค่าว่างในคอลัมน์ตัวเลข
+    """
+    text, is_range = clean_tuition_text(raw)
+
+    parts = text.str.extract(TUITION_PATTERN)
+    parts.index = raw.index
+    try:
+        numbers = parts.astype('float64')
+    except (ValueError, TypeError):
+        numbers = parts.apply(pd.to_numeric, errors='coerce')
+
+    per_semester = numbers['semester'].fillna(numbers['semester_after'])
+    whole_program = numbers['program'].fillna(numbers['program_after'])
+    # '8 ภาคการศึกษา รวม 240000' = ยอดรวมของ 8 ภาคการศึกษา (1 ภาคการศึกษา = ราคาต่อภาคการศึกษา)
+    counted_amount = numbers['counted'].fillna(numbers['counted_before'])
+    counted = numbers['count'].fillna(numbers['count_after'])
+    per_year = numbers['year'].fillna(numbers['year_after'])
+    first_amount = numbers['first']
+
+    use_semester = per_semester.notna()
+    use_program = whole_program.notna()
+    use_count = counted_amount.notna()
+    use_year = per_year.notna()
+    use_first = first_amount.notna()
+    # รวมหลายภาคการศึกษาถือเป็นราคาตลอดหลักสูตร หารด้วยจำนวนภาคการศึกษาที่ระบุ
+    use_total = use_program | (use_count & (counted > 1))
+
+    # แต่ละแถวตรงได้ทางเลือกเดียว จึงรวมคอลัมน์ได้ด้วย fillna
+    from_web = per_semester.fillna(whole_program).fillna(counted_amount).fillna(per_year / 2).fillna(first_amount)
+    per_term = from_web.where(~use_total, from_web / counted.where(use_count, semesters))
+
+    return pd.DataFrame({
+        'ค่าเทอม/เทอม': per_term.round().astype('Int64'),
+        'ค่าเทอมจากเว็บ': from_web.round().astype('Int64'),
+        'รูปแบบการชำระ': pd.Series(PER_SEMESTER, index=raw.index).where(~use_total, WHOLE_PROGRAM).where(from_web.notna()),
+        'สถานะค่าเทอม': pd.Series('อ่านไม่ได้', index=raw.index).mask(use_first, 'ไม่ระบุช่วงเวลา')
+            .mask(use_year, 'ต่อปี').mask(use_count, PER_SEMESTER).mask(use_count & use_total, 'รวมหลายภาคการศึกษา')
+            .mask(use_program, WHOLE_PROGRAM).mask(use_semester, PER_SEMESTER),
+        'ช่วงราคา': is_range & from_web.notna()
+    })
+
+
+def normalize_tuition(df, source='ค่าเทอม', semesters=SEMESTERS):
+    """เพิ่มคอลัมน์ ค่าเทอม/เทอม, ค่าเทอมจากเว็บ, รูปแบบการชำระ, สถานะค่าเทอม และ ช่วงราคา ให้ df
+
+    ข้อความค่าเทอมซ้ำกันมาก (เช่น '20,000 บาท/ภาคการศึกษา') จึงแปลงเฉพาะข้อความที่ไม่ซ้ำ
+    แล้วกระจายผลกลับทุกแถว
+    """
+    codes, uniques = pd.factorize(df[source].fillna(''))
+    parsed = parse_tuition(pd.Series(uniques), semesters)
+
+    result = df.copy()
+    for column in parsed.columns:
+        result[column] = parsed[column].take(codes).set_axis(df.index)
+    return result
+
+
+def coverage_report(df):
+    """สรุปสัดส่วนแถวที่แปลงค่าเทอมได้ (df จาก normalize_tuition)"""
+    total = len(df)
+    unparsed = df.loc[df['ค่าเทอมจากเว็บ'].isna(), 'ค่าเทอม'].fillna('').astype(str)
+    parsed = int(df['ค่าเทอมจากเว็บ'].notna().sum())
+    return {
+        'rows': total,
+        'parsed': parsed,
+        'coverage': parsed / total if total else 0,
+        'by_status': df['สถานะค่าเทอม'].value_counts().to_dict(),
+        'ranges': int(df['ช่วงราคา'].sum()),
+        'unparsed_examples': unparsed[unparsed.str.strip() != ''].drop_duplicates().head(5).tolist()
+    }
+
+
+def print_coverage(report):
+    """แสดงผลการแปลงค่าเทอม"""
+    print(f"\n💰 แปลงค่าเทอมได้ {report['parsed']}/{report['rows']} แถว ({report['coverage'] * 100:.1f}%)")
+    print("=" * 50)
+    for status, count in report['by_status'].items():
+        print(f"   - {status}: {count}")
+    if report['ranges']:
+        print(f"   ↔️ เป็นช่วงราคา (ใช้ค่าต่ำสุด): {report['ranges']}")
+    for example in report['unparsed_examples']:
+        print(f"   ❓ {example[:80]}")
+
+
+def load_records(path):
+    """อ่าน record ของ scraper จาก JSONL/Parquet (record_sink) หรือไฟล์ Excel ของ save_to_excel"""
+    if os.path.splitext(path)[1].lower() in ('.xlsx', '.xls'):
+        return pd.read_excel(path)
+    return pd.DataFrame(list(read_records(path)))
+
+
+def run_checks():
+    """ตรวจ parse_tuition กับ CHECK_CASES คืนจำนวนกรณีที่ผิด"""
+    parsed = parse_tuition(pd.Series([case[0] for case in CHECK_CASES]))
+    failed = 0
+    for (text, *expected), row in zip(CHECK_CASES, parsed.itertuples(index=False)):
+        got = [None if pd.isna(value) else value for value in row[:3]]
+        if got != expected:
+            failed += 1
+            print(f"❌ {text}: ได้ {got} ต้องได้ {expected}")
+    print(f"{'✅' if not failed else '❌'} ตรวจการแปลงค่าเทอม {len(CHECK_CASES) - failed}/{len(CHECK_CASES)} กรณี")
+    return failed
+
+
+def main(args):
+    if args.check:
+        raise SystemExit(1 if run_checks() else 0)
+    if not args.input:
+        raise SystemExit("ต้องระบุไฟล์ record (หรือใช้ --check)")
+    df = load_records(args.input)
+    start = time.perf_counter()
+    normalized = normalize_tuition(df)
+    elapsed = time.perf_counter() - start
+
+    report = coverage_report(normalized)
+    print_coverage(report)
+    print(f"⚡ ใช้เวลา {elapsed * 1000:.0f} ms ({len(df)} แถว)")
+
+    if args.output:
+        if XLSXWRITER_AVAILABLE:
+            write_rows(args.output, normalized[DASHBOARD_COLUMNS].itertuples(index=False, name=None), DASHBOARD_LAYOUT)
+        else:
+            with pd.ExcelWriter(args.output, engine='openpyxl') as writer:
+                normalized[DASHBOARD_COLUMNS].to_excel(writer, sheet_name='ข้อมูลหลักสูตร', index=False)
+        print(f"✅ บันทึกข้อมูลสำหรับ dashboard ลง {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="แปลงข้อความค่าเทอมจาก scraper เป็นข้อมูลสำหรับ dashboard")
+    parser.add_argument('input', nargs='?', help='ไฟล์ record จาก scraper (.jsonl, .parquet หรือ .xlsx)')
+    parser.add_argument('-o', '--output', default=None,
+                        help='ไฟล์ Excel สำหรับ dashboard เช่น tcas_data.xlsx (ไม่ระบุ = แสดงผลการแปลงอย่างเดียว)')
+    parser.add_argument('--check', action='store_true', help='ตรวจการแปลงกับข้อความตัวอย่างใน CHECK_CASES แล้วจบ')
+    main(parser.parse_args())
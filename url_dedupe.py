@@ -0,0 +1,133 @@
+import hashlib
+import os
+import re
+import sqlite3
+import string
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, quote
+
+# query parameter สำหรับติดตามการคลิก (ไม่เปลี่ยนเนื้อหาของหน้า)
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref', 'ref_src'
+}
+TRACKING_PREFIXES = ('utm_',)
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# ตัวอักษรที่ไม่ต้อง escape ใน path (RFC 3986)
+PATH_SAFE = "/:@!$&'()*+,;=-._~"
+# ตัวอักษร unreserved: %XX ของตัวอักษรเหล่านี้ถอดได้โดยไม่เปลี่ยนความหมาย (RFC 3986 6.2.2.2)
+UNRESERVED = set(string.ascii_letters + string.digits + '-._~')
+PERCENT_ESCAPE = re.compile(r'%([0-9A-Fa-f]{2})')
+STRAY_PERCENT = re.compile(r'%(?![0-9A-Fa-f]{2})')
+
+
+def normalize_escapes(path):
+    """%XX เป็นตัวพิมพ์ใหญ่ ถอดเฉพาะตัวอักษร unreserved แล้ว escape ตัวอักษรที่ยังไม่ได้ escape (เช่นภาษาไทย)
+
+    %2F (/) และ %3F (?) ยังคงเป็น escape เพราะถ้าถอดจะชี้ไปหน้าอื่น
+    """
+    def fix(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in UNRESERVED else '%' + match.group(1).upper()
+
+    path = STRAY_PERCENT.sub('%25', path)
+    return quote(PERCENT_ESCAPE.sub(fix, path), safe=PATH_SAFE + '%')
+
+
+def canonicalize_url(url):
+    """ทำ URL ให้อยู่รูปเดียวกัน เพื่อให้ลิงก์ที่ชี้หน้าเดียวกันนับเป็นลิงก์เดียว
+
+    host ตัวเล็ก, ตัด port มาตรฐาน, ตัด fragment, ตัด / ซ้ำและ / ท้าย path,
+    escape แบบเดียวกัน, ตัด parameter ติดตามการคลิก และเรียง query
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url.strip()
+
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host += f':{parts.port}'
+
+    path = normalize_escapes(re.sub(r'/{2,}', '/', parts.path))
+    if len(path) > 1:
+        path = path.rstrip('/')
+    path = path or '/'
+
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def url_hash(url):
+    """hash 8 byte ของ URL (เก็บเป็น INTEGER ใน SQLite ได้พอดี)"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+class SeenSet:
+    """ชุด URL ที่เคยดึงแล้วบนดิสก์ (SQLite) ใช้ร่วมกันทุกรอบการ crawl
+
+    เก็บแค่ hash 8 byte ของ URL ที่ทำให้อยู่รูปเดียวกันแล้ว พร้อมเวลาที่ดึงล่าสุด
+    ttl_hours > 0: URL ที่ดึงไปแล้วในช่วงเวลานี้จะถูกข้าม (0 = จำไว้อย่างเดียว ไม่ข้าม)
+    """
+
+    def __init__(self, path='.tcas_cache/seen_urls.sqlite3', ttl_hours=0):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.db = sqlite3.connect(path)
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS seen (
+                hash INTEGER PRIMARY KEY,
+                first_seen REAL,
+                last_fetched REAL,
+                fetches INTEGER
+            )
+        ''')
+        self.db.commit()
+        self.started_at = time.time()
+        self.pending = 0
+        self.stats = {'skipped': 0, 'marked': 0}
+
+    def is_recent(self, url):
+        """ดึง URL นี้ไปแล้วในรอบก่อนและยังไม่เกิน ttl หรือไม่"""
+        if self.ttl <= 0:
+            return False
+        row = self.db.execute('SELECT last_fetched FROM seen WHERE hash = ?', (url_hash(url),)).fetchone()
+        # URL ที่ดึงในรอบนี้เองไม่นับ (กันไว้ตอน resume)
+        if row and self.started_at - self.ttl <= row[0] < self.started_at:
+            self.stats['skipped'] += 1
+            return True
+        return False
+
+    def mark(self, url):
+        """บันทึกว่าดึง URL นี้แล้ว (commit เป็นชุดเพื่อไม่ให้ช้า)"""
+        now = time.time()
+        self.db.execute('''
+            INSERT INTO seen (hash, first_seen, last_fetched, fetches) VALUES (?, ?, ?, 1)
+            ON CONFLICT(hash) DO UPDATE SET last_fetched = excluded.last_fetched, fetches = fetches + 1
+        ''', (url_hash(url), now, now))
+        self.stats['marked'] += 1
+        self.pending += 1
+        if self.pending >= 100:
+            self.db.commit()
+            self.pending = 0
+
+    def print_stats(self):
+        """แสดงสถิติของชุด URL ที่เคยดึงแล้ว"""
+        print(f"\n🧾 สถิติ URL ที่เคยดึงแล้ว ({self.path}):")
+        print("=" * 50)
+        print(f"⏭️ ข้ามเพราะดึงไปแล้วภายใน {self.ttl / 3600:g} ชั่วโมง: {self.stats['skipped']}")
+        print(f"📝 บันทึกว่าดึงแล้วในรอบนี้: {self.stats['marked']}")
+
+    def close(self):
+        """บันทึกที่ค้างอยู่แล้วปิดฐานข้อมูล"""
+        if self.db:
+            self.db.commit()
+            self.db.close()
+            self.db = None
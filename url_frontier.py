@@ -0,0 +1,158 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+
+from url_dedupe import canonicalize_url
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def default_owner():
+    """ชื่อ worker ที่ไม่ซ้ำกันข้ามเครื่องและ process (host:pid)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Frontier:
+    """คิว URL ที่ใช้ร่วมกันหลาย process (SQLite) สำหรับแบ่งงานดึงข้อมูล
+
+    worker ยืม (lease) URL ไปทีละชุด ถ้า worker หายไประหว่างทาง lease จะหมดอายุ
+    หลัง visibility_timeout วินาทีแล้ว worker อื่นหยิบไปทำต่อได้
+    URL ที่ล้มเหลว (รวมถึง lease ที่หมดอายุเพราะ worker ตาย) จะถูกคืนเข้าคิวจนกว่าจะครบ max_attempts ครั้ง
+    record ที่ได้เก็บไว้ในตารางเดียวกัน จึงรวมผลของทุก worker ได้จากที่เดียว (records)
+    """
+
+    def __init__(self, path='tcas_frontier.sqlite3', visibility_timeout=300, max_attempts=3):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        # isolation_level=None: คุม transaction เอง (BEGIN IMMEDIATE ตอน lease)
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS frontier (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE,
+                state TEXT,
+                attempts INTEGER DEFAULT 0,
+                owner TEXT,
+                lease_expires REAL,
+                record TEXT,
+                error TEXT,
+                updated REAL
+            )
+        ''')
+        self.db.execute('CREATE INDEX IF NOT EXISTS frontier_state ON frontier (state, lease_expires)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)')
+
+    def reset(self):
+        """เริ่มรอบใหม่: ล้าง URL, record และสถานะ seeded ของรอบก่อน (ไฟล์เดิมใช้ซ้ำได้)"""
+        with self.db:
+            self.db.execute('DELETE FROM frontier')
+            self.db.execute('DELETE FROM meta')
+
+    def add(self, urls):
+        """เพิ่ม URL เข้าคิว (URL ที่มีอยู่แล้วไม่ถูกเพิ่มซ้ำ) คืนจำนวน URL ใหม่"""
+        now = time.time()
+        before = self.db.total_changes
+        with self.db:
+            self.db.executemany(
+                'INSERT OR IGNORE INTO frontier (url, state, updated) VALUES (?, ?, ?)',
+                ((canonicalize_url(url), PENDING, now) for url in urls)
+            )
+        return self.db.total_changes - before
+
+    def lease(self, owner, limit=8):
+        """ยืม URL ที่รอทำ (หรือ lease หมดอายุแล้ว) ไม่เกิน limit รายการ"""
+        now = time.time()
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            # lease ที่หมดอายุและลองครบแล้ว (เช่น URL ที่ทำให้ worker ตายทุกครั้ง) เลิกทำ ไม่วนยืมซ้ำไม่รู้จบ
+            self.db.execute('''
+                UPDATE frontier SET state = ?, error = COALESCE(error, 'lease_expired'), lease_expires = NULL, updated = ?
+                WHERE state = ? AND lease_expires < ? AND attempts >= ?
+            ''', (FAILED, now, LEASED, now, self.max_attempts))
+            rows = self.db.execute('''
+                SELECT id, url FROM frontier
+                WHERE state = ? OR (state = ? AND lease_expires < ?)
+                ORDER BY id LIMIT ?
+            ''', (PENDING, LEASED, now, limit)).fetchall()
+            self.db.executemany('''
+                UPDATE frontier SET state = ?, owner = ?, lease_expires = ?, attempts = attempts + 1, updated = ?
+                WHERE id = ?
+            ''', ((LEASED, owner, now + self.visibility_timeout, now, row_id) for row_id, _ in rows))
+            self.db.execute('COMMIT')
+        except Exception:
+            self.db.execute('ROLLBACK')
+            raise
+        return [url for _, url in rows]
+
+    def complete(self, url, record):
+        """บันทึก record ของ URL ที่ดึงสำเร็จ (รับผลแม้ lease หมดอายุไปแล้ว ผลเหมือนกัน)"""
+        with self.db:
+            self.db.execute(
+                'UPDATE frontier SET state = ?, record = ?, error = NULL, lease_expires = NULL, updated = ? WHERE url = ?',
+                (DONE, json.dumps(record, ensure_ascii=False), time.time(), url)
+            )
+
+    def fail(self, url, error, final=False):
+        """คืน URL เข้าคิว หรือเลิกทำถ้าลองครบ max_attempts ครั้งแล้ว
+
+        final=True: ผลที่ลองใหม่ก็ไม่เปลี่ยน (เช่น http_404, parse_miss) เลิกทำทันที
+        """
+        with self.db:
+            self.db.execute('''
+                UPDATE frontier
+                SET state = CASE WHEN ? OR attempts >= ? THEN ? ELSE ? END,
+                    error = ?, lease_expires = NULL, updated = ?
+                WHERE url = ? AND state = ?
+            ''', (bool(final), self.max_attempts, FAILED, PENDING, error, time.time(), url, LEASED))
+
+    def mark_seeded(self):
+        """บันทึกว่าเพิ่ม URL ครบแล้ว (worker จบได้เมื่อคิวว่าง)"""
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('seeded', ?)", (str(time.time()),))
+
+    def is_seeded(self):
+        return self.db.execute("SELECT 1 FROM meta WHERE name = 'seeded'").fetchone() is not None
+
+    def counts(self):
+        """จำนวน URL แยกตามสถานะ"""
+        counts = dict.fromkeys((PENDING, LEASED, DONE, FAILED), 0)
+        counts.update(self.db.execute('SELECT state, COUNT(*) FROM frontier GROUP BY state'))
+        return counts
+
+    def is_drained(self):
+        """ไม่มี URL ที่รอทำหรือกำลังทำอยู่ และเพิ่ม URL ครบแล้ว"""
+        counts = self.counts()
+        return self.is_seeded() and not counts[PENDING] and not counts[LEASED]
+
+    def records(self):
+        """record ของทุก URL ที่ดึงสำเร็จ (จากทุก worker) เรียงตามลำดับที่เพิ่มเข้าคิว"""
+        for (record,) in self.db.execute('SELECT record FROM frontier WHERE state = ? ORDER BY id', (DONE,)):
+            yield json.loads(record)
+
+    def failures(self):
+        """URL ที่เลิกทำแล้ว พร้อมสาเหตุล่าสุด"""
+        return self.db.execute('SELECT url, attempts, error FROM frontier WHERE state = ? ORDER BY id', (FAILED,)).fetchall()
+
+    def print_stats(self):
+        """แสดงสถานะของ frontier"""
+        counts = self.counts()
+        print(f"\n🧵 สถานะ frontier ({self.path}):")
+        print("=" * 50)
+        print(f"✅ เสร็จ {counts[DONE]} | ⏳ รอ {counts[PENDING]} | 🔒 กำลังทำ {counts[LEASED]} | ❌ ล้มเหลว {counts[FAILED]}")
+        for url, attempts, error in self.failures()[:5]:
+            print(f"   - {url} ({attempts} ครั้ง): {error}")
+
+    def close(self):
+        if self.db:
+            self.db.close()
+            self.db = None
@@ -0,0 +1,84 @@
+import asyncio
+import re
+from itertools import product
+from urllib.parse import urlparse
+
+from listing_discovery import PROGRAM_URL_PATTERN
+from url_dedupe import canonicalize_url
+
+# รหัสโปรแกรมของ mytcas เช่น 10010104300501A = 1 + มหาวิทยาลัย (3 หลัก) + สาขาวิศวกรรมคอมพิวเตอร์ (01043005) + ลำดับ (2 หลัก) + A
+DEFAULT_PROBE_PATTERN = 'https://course.mytcas.com/programs/1{university:03d}01043005{seq:02d}A'
+DEFAULT_PROBE_RANGES = {'university': range(1, 100), 'seq': range(1, 6)}
+
+
+def parse_range(spec):
+    """อ่านช่วงค่าของตัวแปรใน pattern: 'seq=1-5' -> ('seq', range(1, 6)), 'slug=cpe,ai' -> ('slug', ['cpe', 'ai'])"""
+    name, _, values = spec.partition('=')
+    if not name or not values:
+        raise ValueError(f"รูปแบบช่วงไม่ถูกต้อง: {spec} (เช่น seq=1-5 หรือ slug=cpe,ai)")
+    match = re.fullmatch(r'(\d+)-(\d+)', values)
+    if match:
+        return name, range(int(match.group(1)), int(match.group(2)) + 1)
+    return name, values.split(',')
+
+
+def expand_pattern(pattern, ranges):
+    """สร้าง URL ทุกแบบจาก pattern และช่วงค่าของตัวแปร (ทีละ URL ไม่สร้างทั้งหมดไว้ก่อน)"""
+    names = sorted(ranges)
+    for values in product(*(ranges[name] for name in names)):
+        yield pattern.format(**dict(zip(names, values)))
+
+
+class UrlProber:
+    """ตรวจว่า URL ที่เดาไว้มีหน้าโปรแกรมอยู่จริงหรือไม่ ด้วย request เบา ๆ พร้อมกันหลายตัว
+
+    ใช้ HEAD ก่อน ถ้า server ไม่รองรับ (405/501) จึงใช้ GET แบบ Range: bytes=0-0
+    URL ที่ redirect ไปหน้าอื่น (เช่นหน้าแรก) ไม่นับว่าเจอ
+    request คือ coroutine ที่รับ (method, url, headers) แล้วคืน (status_code, final_url)
+    """
+
+    def __init__(self, request, concurrency=32, program_pattern=PROGRAM_URL_PATTERN):
+        self.request = request
+        self.concurrency = concurrency
+        self.program_re = re.compile(program_pattern)
+        self.hits = []
+        self.stats = {'probes': 0, 'hits': 0, 'misses': 0, 'errors': 0, 'ranged_get': 0}
+
+    async def probe(self, candidates, on_found=None):
+        """ตรวจทุก URL ใน candidates คืน list ของ URL ที่เจอ (เรียงแล้ว)
+
+        on_found(urls) ถูกเรียกทันทีที่เจอแต่ละหน้า เพื่อส่งเข้าคิวดึงข้อมูลได้เลย
+        """
+        candidates = iter(candidates)
+
+        async def worker():
+            # worker ทุกตัวหยิบจาก iterator เดียวกัน (event loop เดียว จึงไม่ชนกัน)
+            for url in candidates:
+                if await self.check(url):
+                    self.hits.append(url)
+                    if on_found:
+                        on_found([url])
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+        print(f"🎯 ทดสอบ URL {self.stats['probes']} แบบ: เจอ {self.stats['hits']} หน้า "
+              f"(ไม่พบ {self.stats['misses']}, ผิดพลาด {self.stats['errors']}, ใช้ GET แทน HEAD {self.stats['ranged_get']})")
+        return sorted(self.hits)
+
+    async def check(self, url):
+        """URL นี้เป็นหน้าโปรแกรมที่มีอยู่จริงหรือไม่"""
+        url = canonicalize_url(url)
+        self.stats['probes'] += 1
+        try:
+            status_code, final_url = await self.request('HEAD', url, None)
+            if status_code in (405, 501):
+                self.stats['ranged_get'] += 1
+                status_code, final_url = await self.request('GET', url, {'Range': 'bytes=0-0'})
+        except Exception:
+            self.stats['errors'] += 1
+            return False
+
+        found = (status_code in (200, 206) and canonicalize_url(final_url) == url
+                 and bool(self.program_re.search(urlparse(url).path)))
+        self.stats['hits' if found else 'misses'] += 1
+        return found